@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# benchmarks/hid_decode_throughput.py - Compiled vs interpreted HID report decoding
+#
+# Decodes --reports random reports of a few common devices twice: by walking
+# the report descriptor for every report and pulling each field out on its
+# own, and with the DeviceDecoder compiled from the descriptor once (as
+# HIDHandler does at connect time). Reports the time per report.
+#
+#   python benchmarks/hid_decode_throughput.py [--reports 100000]
+import sys
+import os
+import time
+import random
+import argparse
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from midi_hid_app.hid_descriptor import (
+    BUTTON,
+    VENDOR_DEFINED,
+    DeviceDecoder,
+    parse_input_reports,
+    usage_name,
+)
+
+DEVICES = {
+    "boot keyboard": bytes.fromhex(
+        "05 01 09 06 a1 01 05 07 19 e0 29 e7 15 00 25 01 75 01 95 08 81 02"
+        "95 01 75 08 81 01 95 05 75 01 05 08 19 01 29 05 91 02 95 01 75 03"
+        "91 01 95 06 75 08 15 00 25 65 05 07 19 00 29 65 81 00 c0"
+    ),
+    "mouse": bytes.fromhex(
+        "05 01 09 02 a1 01 85 01 09 01 a1 00 05 09 19 01 29 03 15 00 25 01"
+        "95 03 75 01 81 02 95 01 75 05 81 03 05 01 09 30 09 31 09 38 15 81"
+        "25 7f 75 08 95 03 81 06 c0 c0"
+    ),
+    # Six 16-bit axes, a hat and 16 buttons
+    "gamepad": bytes.fromhex(
+        "05 01 09 05 a1 01 09 30 09 31 09 32 09 33 09 34 09 35 15 00 27 ff ff"
+        "00 00 75 10 95 06 81 02 09 39 15 00 25 07 75 04 95 01 81 42 75 04"
+        "95 01 81 03 05 09 19 01 29 10 15 00 25 01 75 01 95 10 81 02 c0"
+    ),
+}
+
+
+def decode_interpreted(descriptor, data):
+    """Walk the descriptor for this report and extract every field in turn"""
+    reports = parse_input_reports(descriptor)
+    report = reports.get(data[0] if 0 not in reports else 0)
+    values = {}
+    for field in report.fields:
+        if field.usage_page >= VENDOR_DEFINED:
+            continue
+        for index in range(field.count):
+            offset = field.bit_offset + index * field.bit_size
+            value = 0
+            for bit in range(field.bit_size):
+                position = offset + bit
+                if (
+                    position // 8 < len(data)
+                    and data[position // 8] >> (position % 8) & 1
+                ):
+                    value |= 1 << bit
+            if field.is_signed and value >> (field.bit_size - 1):
+                value -= 1 << field.bit_size
+            if field.is_array:
+                values.setdefault(usage_name(field.usage), []).append(value)
+            elif field.usage_page == BUTTON:
+                values.setdefault("Buttons", []).append(value)
+            else:
+                values[usage_name(field.usage)] = value
+    return values
+
+
+def make_reports(descriptor, count):
+    decoder = DeviceDecoder(descriptor)
+    reports = []
+    for _ in range(count):
+        report_id = random.choice(list(decoder.decoders))
+        length = decoder.decoders[report_id].length
+        data = bytearray(random.getrandbits(8) for _ in range(length))
+        if decoder.uses_report_ids:
+            data[0] = report_id
+        reports.append(bytes(data))
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HID report decoding speed")
+    parser.add_argument("--reports", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{args.reports:,} reports per device")
+    print(f"{'device':<16}{'interpreted':>14}{'compiled':>12}{'batch':>12}")
+    for name, descriptor in DEVICES.items():
+        reports = make_reports(descriptor, args.reports)
+
+        start = time.perf_counter()
+        for data in reports:
+            decode_interpreted(descriptor, data)
+        interpreted = (time.perf_counter() - start) / len(reports)
+
+        start = time.perf_counter()
+        decoder = DeviceDecoder(descriptor)
+        for data in reports:
+            decoder.decode(data)
+        compiled = (time.perf_counter() - start) / len(reports)
+
+        start = time.perf_counter()
+        decoder.decode_batch(reports)
+        batch = (time.perf_counter() - start) / len(reports)
+
+        print(
+            f"{name:<16}{interpreted * 1e6:>12.2f}us{compiled * 1e6:>10.2f}us"
+            f"{batch * 1e6:>10.2f}us"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
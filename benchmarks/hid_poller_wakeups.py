@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# benchmarks/hid_poller_wakeups.py - Thread-per-device vs one hidraw poller
+#
+# Simulates --devices HID devices with SOCK_SEQPACKET socket pairs (which
+# keep report boundaries like hidraw nodes) and reads them once the way the
+# hidapi backend does (a thread per device, waking on a 100 ms read
+# timeout) and once through HidrawPoller. Each device sends --rate reports
+# per second; --rate 0 measures idle devices. Reports wakeups, CPU time and
+# how long disconnecting every device takes.
+#
+# With --real the connected HID devices are read instead, through the
+# hidraw nodes HIDHandler finds for them (find_hidraw_node); they send
+# whatever their users do, so this mostly measures idle cost.
+#
+#   python benchmarks/hid_poller_wakeups.py [--devices 20] [--rate 0] [--seconds 5]
+#   python benchmarks/hid_poller_wakeups.py --real [--seconds 5]
+import sys
+import os
+import time
+import select
+import socket
+import argparse
+import threading
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from midi_hid_app.hidraw_backend import HidrawPoller, find_hidraw_node, open_hidraw
+
+REPORT = bytes(64)
+
+
+def make_devices(count):
+    devices = []
+    for _ in range(count):
+        device, feeder = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        device.setblocking(False)
+        devices.append((device, feeder))
+    return devices
+
+
+def open_real_devices():
+    """Open the hidraw node of every HID interface hidapi lists"""
+    import hid
+
+    fds = []
+    nodes = set()
+    for device_info in hid.enumerate():
+        node = find_hidraw_node(device_info)
+        if node is None or node in nodes:
+            continue
+        try:
+            fds.append(open_hidraw(node))
+            nodes.add(node)
+        except OSError as e:
+            print(f"Skipping {node}: {e}")
+    return fds
+
+
+def drain(fd):
+    reports = 0
+    try:
+        while os.read(fd, 4096):
+            reports += 1
+    except BlockingIOError:
+        pass
+    return reports
+
+
+class ThreadPerDevice:
+    """The hidapi model: a reader thread per device with a 100 ms timeout"""
+
+    def __init__(self, fds):
+        # Per-thread counts, so the threads never race on one counter
+        self.wakeup_counts = [0] * len(fds)
+        self.report_counts = [0] * len(fds)
+        self.stop_events = []
+        self.threads = []
+        for index, fd in enumerate(fds):
+            stop_event = threading.Event()
+            thread = threading.Thread(target=self.read, args=(index, fd, stop_event))
+            thread.start()
+            self.stop_events.append(stop_event)
+            self.threads.append(thread)
+
+    @property
+    def wakeups(self):
+        return sum(self.wakeup_counts)
+
+    @property
+    def reports(self):
+        return sum(self.report_counts)
+
+    def read(self, index, fd, stop_event):
+        while not stop_event.is_set():
+            select.select([fd], [], [], 0.1)
+            self.wakeup_counts[index] += 1
+            self.report_counts[index] += drain(fd)
+
+    def close(self):
+        # disconnect_device: stop and join one device at a time
+        for stop_event, thread in zip(self.stop_events, self.threads):
+            stop_event.set()
+            thread.join()
+
+
+class SinglePoller:
+    """HIDHandler's hidraw model: one HidrawPoller thread for every device"""
+
+    def __init__(self, fds):
+        self.wakeups = 0
+        self.reports = 0
+        self.fds = fds
+        self.poller = HidrawPoller()
+        for fd in fds:
+            self.poller.watch(fd, self.on_readable)
+
+    def on_readable(self, fd):
+        self.wakeups += 1
+        self.reports += drain(fd)
+
+    def close(self):
+        for fd in self.fds:
+            self.poller.unwatch(fd)
+        self.poller.stop()
+
+
+def feed(feeders, rate, seconds):
+    """Send rate reports per second to every device"""
+    if rate <= 0:
+        time.sleep(seconds)
+        return
+    interval = 1.0 / rate
+    deadline = time.monotonic() + seconds
+    next_time = time.monotonic()
+    while next_time < deadline:
+        for feeder in feeders:
+            feeder.send(REPORT)
+        next_time += interval
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run(model, fds, feeders, rate, seconds):
+    reader = model(fds)
+    time.sleep(0.2)  # Let the readers settle
+    settle_wakeups = reader.wakeups
+
+    cpu_start = time.process_time()
+    feed(feeders, rate, seconds)
+    time.sleep(0.2)  # Let the last reports be read
+    cpu = time.process_time() - cpu_start
+    wakeups = reader.wakeups - settle_wakeups
+    threads = threading.active_count() - 1
+
+    close_start = time.perf_counter()
+    reader.close()
+    close_time = time.perf_counter() - close_start
+    return (
+        threads,
+        wakeups / (seconds + 0.2),
+        cpu / (seconds + 0.2),
+        close_time,
+        reader.reports,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HID reader wakeups and CPU")
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=0, help="Reports/s per device")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--real", action="store_true", help="Read the connected HID devices"
+    )
+    args = parser.parse_args()
+
+    if args.real:
+        real_fds = open_real_devices()
+        if not real_fds:
+            print("No HID devices with a readable hidraw node")
+            return 1
+        print(f"{len(real_fds)} real hidraw devices, {args.seconds:g} s")
+    else:
+        print(
+            f"{args.devices} devices, {args.rate:g} reports/s each, {args.seconds:g} s"
+        )
+    print(
+        f"{'model':<18}{'threads':>8}{'wakeups/s':>12}{'CPU %':>8}{'disconnect':>12}{'reports':>9}"
+    )
+    for name, model in (
+        ("thread per device", ThreadPerDevice),
+        ("single poller", SinglePoller),
+    ):
+        if args.real:
+            fds, feeders, devices = real_fds, [], []
+        else:
+            devices = make_devices(args.devices)
+            fds = [device.fileno() for device, feeder in devices]
+            feeders = [feeder for device, feeder in devices]
+        threads, wakeups, cpu, close_time, reports = run(
+            model, fds, feeders, args.rate, args.seconds
+        )
+        for device, feeder in devices:
+            device.close()
+            feeder.close()
+        print(
+            f"{name:<18}{threads:>8}{wakeups:>12,.0f}{cpu * 100:>8.1f}"
+            f"{close_time * 1000:>10.0f}ms{reports:>9,}"
+        )
+    if args.real:
+        for fd in real_fds:
+            os.close(fd)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
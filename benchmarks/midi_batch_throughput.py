@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# benchmarks/midi_batch_throughput.py - Per-message vs batched MIDI delivery
+#
+# Feeds synthetic messages into SimpleMIDIHandler from a background thread
+# (the same path the rtmidi callback takes) and measures how fast the GUI
+# thread receives them with one signal per message and with batching on.
+# The hand-off queue uses the BLOCK policy, so the producer is slowed to
+# what the GUI thread can take instead of messages being dropped.
+#
+#   python benchmarks/midi_batch_throughput.py [--count 200000]
+import sys
+import os
+import time
+import argparse
+import threading
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from PySide6.QtCore import QCoreApplication, QTimer
+from midi_hid_app.event_bus import BLOCK
+from midi_hid_app.simple_midi import SimpleMIDIHandler
+
+# Give up on a run after this many seconds
+TIMEOUT = 120
+
+
+def run(app, count, rate_hz):
+    """Return (messages/second delivered to the GUI thread, dropped)"""
+    handler = SimpleMIDIHandler()
+    handler.set_backpressure(BLOCK)
+    if rate_hz:
+        handler.set_batching(rate_hz)
+
+    received = [0]
+
+    def check_done():
+        # Blocked puts still drop after block_timeout; don't wait for those
+        if received[0] + handler.dropped >= count:
+            app.quit()
+
+    def on_message(data, timestamp, port_name):
+        received[0] += 1
+        check_done()
+
+    def on_batch(batch):
+        received[0] += len(batch)
+        check_done()
+
+    handler.message_received.connect(on_message)
+    handler.messages_received.connect(on_batch)
+
+    def produce():
+        message = [0xB0, 1, 64]
+        for i in range(count):
+            handler.core._on_midi_message("Bench Port", message, 0.0)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=produce, daemon=True)
+    QTimer.singleShot(0, thread.start)
+    timeout = QTimer()
+    timeout.setSingleShot(True)
+    timeout.timeout.connect(app.quit)
+    timeout.start(TIMEOUT * 1000)
+    app.exec()
+    timeout.stop()
+    elapsed = time.perf_counter() - start
+    thread.join()
+
+    handler.set_batching(None)
+    return received[0] / elapsed, handler.dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIDI delivery throughput")
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--rate", type=int, default=60, help="Batch flush rate (Hz)")
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+
+    per_message, per_message_dropped = run(app, args.count, None)
+    batched, batched_dropped = run(app, args.count, args.rate)
+
+    print(f"Per-message signal: {per_message:12,.0f} msg/s")
+    print(f"Batched ({args.rate} Hz):   {batched:12,.0f} msg/s")
+    print(f"Speed-up:           {batched / per_message:12.1f}x")
+    if per_message_dropped or batched_dropped:
+        print(
+            f"Dropped:            {per_message_dropped:,} per-message, "
+            f"{batched_dropped:,} batched"
+        )
+
+
+if __name__ == "__main__":
+    main()
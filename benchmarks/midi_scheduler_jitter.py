@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# benchmarks/midi_scheduler_jitter.py - Lateness of scheduled MIDI output
+#
+# Schedules a stream of messages at a fixed interval and reports how late
+# the scheduler thread sent them. By default messages go to a no-op sender
+# so only the scheduling itself is measured; --port sends to a real port.
+#
+#   python benchmarks/midi_scheduler_jitter.py [--count 2000] [--interval-ms 1]
+import sys
+import os
+import argparse
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+from midi_hid_app.scheduler import MidiScheduler, now_ns
+
+
+def run(send, port, count, interval_ns, spin_ns):
+    scheduler = MidiScheduler(send, spin_ns=spin_ns)
+    scheduler.start()
+    start = now_ns() + 50_000_000
+    scheduler.schedule_batch(
+        (port, [0xB0, 1, i % 128], start + i * interval_ns) for i in range(count)
+    )
+    while len(scheduler) or scheduler.sent + scheduler.failed < count:
+        scheduler._thread.join(0.05)
+    scheduler.stop()
+    return scheduler.lateness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIDI scheduler lateness")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--interval-ms", type=float, default=1.0)
+    parser.add_argument("--port", help="Send to this output port")
+    args = parser.parse_args()
+
+    if args.port:
+        from midi_hid_app.midi_core import MIDIHandler
+
+        send = MIDIHandler().send_midi
+    else:
+        send = lambda port, data: None
+
+    interval_ns = int(args.interval_ms * 1e6)
+    for label, spin_ns in (("sleep only", 0), ("sleep + spin", MidiScheduler.SPIN_NS)):
+        lateness = run(send, args.port, args.count, interval_ns, spin_ns)
+        print(f"{label:<13} {lateness.summary()}")
+
+
+if __name__ == "__main__":
+    main()
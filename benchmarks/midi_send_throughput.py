@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# benchmarks/midi_send_throughput.py - Open-per-message vs pooled MIDI output
+#
+# Sends to a virtual input port created by the benchmark itself (Linux and
+# macOS) or to an existing output port given with --port, once the way
+# send_midi used to (look up, open, send, close for every message) and once
+# through MIDIHandler's output pool.
+#
+#   python benchmarks/midi_send_throughput.py [--count 20000] [--port NAME]
+import sys
+import os
+import time
+import argparse
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if base_dir not in sys.path:
+    sys.path.insert(0, base_dir)
+
+import rtmidi
+from midi_hid_app.midi_core import MIDIHandler
+
+SINK_NAME = "Inspektr Send Benchmark"
+
+
+def send_unpooled(port_name, message, count):
+    """The old send_midi: one lookup, open, send and close per message"""
+    lookup = rtmidi.MidiOut()
+    for i in range(count):
+        ports = lookup.get_ports()
+        midi_out = rtmidi.MidiOut()
+        midi_out.open_port(ports.index(port_name))
+        midi_out.send_message(message)
+        midi_out.close_port()
+
+
+def send_pooled(handler, port_name, message, count):
+    for i in range(count):
+        handler.send_midi(port_name, message)
+
+
+def rate(func, count):
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIDI send throughput")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--port", help="Existing output port to send to")
+    args = parser.parse_args()
+
+    sink = None
+    port_name = args.port
+    if port_name is None:
+        sink = rtmidi.MidiIn()
+        sink.open_virtual_port(SINK_NAME)
+        sink.set_callback(lambda message, data: None)
+        matches = [p for p in rtmidi.MidiOut().get_ports() if SINK_NAME in p]
+        if not matches:
+            print("Could not find the benchmark's virtual port; use --port")
+            return 1
+        port_name = matches[0]
+
+    message = [0xB0, 1, 64]
+    handler = MIDIHandler()
+
+    # The old path is much slower, so it gets a tenth of the messages
+    slow_count = max(1, args.count // 10)
+    unpooled = rate(lambda: send_unpooled(port_name, message, slow_count), slow_count)
+    pooled = rate(
+        lambda: send_pooled(handler, port_name, message, args.count), args.count
+    )
+    handler.close_all()
+
+    print(f"Port: {port_name}")
+    print(f"Open per message: {unpooled:12,.0f} msg/s")
+    print(f"Pooled:           {pooled:12,.0f} msg/s")
+    print(f"Speed-up:         {pooled / unpooled:12.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,18 +10,14 @@ base_dir = os.path.dirname(os.path.abspath(__file__))
 if base_dir not in sys.path:
     sys.path.insert(0, base_dir)
 
-# Now the imports should work
-from midi_hid_app.simple_ui import SimpleMainWindow
+# Now the imports should work; anything that pulls in PySide6 is imported
+# inside main() so that headless modes never load Qt
 import platform
 import argparse
-from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
 import time
-from midi_hid_app.splash import CustomSplash
-from midi_hid_app.simple_midi import SimpleMIDIHandler
-from midi_hid_app.simple_hid import SimpleHIDHandler
-from midi_hid_app.simple_ui import SimpleMainWindow
+
+# Reference point for --profile-startup
+STARTED = time.perf_counter()
 
 # Mac-specific icon fix
 if sys.platform == "darwin":
@@ -45,6 +41,8 @@ if sys.platform == "darwin":
 # Set application icon
 def set_app_icon(app):
     """Set the application icon based on platform"""
+    from PySide6.QtGui import QIcon
+
     # Get the base directory
     base_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -81,6 +79,8 @@ def set_app_icon(app):
 
 def configure_application(app):
     """Configure application with native platform-specific styling"""
+    from PySide6.QtCore import Qt
+
     # Set application name
     app.setApplicationName("MIDI/HID Inspektr")
 
@@ -130,46 +130,165 @@ def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="MIDI/HID Test Application")
     parser.add_argument("--scan", action="store_true", help="Scan for devices and exit")
+    parser.add_argument(
+        "--json", action="store_true", help="Print --scan results as JSON"
+    )
     parser.add_argument(
         "--create-virtual", help="Create a virtual MIDI port with the specified name"
     )
+    parser.add_argument(
+        "--scrollback-events",
+        type=int,
+        default=65536,
+        help="Number of events kept in memory (default: 65536)",
+    )
+    parser.add_argument(
+        "--scrollback-mb",
+        type=float,
+        default=4,
+        help="Megabytes of event payload kept in memory (default: 4)",
+    )
+    parser.add_argument(
+        "--no-spill",
+        action="store_true",
+        help="Discard events that fall out of the scrollback instead of "
+        "spilling them to a temporary file",
+    )
+    parser.add_argument(
+        "--capture",
+        metavar="OUT",
+        help="Capture to a file without starting the GUI (see --midi, --hid)",
+    )
+    parser.add_argument(
+        "--midi",
+        metavar="PORT",
+        action="append",
+        default=[],
+        help="MIDI input port to capture (name or part of it; repeatable)",
+    )
+    parser.add_argument(
+        "--hid",
+        metavar="VID:PID",
+        action="append",
+        default=[],
+        help="HID device to capture, as hex vendor:product id (repeatable)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Stop capturing after this many seconds (default: until Ctrl+C)",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between capture rate summaries (default: 5)",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="CAPTURE",
+        help="Replay the MIDI events of a capture file to a virtual output port",
+    )
+    parser.add_argument(
+        "--replay-port",
+        metavar="NAME",
+        help="Name of the virtual port --replay creates",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed multiplier (default: 1.0)",
+    )
+    parser.add_argument(
+        "--loop", action="store_true", help="Replay the capture over and over"
+    )
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        help="Measure MIDI round-trip latency over a virtual port loopback",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=2000,
+        help="Number of --latency probes (default: 2000)",
+    )
+    parser.add_argument(
+        "--interval-ms",
+        type=float,
+        default=2.0,
+        help="Milliseconds between --latency probes (default: 2)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Find the highest MIDI input rate each delivery pipeline sustains",
+    )
+    parser.add_argument(
+        "--benchmark-seconds",
+        type=float,
+        default=2.0,
+        help="Seconds each --benchmark rate is held (default: 2)",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print how long each startup phase took",
+    )
     args = parser.parse_args()
 
-    # Create handlers
-    midi_handler = SimpleMIDIHandler()
-    hid_handler = SimpleHIDHandler()
-
-    # Handle scan mode
+    # Handle scan mode (no Qt needed, MIDI and HID are enumerated in parallel)
     if args.scan:
-        # Get MIDI ports
-        midi_ports = midi_handler.get_ports_by_type()
-        print("\n=== MIDI Ports ===")
-        print(f"Physical ports ({len(midi_ports['physical'])}):")
-        for port in midi_ports["physical"]:
-            print(f"  - {port}")
-
-        print(f"\nVirtual ports ({len(midi_ports['virtual'])}):")
-        for port in midi_ports["virtual"]:
-            print(f"  - {port}")
-
-        # Get HID devices
-        hid_devices = hid_handler.get_devices()
-        print(f"\n=== HID Devices ({len(hid_devices)}) ===")
-        for device in hid_devices:
-            vendor_id = device.get("vendor_id", 0)
-            product_id = device.get("product_id", 0)
-            manufacturer = device.get("manufacturer_string", "Unknown")
-            product = device.get("product_string", "Unknown")
-
-            print(f"  - {manufacturer} {product} ({vendor_id:04x}:{product_id:04x})")
-
-        print("")
+        from midi_hid_app.scan import scan_devices, print_scan
+
+        result = scan_devices()
+        if args.json:
+            import json
+
+            print(json.dumps(result, indent=2))
+        else:
+            print_scan(result)
         return 0
 
+    # Handle headless capture mode
+    if args.capture:
+        from midi_hid_app.headless import run_capture
+
+        return run_capture(
+            args.capture,
+            midi_ports=args.midi,
+            hid_ids=args.hid,
+            duration=args.duration,
+            interval=args.stats_interval,
+        )
+
+    # Handle capture replay (no Qt needed)
+    if args.replay:
+        from midi_hid_app.replay import run_replay
+
+        return run_replay(
+            args.replay, port=args.replay_port, speed=args.speed, loop=args.loop
+        )
+
+    # Handle the latency probe (no Qt needed)
+    if args.latency:
+        from midi_hid_app.latency import run_latency
+
+        return run_latency(args.samples, args.interval_ms / 1000)
+
+    # Handle the saturation benchmark (Qt is only loaded for its Qt pipelines)
+    if args.benchmark:
+        from midi_hid_app.saturation import run_benchmark
+
+        return run_benchmark(duration=args.benchmark_seconds)
+
     # Handle virtual port creation
     if args.create_virtual:
         if platform.system() in ("Darwin", "Linux"):
-            if midi_handler.create_virtual_port(args.create_virtual):
+            from midi_hid_app.midi_core import MIDIHandler
+
+            if MIDIHandler().create_virtual_port(args.create_virtual):
                 print(f"Created virtual MIDI port: {args.create_virtual}")
                 return 0
             else:
@@ -179,9 +298,26 @@ def main():
             print("Virtual MIDI ports are not supported on this platform")
             return 1
 
+    from midi_hid_app.startup import StartupProfile
+
+    profile = StartupProfile(enabled=args.profile_startup, start=STARTED)
+    profile.mark("arguments")
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from midi_hid_app.splash import CustomSplash
+    from midi_hid_app.simple_midi import SimpleMIDIHandler
+    from midi_hid_app.simple_hid import SimpleHIDHandler
+    from midi_hid_app.simple_ui import SimpleMainWindow
+    from midi_hid_app.capture_store import CaptureStore
+    from midi_hid_app.spill import SpillFile
+
+    profile.mark("Qt imports")
+
     # Create application and configure it
     app = QApplication(sys.argv)
     app = configure_application(app)
+    profile.mark("QApplication")
 
     # Show splash screen
     try:
@@ -195,23 +331,49 @@ def main():
 
         traceback.print_exc()
         splash = None
+    profile.mark("splash")
 
-    # Create handlers
+    # Create handlers; rtmidi and hidapi are loaded on first enumeration
     print("Initializing MIDI subsystem...")
     midi_handler = SimpleMIDIHandler()
 
     print("Initializing HID subsystem...")
     hid_handler = SimpleHIDHandler()
 
+    # Both handlers write into one capture store
+    capture_store = CaptureStore(
+        capacity=args.scrollback_events,
+        arena_size=int(args.scrollback_mb * 1024 * 1024),
+    )
+    if not args.no_spill:
+        capture_store.set_spill(SpillFile())
+    midi_handler.set_capture_store(capture_store)
+    hid_handler.set_capture_store(capture_store)
+    profile.mark("handlers")
+
     print("Loading main interface...")
 
     # Create main window
-    window = SimpleMainWindow(midi_handler, hid_handler)
+    window = SimpleMainWindow(midi_handler, hid_handler, capture_store)
+    profile.mark("main window")
 
     # Show main window and close splash if it exists
     window.show()
     if splash:
         splash.finish(window)
+    app.processEvents()
+    profile.mark("interactive")
+
+    # Enumerate devices only once the window is up
+    if args.profile_startup:
+
+        def on_devices_refreshed():
+            window.devices_refreshed.disconnect(on_devices_refreshed)
+            profile.mark("devices listed")
+            profile.report()
+
+        window.devices_refreshed.connect(on_devices_refreshed)
+    QTimer.singleShot(0, window.refresh_devices)
 
     # Run event loop
     return app.exec()
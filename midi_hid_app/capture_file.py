@@ -0,0 +1,434 @@
+# midi_hid_app/capture_file.py - Append-only binary capture files (.mhc)
+#
+# Layout (all integers are unsigned LEB128 varints unless noted):
+#
+#   header   b"MHIC", u8 version, varint device count, devices
+#   records  varint body length, body
+#   footer   b"MHIX", varint device count, devices,
+#            varint checkpoint count, checkpoints
+#   trailer  u64 little-endian footer offset, b"MHIE"
+#
+# A device is u8 kind, varint name length, UTF-8 name; its position in the
+# table is its source id. Record bodies start with a u8 type:
+#
+#   EVENT   varint source id, varint zigzag timestamp delta (ns), payload
+#   DEVICE  u8 kind, UTF-8 name (a source added after the header)
+#   SYNC    varint absolute timestamp (ns); the next delta is relative to it
+#
+# A SYNC record is written every CHECKPOINT_EVENTS events or
+# CHECKPOINT_NS of capture time, and the footer lists each one as
+# (event index, timestamp, file offset), so readers can seek to any time
+# without decoding what comes before. Files without a footer (the capture
+# was cut short) can still be read front to back.
+import mmap
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from midi_hid_app.capture_store import SOURCE_MIDI, SOURCE_HID
+
+MAGIC = b"MHIC"
+FOOTER_MAGIC = b"MHIX"
+TRAILER_MAGIC = b"MHIE"
+VERSION = 1
+
+TRAILER = struct.Struct("<Q4s")
+
+RECORD_EVENT = 0
+RECORD_DEVICE = 1
+RECORD_SYNC = 2
+
+KIND_CODES = {SOURCE_MIDI: 0, SOURCE_HID: 1}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+
+class CaptureFormatError(Exception):
+    """Raised when a file is not a valid capture"""
+
+
+def encode_varint(value, out):
+    """Append value as an unsigned LEB128 varint to a bytearray"""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(buf, pos):
+    """Return (value, next position) of the varint at buf[pos]"""
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_device(kind, name, out):
+    """Append a device table entry to a bytearray"""
+    name = name.encode("utf-8")
+    out.append(KIND_CODES[kind])
+    encode_varint(len(name), out)
+    out += name
+
+
+def decode_device(buf, pos):
+    """Return ((kind, name), next position) of the device entry at buf[pos]"""
+    kind = KIND_NAMES[buf[pos]]
+    length, pos = decode_varint(buf, pos + 1)
+    name = bytes(buf[pos : pos + length]).decode("utf-8", "replace")
+    return (kind, name), pos + length
+
+
+class CaptureWriter:
+    """Writes events to a capture file as they arrive
+
+    Safe to call from several reader threads at once. Call close() to write
+    the footer index; until then the file is still readable sequentially.
+    """
+
+    CHECKPOINT_EVENTS = 4096
+    CHECKPOINT_NS = 1_000_000_000
+    WRITE_BUFFER = 1024 * 1024
+
+    def __init__(self, path, sources=()):
+        self.path = path
+        self.sources = list(sources)  # source_id -> (kind, name)
+        self.event_count = 0
+
+        # Checkpoint index columns
+        self._index_events = array("Q")
+        self._index_times = array("q")
+        self._index_offsets = array("Q")
+
+        self._file = open(path, "wb", buffering=self.WRITE_BUFFER)
+        self._offset = 0
+        self._last_ns = None  # timestamp the next delta is relative to
+        self._checkpoint_ns = 0
+        self._lock = threading.Lock()
+
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        encode_varint(len(self.sources), header)
+        for kind, name in self.sources:
+            encode_device(kind, name, header)
+        self._write(header)
+
+    def _write(self, data):
+        self._file.write(data)
+        self._offset += len(data)
+
+    def _write_record(self, body):
+        record = bytearray()
+        encode_varint(len(body), record)
+        record += body
+        self._write(record)
+
+    def add_source(self, kind, name):
+        """Add a MIDI port or HID device and return its source id"""
+        with self._lock:
+            source_id = len(self.sources)
+            self.sources.append((kind, name))
+            body = bytearray((RECORD_DEVICE,))
+            body.append(KIND_CODES[kind])
+            body += name.encode("utf-8")
+            self._write_record(body)
+            return source_id
+
+    def write_event(self, source_id, payload, timestamp_ns):
+        """Append one event"""
+        with self._lock:
+            if (
+                self._last_ns is None
+                or self.event_count % self.CHECKPOINT_EVENTS == 0
+                or timestamp_ns - self._checkpoint_ns >= self.CHECKPOINT_NS
+            ):
+                self._index_events.append(self.event_count)
+                self._index_times.append(timestamp_ns)
+                self._index_offsets.append(self._offset)
+                body = bytearray((RECORD_SYNC,))
+                encode_varint(timestamp_ns, body)
+                self._write_record(body)
+                self._last_ns = self._checkpoint_ns = timestamp_ns
+
+            delta = timestamp_ns - self._last_ns
+            self._last_ns = timestamp_ns
+
+            body = bytearray((RECORD_EVENT,))
+            encode_varint(source_id, body)
+            encode_varint((delta << 1) ^ (delta >> 63), body)  # zigzag
+            body += payload if isinstance(payload, bytes) else bytes(payload)
+            self._write_record(body)
+            self.event_count += 1
+
+    def attach(self, store):
+        """Record every event appended to a CaptureStore from now on
+
+        Store sources the file already lists under the same id, as after
+        CaptureWriter(path, store.sources), keep that id; any other source
+        is added when its first event arrives. Returns the store listener;
+        pass it to store.remove_listener() to stop.
+        """
+        # store source id -> file source id
+        file_ids = {
+            source_id: source_id
+            for source_id, source in enumerate(list(store.sources))
+            if source_id < len(self.sources) and self.sources[source_id] == source
+        }
+
+        def listener(source_id, data, timestamp_ns):
+            file_id = file_ids.get(source_id)
+            if file_id is None:
+                file_id = file_ids[source_id] = self.add_source(
+                    *store.get_source(source_id)
+                )
+            self.write_event(file_id, data, timestamp_ns)
+
+        store.add_listener(listener)
+        return listener
+
+    def close(self):
+        """Write the footer index and close the file"""
+        with self._lock:
+            if self._file.closed:
+                return
+
+            footer = bytearray(FOOTER_MAGIC)
+            encode_varint(len(self.sources), footer)
+            for kind, name in self.sources:
+                encode_device(kind, name, footer)
+            encode_varint(len(self._index_events), footer)
+            for event_index, timestamp_ns, offset in zip(
+                self._index_events, self._index_times, self._index_offsets
+            ):
+                encode_varint(event_index, footer)
+                encode_varint(timestamp_ns, footer)
+                encode_varint(offset, footer)
+
+            footer_offset = self._offset
+            self._write(footer)
+            self._write(TRAILER.pack(footer_offset, TRAILER_MAGIC))
+            self._file.close()
+
+
+class CaptureReader:
+    """Memory-mapped, lazily decoded view of a capture file
+
+    Opening a closed capture only reads the header and the footer index, and
+    events are decoded one at a time when asked for, so opening is fast and
+    resident memory follows the pages actually touched rather than the file
+    size. Payloads are zero-copy memoryview slices of the mapping and stay
+    valid until close().
+
+    Provides the same read interface as CaptureStore (event_range,
+    get_event, get_events, get_source), so the Data Monitor can show it.
+    Not thread-safe; use one reader per thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise CaptureFormatError(f"{path} is empty")
+        self._view = memoryview(self._map)
+
+        try:
+            self._open()
+        except (IndexError, KeyError, struct.error):
+            self.close()
+            raise CaptureFormatError(f"{path} is not a valid capture file")
+        except CaptureFormatError:
+            self.close()
+            raise
+
+    def _open(self):
+        view = self._view
+        if bytes(view[:4]) != MAGIC:
+            raise CaptureFormatError(f"{self.path} is not a capture file")
+        if view[4] != VERSION:
+            raise CaptureFormatError(f"Unsupported capture version {view[4]}")
+
+        count, pos = decode_varint(view, 5)
+        self.sources = []  # source_id -> (kind, name)
+        for _ in range(count):
+            source, pos = decode_device(view, pos)
+            self.sources.append(source)
+        self._data_start = pos
+
+        # Checkpoint index columns
+        self._index_events = array("Q")
+        self._index_times = array("q")
+        self._index_offsets = array("Q")
+
+        self._cursor = None  # (next event index, file position, last timestamp)
+
+        size = len(view)
+        if size >= TRAILER.size and bytes(view[-4:]) == TRAILER_MAGIC:
+            self._end = TRAILER.unpack_from(view, size - TRAILER.size)[0]
+            self._read_footer()
+        else:
+            # Never closed; index it the slow way
+            self._end = size
+            self._scan()
+
+    def _read_footer(self):
+        view = self._view
+        pos = self._end
+        if bytes(view[pos : pos + 4]) != FOOTER_MAGIC:
+            raise CaptureFormatError(f"{self.path} has a damaged footer")
+
+        count, pos = decode_varint(view, pos + 4)
+        self.sources = []
+        for _ in range(count):
+            source, pos = decode_device(view, pos)
+            self.sources.append(source)
+
+        count, pos = decode_varint(view, pos)
+        for _ in range(count):
+            event_index, pos = decode_varint(view, pos)
+            timestamp_ns, pos = decode_varint(view, pos)
+            offset, pos = decode_varint(view, pos)
+            self._index_events.append(event_index)
+            self._index_times.append(timestamp_ns)
+            self._index_offsets.append(offset)
+
+        # Only the events after the last checkpoint need counting
+        self.event_count = 0
+        if count:
+            self.event_count = self._count_events(
+                self._index_events[-1], self._index_offsets[-1]
+            )
+
+    def _count_events(self, event_index, pos):
+        view = self._view
+        end = self._end
+        while pos < end:
+            length, body = decode_varint(view, pos)
+            pos = body + length
+            if view[body] == RECORD_EVENT:
+                event_index += 1
+        return event_index
+
+    def _scan(self):
+        """Build the checkpoint index and device table of an unclosed file"""
+        view = self._view
+        pos = self._data_start
+        end = self._end
+        event_index = 0
+        while pos < end:
+            try:
+                length, body = decode_varint(view, pos)
+            except IndexError:
+                break  # Truncated by a crash
+            if body + length > end or length == 0:
+                break
+
+            record_type = view[body]
+            if record_type == RECORD_EVENT:
+                event_index += 1
+            elif record_type == RECORD_SYNC:
+                self._index_events.append(event_index)
+                self._index_times.append(decode_varint(view, body + 1)[0])
+                self._index_offsets.append(pos)
+            elif record_type == RECORD_DEVICE:
+                name = bytes(view[body + 2 : body + length])
+                self.sources.append(
+                    (KIND_NAMES[view[body + 1]], name.decode("utf-8", "replace"))
+                )
+            pos = body + length
+
+        self._end = pos
+        self.event_count = event_index
+
+    def __len__(self):
+        return self.event_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def event_range(self):
+        """Return (first, next) event indexes, like CaptureStore.event_range()"""
+        return 0, self.event_count
+
+    def get_source(self, source_id):
+        """Return (kind, name) for a source id"""
+        return self.sources[source_id]
+
+    def get_event(self, index):
+        """Return (timestamp_ns, source_id, payload) of the event at index"""
+        if not 0 <= index < self.event_count:
+            raise IndexError(f"event {index} is not in the capture")
+
+        # Carry on from the previous read when possible, otherwise start at
+        # the nearest checkpoint before the event
+        checkpoint = bisect_right(self._index_events, index) - 1
+        cursor = self._cursor
+        if cursor is None or not self._index_events[checkpoint] <= cursor[0] <= index:
+            cursor = (
+                self._index_events[checkpoint],
+                self._index_offsets[checkpoint],
+                self._index_times[checkpoint],
+            )
+
+        event_index, pos, last_ns = cursor
+        view = self._view
+        while True:
+            length, body = decode_varint(view, pos)
+            pos = body + length
+            record_type = view[body]
+            if record_type == RECORD_EVENT:
+                source_id, body = decode_varint(view, body + 1)
+                zigzag, body = decode_varint(view, body)
+                last_ns += (zigzag >> 1) ^ -(zigzag & 1)
+                if event_index == index:
+                    self._cursor = (index + 1, pos, last_ns)
+                    return last_ns, source_id, view[body:pos]
+                event_index += 1
+            elif record_type == RECORD_SYNC:
+                last_ns = decode_varint(view, body + 1)[0]
+
+    def get_events(self, start, stop):
+        """Return the events in [start, stop)"""
+        start = max(start, 0)
+        stop = min(stop, self.event_count)
+        return [self.get_event(index) for index in range(start, stop)]
+
+    def find_time(self, timestamp_ns):
+        """Return the index of the first event at or after timestamp_ns"""
+        checkpoint = max(bisect_right(self._index_times, timestamp_ns) - 1, 0)
+        if not self._index_events:
+            return 0
+        for index in range(self._index_events[checkpoint], self.event_count):
+            if self.get_event(index)[0] >= timestamp_ns:
+                return index
+        return self.event_count
+
+    def close(self):
+        """Unmap the file"""
+        self._cursor = None
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Payload views are still alive; the mapping goes with them
+        self._file.close()
+
+
+def iter_capture(path):
+    """Yield (timestamp_ns, (kind, name), payload) for every event in a file
+
+    Also works on files that were never closed.
+    """
+    with CaptureReader(path) as reader:
+        for index in range(len(reader)):
+            timestamp_ns, source_id, payload = reader.get_event(index)
+            yield timestamp_ns, reader.sources[source_id], bytes(payload)
@@ -0,0 +1,218 @@
+# midi_hid_app/capture_store.py - Fixed-capacity ring buffer for captured events
+import time
+import threading
+from array import array
+
+# Source kinds
+SOURCE_MIDI = "midi"
+SOURCE_HID = "hid"
+
+
+class CaptureStore:
+    """Array-backed ring buffer holding the most recent MIDI/HID events
+
+    Every event gets a sequence number that keeps counting up across
+    wrap-arounds. Column arrays hold the timestamp, source id, payload length
+    and payload offset of each slot, and payloads live in one shared byte
+    arena, so appending never allocates per event and memory stays bounded
+    by capacity + arena_size.
+
+    With a SpillFile attached, evicted events are written to disk instead of
+    being dropped and stay readable through get_event()/get_events().
+    """
+
+    def __init__(self, capacity=65536, arena_size=4 * 1024 * 1024):
+        self.capacity = capacity
+        self.arena_size = arena_size
+
+        # Column arrays, indexed by seq % capacity
+        self.timestamps = array("q", bytes(8 * capacity))  # ns since the epoch
+        self.source_ids = array("H", bytes(2 * capacity))
+        self.lengths = array("I", bytes(4 * capacity))
+        self.offsets = array("I", bytes(4 * capacity))
+
+        # Shared payload arena; payloads are written back to back and never
+        # straddle the end, so each one is a single contiguous slice
+        self.arena = bytearray(arena_size)
+        self._arena_view = memoryview(self.arena)
+        self._write_pos = 0
+
+        # Optional on-disk overflow for evicted events (see set_spill)
+        self.spill = None
+
+        # Called as listener(source_id, data, timestamp_ns) for every append,
+        # in sequence order, from the appending thread
+        self._listeners = ()
+
+        self.sources = []  # source_id -> (kind, name)
+        self._source_ids = {}  # (kind, key) -> source_id
+
+        self.first_seq = 0  # oldest event still held
+        self.next_seq = 0  # sequence number of the next append
+        self.evicted = 0  # events overwritten since the last clear()
+
+        self._lock = threading.Lock()
+
+    def register_source(self, kind, name, key=None):
+        """Return the source id for a MIDI port or HID device, adding it if new
+
+        key identifies the source (e.g. a HID device path) and defaults to
+        name, which is only its label: two interfaces or identical devices
+        sharing a display name still get separate ids.
+        """
+        if key is None:
+            key = name
+        with self._lock:
+            source_id = self._source_ids.get((kind, key))
+            if source_id is None:
+                source_id = len(self.sources)
+                self.sources.append((kind, name))
+                self._source_ids[(kind, key)] = source_id
+            return source_id
+
+    def set_spill(self, spill):
+        """Write evicted events to a SpillFile instead of discarding them"""
+        with self._lock:
+            self.spill = spill
+
+    def add_listener(self, listener):
+        """Call listener(source_id, data, timestamp_ns) for every new event"""
+        with self._lock:
+            self._listeners += (listener,)
+
+    def remove_listener(self, listener):
+        """Stop calling a listener added with add_listener()"""
+        with self._lock:
+            self._listeners = tuple(l for l in self._listeners if l is not listener)
+
+    def get_source(self, source_id):
+        """Return (kind, name) for a source id"""
+        return self.sources[source_id]
+
+    def append(self, source_id, data, timestamp_ns=None):
+        """Append one event; safe to call from any reader thread"""
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+
+        size = len(data)
+        if size > self.arena_size:
+            # Never happens for sane arena sizes; keep the head of huge SysEx
+            data = data[: self.arena_size]
+            size = self.arena_size
+
+        with self._lock:
+            # Bytes consumed going forward from the current write position; any
+            # held payload starting inside that span is about to be overwritten
+            pos = self._write_pos
+            if pos + size > self.arena_size:
+                # Wrap, giving up the tail of the arena
+                consumed = self.arena_size - pos + size
+                pos = 0
+            else:
+                consumed = size
+            end = pos + size
+
+            capacity = self.capacity
+            while self.first_seq < self.next_seq:
+                slot = self.first_seq % capacity
+                if self.next_seq - self.first_seq < capacity:
+                    distance = (self.offsets[slot] - self._write_pos) % self.arena_size
+                    if distance >= consumed:
+                        break
+                if self.spill is not None:
+                    offset = self.offsets[slot]
+                    self.spill.append(
+                        self.first_seq,
+                        self.timestamps[slot],
+                        self.source_ids[slot],
+                        self._arena_view[offset : offset + self.lengths[slot]],
+                    )
+                self.first_seq += 1
+                self.evicted += 1
+
+            slot = self.next_seq % capacity
+            self.arena[pos:end] = data
+            self.timestamps[slot] = timestamp_ns
+            self.source_ids[slot] = source_id
+            self.lengths[slot] = size
+            self.offsets[slot] = pos
+            self._write_pos = end
+            self.next_seq += 1
+
+            for listener in self._listeners:
+                listener(source_id, data, timestamp_ns)
+
+    def __len__(self):
+        return self.next_seq - self.first_seq
+
+    def event_range(self):
+        """Return (first, next) sequence numbers of the readable events
+
+        This includes spilled events, which come before first_seq.
+        """
+        with self._lock:
+            spill = self.spill
+            if spill is not None and spill.next_seq == self.first_seq:
+                return spill.first_seq, self.next_seq
+            return self.first_seq, self.next_seq
+
+    def get_event(self, seq):
+        """Return (timestamp_ns, source_id, payload) for a sequence number"""
+        with self._lock:
+            if self.first_seq <= seq < self.next_seq:
+                slot = seq % self.capacity
+                offset = self.offsets[slot]
+                return (
+                    self.timestamps[slot],
+                    self.source_ids[slot],
+                    bytes(self.arena[offset : offset + self.lengths[slot]]),
+                )
+            spill = self.spill
+
+        # Evicted events are on disk; read them without blocking the writers
+        if spill is not None and seq in spill:
+            return spill.get_event(seq)
+        raise IndexError(f"event {seq} is not in the store")
+
+    def get_events(self, start, stop):
+        """Return the readable events in [start, stop)"""
+        with self._lock:
+            first = max(start, self.first_seq)
+            events = []
+            for seq in range(first, min(stop, self.next_seq)):
+                slot = seq % self.capacity
+                offset = self.offsets[slot]
+                events.append(
+                    (
+                        self.timestamps[slot],
+                        self.source_ids[slot],
+                        bytes(self.arena[offset : offset + self.lengths[slot]]),
+                    )
+                )
+            spill = self.spill
+
+        # Anything before the in-memory range comes from the spill file
+        if spill is not None and start < first:
+            spilled = [
+                spill.get_event(seq)
+                for seq in range(max(start, spill.first_seq), min(stop, first))
+                if seq in spill
+            ]
+            events = spilled + events
+        return events
+
+    def clear(self):
+        """Drop every held event (sources stay registered)"""
+        with self._lock:
+            self.first_seq = self.next_seq
+            self._write_pos = 0
+            self.evicted = 0
+            if self.spill is not None:
+                self.spill.clear(self.next_seq)
+
+    def close(self):
+        """Detach and delete the spill file, if any"""
+        with self._lock:
+            spill, self.spill = self.spill, None
+        if spill is not None:
+            spill.close()
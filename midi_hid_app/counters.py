@@ -0,0 +1,148 @@
+# midi_hid_app/counters.py - Per-source throughput and drop counters
+import threading
+import time
+from array import array
+
+# Slots per handler; far more sources than anyone connects at once
+MAX_SOURCES = 64
+
+
+class SourceCounters:
+    """Running totals per connected source, in preallocated arrays
+
+    Every source gets a slot when it is connected. Its reader thread adds
+    to messages[slot], bytes[slot], dropped[slot] and
+    overflow_passes[slot] directly, which never allocates; since only that
+    thread writes a slot no locking is needed. dropped counts events known
+    to be lost. overflow_passes counts read passes that found a device
+    queue full, so reports may have been lost there; it is not a count of
+    lost reports. Read the totals from any thread with snapshot().
+    """
+
+    def __init__(self, max_sources=MAX_SOURCES):
+        self.max_sources = max_sources
+        self.messages = array("Q", bytes(8 * max_sources))
+        self.bytes = array("Q", bytes(8 * max_sources))
+        self.dropped = array("Q", bytes(8 * max_sources))
+        self.overflow_passes = array("Q", bytes(8 * max_sources))
+
+        self.names = [None] * max_sources  # slot -> display name, None if free
+        self.keys = [None] * max_sources  # slot -> key
+        self._slots = {}  # key (port name, HID path) -> slot
+        self._lock = threading.Lock()
+
+    def register(self, key, name):
+        """Slot for a newly connected source, with its counters at zero"""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                try:
+                    slot = self.names.index(None)
+                except ValueError:
+                    raise RuntimeError(
+                        f"more than {self.max_sources} sources connected"
+                    ) from None
+                self._slots[key] = slot
+
+            for counts in (
+                self.messages,
+                self.bytes,
+                self.dropped,
+                self.overflow_passes,
+            ):
+                counts[slot] = 0
+            self.names[slot] = name
+            self.keys[slot] = key
+            return slot
+
+    def release(self, key):
+        """Free the slot of a disconnected source"""
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is not None:
+                self.names[slot] = None
+                self.keys[slot] = None
+
+    def slot_of(self, key):
+        """Slot of a connected source, or None"""
+        return self._slots.get(key)
+
+    def snapshot(self):
+        """[(key, name, messages, bytes, dropped, overflow passes), ...]"""
+        with self._lock:
+            return [
+                (
+                    self.keys[slot],
+                    name,
+                    self.messages[slot],
+                    self.bytes[slot],
+                    self.dropped[slot],
+                    self.overflow_passes[slot],
+                )
+                for slot, name in enumerate(self.names)
+                if name is not None
+            ]
+
+
+class ThroughputMeter:
+    """Turns SourceCounters totals into per-second rates
+
+    Call sample() periodically; each call returns one
+    (name, messages/s, bytes/s, messages, dropped, overflow passes) row
+    per source, with the rates taken over the time since the previous
+    call. Sources are told apart by their key, so two with the same
+    display name keep separate rates.
+    """
+
+    def __init__(self, *counters):
+        self.counters = counters
+        self._previous = {}  # (counters index, key) -> (messages, bytes)
+        self._previous_time = None
+
+    def sample(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self._previous_time if self._previous_time else 0
+        self._previous_time = now
+
+        rows = []
+        previous = {}
+        for index, counters in enumerate(self.counters):
+            for (
+                key,
+                name,
+                messages,
+                byte_count,
+                dropped,
+                overflows,
+            ) in counters.snapshot():
+                last_messages, last_bytes = self._previous.get(
+                    (index, key), (messages, byte_count)
+                )
+                previous[(index, key)] = (messages, byte_count)
+                if messages < last_messages:
+                    # Reconnected since the last sample
+                    last_messages = last_bytes = 0
+                if elapsed > 0:
+                    message_rate = (messages - last_messages) / elapsed
+                    byte_rate = (byte_count - last_bytes) / elapsed
+                else:
+                    message_rate = byte_rate = 0.0
+                rows.append(
+                    (name, message_rate, byte_rate, messages, dropped, overflows)
+                )
+        self._previous = previous
+        return rows
+
+
+def format_throughput(rows):
+    """Compact one-line summary of ThroughputMeter.sample() rows"""
+    parts = []
+    for name, message_rate, byte_rate, messages, dropped, overflows in rows:
+        text = f"{name}: {message_rate:,.0f} msg/s {byte_rate / 1000:,.1f} kB/s ({messages:,})"
+        if dropped:
+            text += f" {dropped:,} dropped"
+        if overflows:
+            text += f" {overflows:,} possible overflow passes"
+        parts.append(text)
+    return " | ".join(parts)
@@ -0,0 +1,122 @@
+# midi_hid_app/device_list_model.py - List models for the device combo boxes
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from midi_hid_app.hid_core import device_display_name
+
+# Prefix shown in front of connected devices
+CONNECTED_MARKER = "► "
+
+
+class DeviceListModel(QAbstractListModel):
+    """Device list keyed by a stable identity (port name, HID path)
+
+    set_items() applies the difference to the current rows as row
+    removals, insertions, moves and changes, so views keep their
+    selection and only the affected rows are redrawn. set_connected() updates the
+    connection marker of a single row.
+    """
+
+    # Role returning the key of a row
+    KeyRole = Qt.UserRole
+
+    def __init__(self, key_func, label_func, parent=None):
+        super().__init__(parent)
+        self.key_func = key_func
+        self.label_func = label_func
+        self._keys = []  # row -> key
+        self._items = {}  # key -> item
+        self._connected = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._keys)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        key = self._keys[index.row()]
+        if role == Qt.DisplayRole:
+            label = self.label_func(self._items[key])
+            if key in self._connected:
+                return CONNECTED_MARKER + label
+            return label
+        if role == self.KeyRole:
+            return key
+        return None
+
+    def key(self, row):
+        """Key of a row, or None for an invalid row"""
+        if 0 <= row < len(self._keys):
+            return self._keys[row]
+        return None
+
+    def item(self, row):
+        """Item (port name or device info) of a row, or None"""
+        key = self.key(row)
+        return None if key is None else self._items[key]
+
+    def row_of(self, key):
+        """Row of a key, or -1 if it is not listed"""
+        try:
+            return self._keys.index(key)
+        except ValueError:
+            return -1
+
+    def set_items(self, items):
+        """Make the rows match items, in their order, with minimal changes"""
+        new = {}
+        for item in items:
+            new[self.key_func(item)] = item
+
+        # Removals, last row first so earlier row numbers stay valid
+        for row in range(len(self._keys) - 1, -1, -1):
+            if self._keys[row] not in new:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._items[self._keys.pop(row)]
+                self.endRemoveRows()
+
+        # Row by row in scan order: rows above position already match, so
+        # new keys are inserted and listed ones moved up to it
+        for position, (key, item) in enumerate(new.items()):
+            if key not in self._items:
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._keys.insert(position, key)
+                self._items[key] = item
+                self.endInsertRows()
+                continue
+
+            row = self._keys.index(key, position)
+            if row != position:
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), position)
+                self._keys.insert(position, self._keys.pop(row))
+                self.endMoveRows()
+            if self._items[key] != item:
+                self._items[key] = item
+                self._emit_row_changed(key)
+
+    def set_connected(self, key, connected):
+        """Show or hide the connected marker of one row"""
+        if connected == (key in self._connected):
+            return
+        if connected:
+            self._connected.add(key)
+        else:
+            self._connected.discard(key)
+        self._emit_row_changed(key)
+
+    def _emit_row_changed(self, key):
+        row = self.row_of(key)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+
+def midi_port_model(parent=None):
+    """Model for MIDI port names"""
+    return DeviceListModel(lambda port: port, lambda port: port, parent)
+
+
+def hid_device_model(parent=None):
+    """Model for HID device info dicts, keyed by device path"""
+    return DeviceListModel(lambda device: device["path"], device_display_name, parent)
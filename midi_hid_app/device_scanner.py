@@ -0,0 +1,173 @@
+# midi_hid_app/device_scanner.py - Device enumeration off the GUI thread
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+
+class _ScanJob(QRunnable):
+    """Runs one enumeration call on a pool thread and reports the result"""
+
+    def __init__(self, enumerate_devices, done_signal):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.enumerate_devices = enumerate_devices
+        self.done_signal = done_signal
+
+    def run(self):
+        try:
+            result = self.enumerate_devices()
+        except Exception as e:
+            print(f"Error enumerating devices: {e}")
+            result = None
+        self.done_signal.emit(result)
+
+
+class DeviceScanner(QObject):
+    """Enumerates MIDI ports and HID devices on a thread pool
+
+    MIDI and HID are scanned in parallel. Results come back on the GUI
+    thread as diffs against the previous scan: midi_ports_changed and
+    hid_devices_changed are only emitted when something was added or
+    removed (and always after the first scan).
+
+    request_scan() starts a scan straight away when idle; requests made
+    while a scan runs, or within DEBOUNCE_MS after one, are folded into a
+    single follow-up scan.
+
+    watch_hotplug() rescans when a HotplugMonitor reports a device coming
+    or going, once HOTPLUG_SETTLE_MS have passed without further events
+    (plugging in one device produces a burst of them).
+    """
+
+    DEBOUNCE_MS = 250
+    HOTPLUG_SETTLE_MS = 300
+
+    # True while a scan is running
+    scanning_changed = Signal(bool)
+
+    # ports_by_type, [added port names], [removed port names]
+    midi_ports_changed = Signal(dict, list, list)
+
+    # devices, [added device infos], [removed device infos]
+    hid_devices_changed = Signal(list, list, list)
+
+    # Emitted after every scan, changed or not
+    scan_finished = Signal()
+
+    # Job results, delivered from pool threads
+    _midi_done = Signal(object)
+    _hid_done = Signal(object)
+
+    # Hotplug events, delivered from the monitor thread: action, subsystem, name
+    _hotplug_event = Signal(str, str, object)
+
+    def __init__(self, midi_handler, hid_handler, parent=None):
+        super().__init__(parent)
+        self.midi_handler = midi_handler
+        self.hid_handler = hid_handler
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+
+        self.midi_ports = None  # Last ports_by_type, None before the first scan
+        self.hid_devices = None  # Last device list, None before the first scan
+
+        self.scanning = False
+        self._pending = False
+        self._jobs = {}  # "midi"/"hid" -> running _ScanJob
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self._debounce_timer.timeout.connect(self._on_debounce_timeout)
+
+        self._hotplug_timer = QTimer(self)
+        self._hotplug_timer.setSingleShot(True)
+        self._hotplug_timer.setInterval(self.HOTPLUG_SETTLE_MS)
+        self._hotplug_timer.timeout.connect(self.request_scan)
+        self._hotplug_monitor = None
+        self._hotplug_subscriber = None
+
+        self._midi_done.connect(self._on_midi_done)
+        self._hid_done.connect(self._on_hid_done)
+        self._hotplug_event.connect(self._on_hotplug_event)
+
+    def request_scan(self):
+        """Scan now, or once the running scan and quiet period are over"""
+        if self.scanning or self._debounce_timer.isActive():
+            self._pending = True
+            return
+        self._start_scan()
+
+    def watch_hotplug(self, monitor):
+        """Rescan whenever monitor (a hotplug.HotplugMonitor) sees a change"""
+        self._unwatch_hotplug()
+        self._hotplug_monitor = monitor
+        self._hotplug_subscriber = monitor.event_bus.subscribe(self._hotplug_event.emit)
+
+    def _unwatch_hotplug(self):
+        if self._hotplug_monitor is not None:
+            self._hotplug_monitor.event_bus.unsubscribe(self._hotplug_subscriber)
+            self._hotplug_monitor = self._hotplug_subscriber = None
+
+    def _on_hotplug_event(self, action, subsystem, name):
+        self._hotplug_timer.start()
+
+    def _start_scan(self):
+        self._pending = False
+        self.scanning = True
+        self.scanning_changed.emit(True)
+
+        self._jobs = {
+            "midi": _ScanJob(self.midi_handler.get_ports_by_type, self._midi_done),
+            "hid": _ScanJob(self.hid_handler.get_devices, self._hid_done),
+        }
+        for job in self._jobs.values():
+            self.pool.start(job)
+
+    def _job_finished(self, kind):
+        self._jobs.pop(kind, None)
+        if self._jobs:
+            return
+
+        self.scanning = False
+        self.scanning_changed.emit(False)
+        self.scan_finished.emit()
+        self._debounce_timer.start()
+
+    def _on_debounce_timeout(self):
+        if self._pending:
+            self._start_scan()
+
+    def _on_midi_done(self, ports_by_type):
+        if ports_by_type is not None:
+            old = self.midi_ports["all"] if self.midi_ports else []
+            new = ports_by_type["all"]
+            old_set, new_set = set(old), set(new)
+            added = [port for port in new if port not in old_set]
+            removed = [port for port in old if port not in new_set]
+
+            if self.midi_ports is None or added or removed:
+                self.midi_ports = ports_by_type
+                self.midi_ports_changed.emit(ports_by_type, added, removed)
+
+        self._job_finished("midi")
+
+    def _on_hid_done(self, devices):
+        if devices is not None:
+            old = {device["path"]: device for device in self.hid_devices or ()}
+            new = {device["path"]: device for device in devices}
+            added = [device for path, device in new.items() if path not in old]
+            removed = [device for path, device in old.items() if path not in new]
+
+            if self.hid_devices is None or added or removed:
+                self.hid_devices = devices
+                self.hid_devices_changed.emit(devices, added, removed)
+
+        self._job_finished("hid")
+
+    def shutdown(self, timeout_ms=2000):
+        """Stop follow-up scans and wait for a running scan to finish"""
+        self._pending = False
+        self._debounce_timer.stop()
+        self._hotplug_timer.stop()
+        self._unwatch_hotplug()
+        self.pool.waitForDone(timeout_ms)
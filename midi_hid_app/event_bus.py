@@ -0,0 +1,138 @@
+# midi_hid_app/event_bus.py - Qt-free publish/subscribe for the core handlers
+import threading
+from collections import deque
+
+# What BoundedEventQueue.put() does when the queue is full
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+BLOCK = "block"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class EventBus:
+    """Calls every subscriber with the published arguments
+
+    Subscribers run synchronously on the publishing thread (usually a device
+    reader thread), so they should only do cheap work or hand the event off,
+    e.g. to an EventQueue. Subscribing and publishing need no lock: the
+    subscriber tuple is replaced, never mutated.
+    """
+
+    def __init__(self):
+        self._subscribers = ()
+
+    def subscribe(self, callback):
+        """Add a subscriber; returns it for use with unsubscribe()"""
+        self._subscribers += (callback,)
+        return callback
+
+    def unsubscribe(self, callback):
+        """Remove a subscriber added with subscribe()"""
+        self._subscribers = tuple(s for s in self._subscribers if s is not callback)
+
+    def publish(self, *args):
+        """Deliver one event to every subscriber"""
+        for callback in self._subscribers:
+            callback(*args)
+
+    def __bool__(self):
+        return bool(self._subscribers)
+
+
+class EventQueue:
+    """Unbounded FIFO between reader threads and a consumer
+
+    deque.append() and deque.popleft() are atomic, so producers never take
+    a lock and the consumer drains everything queued so far in one call.
+    """
+
+    def __init__(self):
+        self._items = deque()
+
+    def put(self, item):
+        """Queue one item; safe from any thread"""
+        self._items.append(item)
+
+    def drain(self):
+        """Remove and return everything queued so far, oldest first"""
+        items = []
+        popleft = self._items.popleft
+        try:
+            for _ in range(len(self._items)):
+                items.append(popleft())
+        except IndexError:
+            pass  # Drained concurrently from another thread
+        return items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class BoundedEventQueue:
+    """FIFO with a fixed capacity between reader threads and a consumer
+
+    When the queue is full put() applies the overflow policy: DROP_OLDEST
+    discards the oldest queued item to make room, DROP_NEWEST discards the
+    new one and BLOCK makes the reader wait for room. A blocked reader
+    gives up after block_timeout seconds and drops the new item, so a
+    stalled consumer can slow a device down but never hang it for good.
+
+    on_drop(item) is called for every discarded item with the queue lock
+    held, so drop counts stay exact with several readers.
+    """
+
+    def __init__(
+        self, capacity=4096, policy=DROP_OLDEST, on_drop=None, block_timeout=1.0
+    ):
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self.on_drop = on_drop
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.configure(capacity, policy)
+
+    def configure(self, capacity, policy):
+        """Change the capacity and overflow policy"""
+        if policy not in POLICIES:
+            raise ValueError(f"unknown overflow policy {policy!r}")
+        with self._lock:
+            self.capacity = max(1, int(capacity))
+            self.policy = policy
+            while len(self._items) > self.capacity:
+                self._drop(self._items.popleft())
+            self._not_full.notify_all()
+
+    def _drop(self, item):
+        self.dropped += 1
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def put(self, item):
+        """Queue one item; returns False if it was dropped instead"""
+        with self._lock:
+            items = self._items
+            if len(items) >= self.capacity:
+                if self.policy == BLOCK:
+                    self._not_full.wait_for(
+                        lambda: len(items) < self.capacity, self.block_timeout
+                    )
+                if len(items) >= self.capacity:
+                    if self.policy == DROP_OLDEST:
+                        self._drop(items.popleft())
+                    else:
+                        self._drop(item)
+                        return False
+            items.append(item)
+            return True
+
+    def drain(self):
+        """Remove and return everything queued so far, oldest first"""
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+            self._not_full.notify_all()
+        return items
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,274 @@
+# midi_hid_app/event_model.py - Table model over the capture store
+from datetime import datetime
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from midi_hid_app.capture_store import SOURCE_MIDI
+
+
+def describe_midi_message(data):
+    """Return a short human readable description of a MIDI message"""
+    if not data:
+        return ""
+
+    status = data[0]
+    message_type = status & 0xF0
+    channel = (status & 0x0F) + 1
+
+    if message_type == 0x80 and len(data) >= 3:
+        return f"Note Off (Ch: {channel}, Note: {data[1]}, Velocity: {data[2]})"
+    elif message_type == 0x90 and len(data) >= 3:
+        if data[2] == 0:
+            return f"Note Off (Ch: {channel}, Note: {data[1]})"
+        return f"Note On (Ch: {channel}, Note: {data[1]}, Velocity: {data[2]})"
+    elif message_type == 0xB0 and len(data) >= 3:
+        return f"Control Change (Ch: {channel}, Control: {data[1]}, Value: {data[2]})"
+    elif message_type == 0xE0 and len(data) >= 3:
+        value = (data[2] << 7) | data[1]
+        return f"Pitch Bend (Ch: {channel}, Value: {value})"
+    elif status == 0xF0:
+        return "SysEx"
+    return ""
+
+
+class EventTableModel(QAbstractTableModel):
+    """Exposes the events of a capture store as table rows
+
+    Rows are only formatted when the view asks for them, so the cost of a
+    repaint depends on the visible rows rather than on the session length.
+    Call sync() to pick up new (and evicted) events in one batch.
+
+    The view only ever gets a window of at most MAX_ROWS events, so its
+    own per-row memory stays flat too. The window normally follows the
+    newest events; page_older() and page_newer() move it when the view
+    scrolls to its edge, paging spilled events back in from disk.
+
+    HID reports of the store the model was created with are described by
+    the decoder (a hid_descriptor.DeviceDecoder) set for their source id
+    with set_hid_decoder(), if any.
+    """
+
+    COLUMNS = ["Time", "Source", "Data", "Description"]
+    TIME_COLUMN, SOURCE_COLUMN, DATA_COLUMN, DESCRIPTION_COLUMN = range(4)
+
+    # Decoded rows kept around for repeated data() calls
+    CACHE_SIZE = 1024
+
+    # Rows exposed to the view at most, and how far one page moves the window
+    MAX_ROWS = 100_000
+    PAGE_ROWS = 25_000
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.live_store = store
+        self.interpret_midi = True
+        self.hid_decoders = {}  # live_store source id -> DeviceDecoder
+        self._first, self._stop = store.event_range()  # readable events
+        self._top = self._bottom = self._stop  # seqs of the rows shown
+        self._show_newest()
+        self._cache = {}  # seq -> formatted row
+
+    def set_store(self, store, newest=True):
+        """Show the events of another store (e.g. a CaptureReader)
+
+        The window starts at the newest events, or with newest=False at
+        the oldest.
+        """
+        self.beginResetModel()
+        self.store = store
+        self._first, self._stop = store.event_range()
+        if newest:
+            self._show_newest()
+        else:
+            self._top = self._first
+            self._bottom = min(self._stop, self._first + self.MAX_ROWS)
+        self._cache.clear()
+        self.endResetModel()
+
+    def _show_newest(self):
+        self._bottom = self._stop
+        self._top = max(self._first, self._stop - self.MAX_ROWS)
+
+    @property
+    def following(self):
+        """True while the window ends at the newest event"""
+        return self._bottom == self._stop
+
+    def has_older(self):
+        return self._top > self._first
+
+    def has_newer(self):
+        return self._bottom < self._stop
+
+    def seq_of_row(self, row):
+        return self._top + row
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._bottom - self._top
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        row = self.format_row(self._top + index.row())
+        return row[index.column()] if row else None
+
+    def format_row(self, seq):
+        """Return the display strings of one event, or None if it is gone"""
+        row = self._cache.get(seq)
+        if row is not None:
+            return row
+
+        try:
+            timestamp_ns, source_id, payload = self.store.get_event(seq)
+        except IndexError:
+            return None
+
+        kind, name = self.store.get_source(source_id)
+        when = datetime.fromtimestamp(timestamp_ns / 1e9)
+        time_str = when.strftime("%H:%M:%S.%f")[:-3]
+        hex_data = " ".join([f"{b:02X}" for b in payload])
+        description = ""
+        if kind == SOURCE_MIDI:
+            if self.interpret_midi:
+                description = describe_midi_message(payload)
+            source = f"MIDI [{name}]"
+        else:
+            decoder = None
+            if self.store is self.live_store:
+                decoder = self.hid_decoders.get(source_id)
+            if decoder is not None:
+                description = decoder.describe(payload)
+            source = f"HID [{name}]"
+
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache.clear()
+        row = self._cache[seq] = (time_str, source, hex_data, description)
+        return row
+
+    def set_interpret_midi(self, enabled):
+        """Show or hide decoded MIDI descriptions"""
+        self.interpret_midi = enabled
+        self._descriptions_changed()
+
+    def set_hid_decoder(self, source_id, decoder):
+        """Describe the reports of a live HID source with decoder (None: don't)"""
+        if decoder is None:
+            self.hid_decoders.pop(source_id, None)
+        else:
+            self.hid_decoders[source_id] = decoder
+        self._descriptions_changed()
+
+    def _descriptions_changed(self):
+        self._cache.clear()
+        if self.rowCount():
+            self.dataChanged.emit(
+                self.index(0, self.DESCRIPTION_COLUMN),
+                self.index(self.rowCount() - 1, self.DESCRIPTION_COLUMN),
+            )
+
+    def sync(self, follow=False):
+        """Apply every append and eviction since the last sync as one batch
+
+        New events are only added while the window follows the newest
+        ones; follow=True first brings a paged-back window back to them.
+        Returns True if rows were added.
+        """
+        first, stop = self.store.event_range()
+        if first == self._first and stop == self._stop:
+            return False
+
+        following = self.following
+        if (
+            first < self._first
+            or first >= self._bottom
+            or (follow and not following and stop > self._stop)
+        ):
+            # Everything we showed is gone, the store was cleared, or a
+            # paged-back window jumps back to the newest events
+            return self._reset_to_newest(first, stop)
+        self._first, self._stop = first, stop
+
+        top = max(self._top, first)
+        if following:
+            top = max(top, stop - self.MAX_ROWS)
+        if top >= self._bottom:
+            return self._reset_to_newest(first, stop)  # A burst beyond MAX_ROWS
+
+        if top > self._top:
+            self.beginRemoveRows(QModelIndex(), 0, top - self._top - 1)
+            self._top = top
+            self.endRemoveRows()
+
+        if following and stop > self._bottom:
+            rows = self._bottom - self._top
+            self.beginInsertRows(QModelIndex(), rows, rows + stop - self._bottom - 1)
+            self._bottom = stop
+            self.endInsertRows()
+            return True
+        return False
+
+    def _reset_to_newest(self, first, stop):
+        self.beginResetModel()
+        self._first, self._stop = first, stop
+        self._show_newest()
+        self._cache.clear()
+        self.endResetModel()
+        return stop > first
+
+    def page_older(self, count=None):
+        """Move the window count rows (PAGE_ROWS) back in time
+
+        Returns how many rows were added at the top, i.e. how far the rows
+        already shown moved down.
+        """
+        top = max(self._first, self._top - (count or self.PAGE_ROWS))
+        added = self._top - top
+        if not added:
+            return 0
+
+        self.beginInsertRows(QModelIndex(), 0, added - 1)
+        self._top = top
+        self.endInsertRows()
+
+        excess = self._bottom - self._top - self.MAX_ROWS
+        if excess > 0:
+            rows = self._bottom - self._top
+            self.beginRemoveRows(QModelIndex(), rows - excess, rows - 1)
+            self._bottom -= excess
+            self.endRemoveRows()
+        return added
+
+    def page_newer(self, count=None):
+        """Move the window count rows (PAGE_ROWS) forward in time
+
+        Returns how many rows were removed from the top, i.e. how far the
+        rows still shown moved up.
+        """
+        bottom = min(self._stop, self._bottom + (count or self.PAGE_ROWS))
+        if bottom == self._bottom:
+            return 0
+
+        rows = self._bottom - self._top
+        self.beginInsertRows(QModelIndex(), rows, rows + bottom - self._bottom - 1)
+        self._bottom = bottom
+        self.endInsertRows()
+
+        excess = self._bottom - self._top - self.MAX_ROWS
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            self._top += excess
+            self.endRemoveRows()
+            return excess
+        return 0
@@ -0,0 +1,185 @@
+# midi_hid_app/headless.py - Capture MIDI/HID straight to disk without Qt
+import os
+import time
+from midi_hid_app.capture_store import SOURCE_MIDI, SOURCE_HID
+from midi_hid_app.capture_file import CaptureWriter
+from midi_hid_app.hid_core import device_display_name
+
+
+def parse_hid_id(text):
+    """Parse "VID:PID" (hex) into a (vendor_id, product_id) tuple"""
+    vendor, _, product = text.partition(":")
+    try:
+        return int(vendor, 16), int(product, 16)
+    except ValueError:
+        raise ValueError(f"Invalid HID id '{text}', expected VID:PID in hex")
+
+
+class HeadlessCapture:
+    """Streams events from MIDI ports and HID devices into a capture file
+
+    Uses the Qt-free core handlers; their bus subscribers write straight
+    into the CaptureWriter and bump a counter, nothing else. midi and hid
+    are the core handlers to read from; by default each is created the
+    first time it is needed.
+    """
+
+    def __init__(self, path, midi=None, hid=None):
+        self.writer = CaptureWriter(path)
+        self.sources = []  # source_id -> name
+        self.counts = []  # source_id -> [events, bytes]
+        self._source_ids = {}  # port name or HID device path -> source_id
+
+        # Created on first use, so a HID-only capture never loads rtmidi
+        self._midi = None
+        self._hid = None
+        if midi is not None:
+            self._set_midi(midi)
+        if hid is not None:
+            self._set_hid(hid)
+
+    def _set_midi(self, midi):
+        self._midi = midi
+        midi.message_bus.subscribe(self._on_midi_message)
+
+    def _set_hid(self, hid):
+        self._hid = hid
+        hid.report_bus.subscribe(self._on_hid_reports)
+
+    def _add_source(self, kind, name, key=None):
+        source_id = self.writer.add_source(kind, name)
+        self.sources.append(name)
+        self.counts.append([0, 0])
+        self._source_ids[name if key is None else key] = source_id
+        return source_id
+
+    def open_midi(self, port_spec):
+        """Open the MIDI input whose name matches port_spec (exact or substring)"""
+        if self._midi is None:
+            from midi_hid_app.midi_core import MIDIHandler
+
+            self._set_midi(MIDIHandler())
+
+        ports = self._midi.get_ports()
+        matches = [p for p in ports if p == port_spec] or [
+            p for p in ports if port_spec.lower() in p.lower()
+        ]
+        if not matches:
+            print(f"MIDI port '{port_spec}' not found")
+            return False
+
+        port_name = matches[0]
+        self._add_source(SOURCE_MIDI, port_name)
+        if not self._midi.connect_port(port_name):
+            return False
+        print(f"Capturing MIDI port: {port_name}")
+        return True
+
+    def _on_midi_message(self, data, time_stamp, port_name):
+        source_id = self._source_ids[port_name]
+        self.writer.write_event(source_id, data, time.time_ns())
+        counts = self.counts[source_id]
+        counts[0] += 1
+        counts[1] += len(data)
+
+    def open_hid(self, vendor_id, product_id):
+        """Open every HID interface with the given vendor/product id"""
+        if self._hid is None:
+            from midi_hid_app.hid_core import HIDHandler
+
+            self._set_hid(HIDHandler())
+
+        devices = [
+            device_info
+            for device_info in self._hid.get_devices()
+            if device_info.get("vendor_id") == vendor_id
+            and device_info.get("product_id") == product_id
+        ]
+        if not devices:
+            print(f"HID device {vendor_id:04x}:{product_id:04x} not found")
+            return False
+
+        opened = False
+        for device_info in devices:
+            device_name = device_display_name(device_info)
+            path = device_info["path"]
+            if path not in self._source_ids:
+                self._add_source(SOURCE_HID, device_name, path)
+            if self._hid.connect_device(device_info):
+                print(f"Capturing HID device: {device_name}")
+                opened = True
+        return opened
+
+    def _on_hid_reports(self, device_info, reports, device_name):
+        source_id = self._source_ids[device_info["path"]]
+        counts = self.counts[source_id]
+        for timestamp_ns, report in reports:
+            self.writer.write_event(source_id, report, timestamp_ns)
+            counts[1] += len(report)
+        counts[0] += len(reports)
+
+    def run(self, duration=None, interval=5.0):
+        """Capture until duration seconds pass (or Ctrl+C), printing rates"""
+        start = time.monotonic()
+        last_time = start
+        last_counts = [list(c) for c in self.counts]
+        try:
+            while duration is None or time.monotonic() - start < duration:
+                remaining = interval
+                if duration is not None:
+                    remaining = min(interval, duration - (time.monotonic() - start))
+                time.sleep(max(remaining, 0))
+
+                now = time.monotonic()
+                self.print_rates(now - last_time, last_counts, now - start)
+                last_time = now
+                last_counts = [list(c) for c in self.counts]
+        except KeyboardInterrupt:
+            print("Capture interrupted")
+        finally:
+            self.close()
+
+    def print_rates(self, elapsed, last_counts, total_elapsed):
+        """Print one rate summary line per source"""
+        print(f"--- {total_elapsed:8.1f}s, {self.writer.event_count} events ---")
+        for source_id, name in enumerate(self.sources):
+            events, size = self.counts[source_id]
+            last_events, last_size = last_counts[source_id]
+            print(
+                f"  {name}: {(events - last_events) / elapsed:10.1f} msg/s "
+                f"{(size - last_size) / elapsed:10.1f} B/s  total {events}"
+            )
+
+    def close(self):
+        """Stop the readers and finish the capture file"""
+        if self._midi is not None:
+            self._midi.close_all()
+        if self._hid is not None:
+            self._hid.close_all()
+        self.writer.close()
+
+
+def run_capture(path, midi_ports=(), hid_ids=(), duration=None, interval=5.0):
+    """Entry point for main.py --capture; returns a process exit code"""
+    if not midi_ports and not hid_ids:
+        print("Nothing to capture; pass --midi PORT and/or --hid VID:PID")
+        return 1
+
+    try:
+        hid_ids = [parse_hid_id(text) for text in hid_ids]
+    except ValueError as e:
+        print(e)
+        return 1
+
+    capture = HeadlessCapture(path)
+    opened = [capture.open_midi(port) for port in midi_ports]
+    opened += [capture.open_hid(*ids) for ids in hid_ids]
+    if not any(opened):
+        capture.close()
+        os.remove(path)
+        return 1
+
+    print(f"Writing to {path}" + (f" for {duration}s" if duration else ""))
+    capture.run(duration, interval)
+    print(f"Wrote {capture.writer.event_count} events to {path}")
+    return 0
@@ -0,0 +1,344 @@
+# midi_hid_app/hid_core.py - Qt-free HID handling
+import os
+import platform
+import time
+import threading
+from midi_hid_app.capture_store import SOURCE_HID
+from midi_hid_app.counters import SourceCounters
+from midi_hid_app.event_bus import EventBus
+from midi_hid_app.hid_descriptor import (
+    DescriptorError,
+    DeviceDecoder,
+    max_input_report_length,
+)
+from midi_hid_app.hidraw_backend import (
+    HIDRAW_READ_SIZE,
+    HidrawPoller,
+    find_hidraw_node,
+    open_hidraw,
+    read_hidraw_descriptor,
+)
+
+# Reports the Linux hidraw driver queues per open device before it starts
+# dropping them; a poller pass that reads this many may have found the
+# queue overflowing
+HIDRAW_QUEUE_REPORTS = 64
+
+# hidapi read size for devices without a readable report descriptor
+DEFAULT_READ_SIZE = 64
+
+
+def device_display_name(device_info):
+    """Return the friendly name used for a HID device everywhere in the app"""
+    vendor_id = device_info.get("vendor_id", 0)
+    product_id = device_info.get("product_id", 0)
+    manufacturer = device_info.get("manufacturer_string", "Unknown")
+    product = device_info.get("product_string", "Unknown")
+    return f"{manufacturer} {product} ({vendor_id:04x}:{product_id:04x})"
+
+
+class HIDHandler:
+    """HID device handling without any Qt dependency
+
+    Each connected device is drained of every queued report, which go
+    into the capture store (if one is set); the pass is then published on
+    report_bus as (device_info, [(timestamp_ns, data), ...], device_name),
+    with the integer time.time_ns() stamps the store got. SimpleHIDHandler
+    wraps this for the GUI. hidapi is only loaded the first time devices
+    are listed or opened.
+
+    On Linux, devices are opened through their /dev/hidraw node (found
+    from the hidapi path by find_hidraw_node, whichever hidapi backend is
+    installed) and all of them are read from a single HidrawPoller thread
+    that only wakes up when a device has data. Devices without a node
+    (and every device with use_hidraw=False) get a hidapi reader thread
+    each.
+
+    Reads are sized to the longest input report in the device's report
+    descriptor, which is kept in report_descriptors. The descriptor is
+    also compiled into a DeviceDecoder (report_decoders) that turns
+    reports into axis and button values.
+    """
+
+    def __init__(self, use_hidraw=None):
+        # path -> (device, thread, stop_event); (fd, None, None) for hidraw,
+        # (None, None, None) once a hidraw node has gone away
+        self.connected_devices = {}
+
+        # One thread reading every hidraw device
+        if use_hidraw is None:
+            use_hidraw = platform.system() == "Linux"
+        self.use_hidraw = use_hidraw
+        self.poller = HidrawPoller()
+
+        # path -> report descriptor (bytes) of connected devices, if readable
+        self.report_descriptors = {}
+        # path -> DeviceDecoder compiled from that descriptor
+        self.report_decoders = {}
+
+        # Per-device report, byte and overflow totals, updated by the readers
+        self.counters = SourceCounters()
+
+        # Subscribers get (device_info, reports, device_name) per drain pass
+        self.report_bus = EventBus()
+
+        # Upper bound on the reports collected by one drain pass
+        self.max_batch_size = 256
+
+        # Central capture store shared with the MIDI handler (see set_capture_store)
+        self.capture_store = None
+
+    def set_capture_store(self, store):
+        """Write every received report into a CaptureStore"""
+        self.capture_store = store
+
+    def get_devices(self):
+        """Get list of available HID devices"""
+        try:
+            import hid
+
+            return hid.enumerate()
+        except Exception as e:
+            print(f"Error enumerating HID devices: {e}")
+            return []
+
+    def connect_device(self, device_info):
+        """Connect to an HID device using its info dict"""
+        try:
+            path = device_info["path"]
+            if path in self.connected_devices:
+                return True  # Already connected
+
+            # Create a friendly name for the device
+            device_name = device_display_name(device_info)
+
+            node = find_hidraw_node(device_info) if self.use_hidraw else None
+            if node is not None:
+                try:
+                    self._connect_hidraw(device_info, device_name, node)
+                    return True
+                except OSError as e:
+                    # Typically udev lets us at /dev/bus/usb but not /dev/hidraw*
+                    print(f"Can't open {node} ({e}), reading through hidapi")
+
+            # Open the device (hidapi is loaded on first use)
+            import hid
+
+            device = hid.device()
+            device.open_path(path)
+
+            try:
+                descriptor = bytes(device.get_report_descriptor())
+            except Exception:
+                descriptor = None  # hidapi < 0.14 or an unsupported backend
+            read_size = self._load_descriptor(path, descriptor, DEFAULT_READ_SIZE)
+
+            # Set up a stop event for the thread
+            stop_event = threading.Event()
+            slot = self.counters.register(path, device_name)
+
+            # Create and start a thread to read from the device
+            thread = threading.Thread(
+                target=self._read_device_thread,
+                args=(device, device_info, device_name, stop_event, slot, read_size),
+                daemon=True,
+            )
+            thread.start()
+
+            # Store references
+            self.connected_devices[path] = (device, thread, stop_event)
+            return True
+
+        except Exception as e:
+            print(f"Error connecting to HID device: {e}")
+            return False
+
+    def _load_descriptor(self, path, descriptor, default):
+        """Keep and compile a device's descriptor; returns the read size
+
+        Reads are sized to the longest input report of the device.
+        """
+        if not descriptor:
+            return default
+
+        self.report_descriptors[path] = descriptor
+        try:
+            read_size = max_input_report_length(descriptor) or default
+            self.report_decoders[path] = DeviceDecoder(descriptor)
+            return read_size
+        except DescriptorError as e:
+            print(f"Error parsing HID report descriptor: {e}")
+            return default
+
+    def _connect_hidraw(self, device_info, device_name, node):
+        """Open a device's hidraw node and hand it to the poller thread"""
+        path = device_info["path"]
+        fd = open_hidraw(node)
+        try:
+            descriptor = read_hidraw_descriptor(fd)
+        except OSError as e:
+            print(f"Error reading HID report descriptor: {e}")
+            descriptor = None
+        read_size = self._load_descriptor(path, descriptor, HIDRAW_READ_SIZE)
+        slot = self.counters.register(path, device_name)
+
+        def on_readable(fd):
+            self._read_hidraw(fd, read_size, device_info, device_name, slot)
+
+        self.connected_devices[path] = (fd, None, None)
+        self.poller.watch(fd, on_readable)
+
+    def _read_hidraw(self, fd, read_size, device_info, device_name, slot):
+        """Poller callback draining a readable hidraw node"""
+        store = self.capture_store
+        if store is not None:
+            source_id = store.register_source(
+                SOURCE_HID, device_name, device_info["path"]
+            )
+
+        # hidraw returns one report per read; anything beyond max_batch_size
+        # is picked up on the next pass, after the other devices. Reads of
+        # exactly the largest report size allocate each report once, at
+        # its final size.
+        reports = []
+        size = 0
+        try:
+            while len(reports) < self.max_batch_size:
+                report = os.read(fd, read_size)
+                if not report:
+                    # EOF: the node stays readable, so stop polling it
+                    self._close_hidraw(fd, device_info["path"])
+                    break
+                now = time.time_ns()
+                reports.append((now, report))
+                size += len(report)
+                if store is not None:
+                    store.append(source_id, report, now)
+        except BlockingIOError:
+            pass  # Drained
+        except OSError as e:
+            # Device unplugged; it stays listed until disconnect_device()
+            print(f"Error reading from HID device: {e}")
+            self._close_hidraw(fd, device_info["path"])
+
+        if reports:
+            if len(reports) >= HIDRAW_QUEUE_REPORTS:
+                self.counters.overflow_passes[slot] += 1
+            self._publish_reports(device_info, device_name, slot, reports, size)
+
+    def _close_hidraw(self, fd, path):
+        """Stop polling a hidraw node that has gone away and close it
+
+        The device stays listed, without an fd, until disconnect_device().
+        """
+        self.poller.unwatch(fd)
+        self.connected_devices[path] = (None, None, None)
+        os.close(fd)
+
+    def _publish_reports(self, device_info, device_name, slot, reports, size):
+        """Count one drain pass and publish it on report_bus"""
+        counters = self.counters
+        counters.messages[slot] += len(reports)
+        counters.bytes[slot] += size
+
+        self.report_bus.publish(device_info, reports, device_name)
+
+    def _read_device_thread(
+        self, device, device_info, device_name, stop_event, slot, read_size
+    ):
+        """Thread function to continuously read from the device"""
+        try:
+            # Plain read() calls return immediately once the device is empty;
+            # reads with a timeout still block for up to timeout_ms
+            device.set_nonblocking(1)
+
+            while not stop_event.is_set():
+                try:
+                    # Wait for the first report (100ms timeout)
+                    data = device.read(read_size, timeout_ms=100)
+                    if not data:
+                        continue
+
+                    store = self.capture_store
+                    if store is not None:
+                        source_id = store.register_source(
+                            SOURCE_HID, device_name, device_info["path"]
+                        )
+
+                    # Use bytes() to ensure we have a proper bytes object
+                    reports = []
+                    size = 0
+                    while data:
+                        now = time.time_ns()
+                        report = bytes(data)
+                        reports.append((now, report))
+                        size += len(report)
+                        if store is not None:
+                            store.append(source_id, report, now)
+
+                        # Drain whatever else the device has queued up
+                        if len(reports) >= self.max_batch_size:
+                            break
+                        data = device.read(read_size)
+
+                    self._publish_reports(device_info, device_name, slot, reports, size)
+                except IOError:
+                    # Device disconnected or read error
+                    break
+        except Exception as e:
+            print(f"Error reading from HID device: {e}")
+        finally:
+            try:
+                device.close()
+            except:
+                pass
+
+    def disconnect_device(self, device_path):
+        """Disconnect from an HID device"""
+        if device_path not in self.connected_devices:
+            return False
+
+        try:
+            device, thread, stop_event = self.connected_devices[device_path]
+
+            if thread is None:
+                # hidraw: once the poller has let go the fd can be closed,
+                # unless the poller thread closed it already (see _close_hidraw)
+                if device is not None:
+                    self.poller.unwatch(device)
+                    if self.connected_devices[device_path][0] is not None:
+                        os.close(device)
+                del self.connected_devices[device_path]
+                self.counters.release(device_path)
+                self.report_descriptors.pop(device_path, None)
+                self.report_decoders.pop(device_path, None)
+                return True
+
+            # Signal thread to stop
+            stop_event.set()
+
+            # Close device
+            try:
+                device.close()
+            except:
+                pass
+
+            # Wait for thread with timeout
+            thread.join(1.0)
+
+            # Remove from connected devices
+            del self.connected_devices[device_path]
+            self.counters.release(device_path)
+            self.report_descriptors.pop(device_path, None)
+            self.report_decoders.pop(device_path, None)
+            return True
+
+        except Exception as e:
+            print(f"Error disconnecting HID device: {e}")
+            return False
+
+    def close_all(self):
+        """Disconnect all devices"""
+        for path in list(self.connected_devices.keys()):
+            self.disconnect_device(path)
+        self.poller.stop()
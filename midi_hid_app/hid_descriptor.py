@@ -0,0 +1,513 @@
+# midi_hid_app/hid_descriptor.py - HID report descriptor parsing and decoding
+#
+# A report descriptor is a list of items: a prefix byte (size in bits 0-1,
+# type in bits 2-3, tag in bits 4-7) followed by 0, 1, 2 or 4 data bytes.
+# Global items (usage page, logical range, report size, count, ID, ...) and
+# local items (usages) set state that the main items (Input, Output,
+# Feature) then use; see the USB HID 1.11 spec, section 6.2.2.
+import struct
+
+# Item types
+MAIN, GLOBAL, LOCAL = 0, 1, 2
+
+# Main item tags
+INPUT, OUTPUT, COLLECTION, FEATURE, END_COLLECTION = 0x8, 0x9, 0xA, 0xB, 0xC
+
+# Global item tags
+USAGE_PAGE = 0x0
+LOGICAL_MINIMUM = 0x1
+LOGICAL_MAXIMUM = 0x2
+REPORT_SIZE = 0x7
+REPORT_ID = 0x8
+REPORT_COUNT = 0x9
+PUSH = 0xA
+POP = 0xB
+
+# Local item tags
+USAGE = 0x0
+USAGE_MINIMUM = 0x1
+USAGE_MAXIMUM = 0x2
+
+# Main item data bits
+CONSTANT = 0x01
+VARIABLE = 0x02
+
+# Usage pages
+GENERIC_DESKTOP = 0x01
+SIMULATION = 0x02
+KEYBOARD = 0x07
+BUTTON = 0x09
+CONSUMER = 0x0C
+DIGITIZER = 0x0D
+VENDOR_DEFINED = 0xFF00  # 0xFF00-0xFFFF
+
+# Names of common usages, by (page, id)
+USAGE_NAMES = {
+    (GENERIC_DESKTOP, 0x30): "X",
+    (GENERIC_DESKTOP, 0x31): "Y",
+    (GENERIC_DESKTOP, 0x32): "Z",
+    (GENERIC_DESKTOP, 0x33): "Rx",
+    (GENERIC_DESKTOP, 0x34): "Ry",
+    (GENERIC_DESKTOP, 0x35): "Rz",
+    (GENERIC_DESKTOP, 0x36): "Slider",
+    (GENERIC_DESKTOP, 0x37): "Dial",
+    (GENERIC_DESKTOP, 0x38): "Wheel",
+    (GENERIC_DESKTOP, 0x39): "Hat",
+    (SIMULATION, 0xBA): "Rudder",
+    (SIMULATION, 0xBB): "Throttle",
+    (SIMULATION, 0xC4): "Accelerator",
+    (SIMULATION, 0xC5): "Brake",
+    (CONSUMER, 0x238): "AC Pan",
+    (DIGITIZER, 0x30): "Pressure",
+    (DIGITIZER, 0x42): "Tip",
+}
+
+# Names of array fields (key codes and the like), by usage page
+ARRAY_NAMES = {KEYBOARD: "Keys", BUTTON: "Buttons", CONSUMER: "Consumer"}
+
+# Names of runs of 1-bit fields shown together as the usage ids that are
+# set, by usage page
+FLAG_NAMES = {BUTTON: "Buttons", KEYBOARD: "Modifiers"}
+
+# Prefix of a long item (never used by real devices, but skippable)
+LONG_ITEM = 0xFE
+
+
+class DescriptorError(ValueError):
+    """The report descriptor is malformed"""
+
+
+def unsigned(data):
+    """Item data as an unsigned little-endian integer"""
+    return int.from_bytes(data, "little")
+
+
+def signed(data):
+    """Item data as a signed little-endian integer"""
+    return int.from_bytes(data, "little", signed=True)
+
+
+def iter_items(descriptor):
+    """Yield (item_type, tag, data) for every short item of a descriptor"""
+    descriptor = bytes(descriptor)
+    pos = 0
+    end = len(descriptor)
+    while pos < end:
+        prefix = descriptor[pos]
+        if prefix == LONG_ITEM:
+            if pos + 1 >= end:
+                raise DescriptorError("truncated long item")
+            pos += 3 + descriptor[pos + 1]
+            continue
+
+        size = (0, 1, 2, 4)[prefix & 0x3]
+        data = descriptor[pos + 1 : pos + 1 + size]
+        if len(data) < size:
+            raise DescriptorError(f"truncated item at offset {pos}")
+        yield (prefix >> 2) & 0x3, prefix >> 4, data
+        pos += 1 + size
+
+
+def usage_name(usage):
+    """Display name of a usage given as (page << 16) | id"""
+    page, usage_id = usage >> 16, usage & 0xFFFF
+    if page == BUTTON:
+        return f"Button {usage_id}"
+    return USAGE_NAMES.get((page, usage_id)) or f"{page:02X}:{usage_id:02X}"
+
+
+def iter_main_items(descriptor):
+    """Yield (tag, flags, state, usages) for every Input/Output/Feature item
+
+    state is a dict of the global items in effect: usage_page,
+    logical_minimum, logical_maximum, report_size, report_count and
+    report_id. usages lists the usages the item's local items declared,
+    as (page << 16) | id, with Usage Minimum..Maximum ranges expanded.
+    """
+    state = {
+        "usage_page": 0,
+        "logical_minimum": 0,
+        "logical_maximum": 0,
+        "report_size": 0,
+        "report_count": 0,
+        "report_id": 0,
+    }
+    stack = []
+    usages = []
+    usage_minimum = None
+
+    def full_usage(data):
+        # 4-byte usages carry their own page
+        if len(data) == 4:
+            return unsigned(data)
+        return (state["usage_page"] << 16) | unsigned(data)
+
+    for item_type, tag, data in iter_items(descriptor):
+        if item_type == GLOBAL:
+            if tag == USAGE_PAGE:
+                state["usage_page"] = unsigned(data)
+            elif tag == LOGICAL_MINIMUM:
+                state["logical_minimum"] = signed(data)
+            elif tag == LOGICAL_MAXIMUM:
+                # e.g. 25 FF means 255 when the minimum isn't negative
+                maximum = signed(data)
+                if maximum < 0 <= state["logical_minimum"]:
+                    maximum = unsigned(data)
+                state["logical_maximum"] = maximum
+            elif tag == REPORT_SIZE:
+                state["report_size"] = unsigned(data)
+            elif tag == REPORT_COUNT:
+                state["report_count"] = unsigned(data)
+            elif tag == REPORT_ID:
+                state["report_id"] = unsigned(data)
+                if not state["report_id"]:
+                    raise DescriptorError("report ID 0 is reserved")
+            elif tag == PUSH:
+                stack.append(dict(state))
+            elif tag == POP:
+                if not stack:
+                    raise DescriptorError("Pop without Push")
+                state = stack.pop()
+        elif item_type == LOCAL:
+            if tag == USAGE:
+                usages.append(full_usage(data))
+            elif tag == USAGE_MINIMUM:
+                usage_minimum = full_usage(data)
+            elif tag == USAGE_MAXIMUM:
+                if usage_minimum is None:
+                    raise DescriptorError("Usage Maximum without Usage Minimum")
+                usages.extend(range(usage_minimum, full_usage(data) + 1))
+                usage_minimum = None
+        elif item_type == MAIN:
+            if tag in (INPUT, OUTPUT, FEATURE):
+                yield tag, unsigned(data), dict(state), usages
+            # Local items only apply to the next main item
+            usages = []
+            usage_minimum = None
+
+
+def report_lengths(descriptor, kind=INPUT):
+    """{report_id: length in bytes} of the Input (or Output/Feature) reports
+
+    Lengths include the leading report ID byte that devices using report
+    IDs send; report_id is 0 for devices that use none.
+    """
+    bits = {}
+    for tag, flags, state, usages in iter_main_items(descriptor):
+        if tag == kind:
+            report_id = state["report_id"]
+            bits[report_id] = (
+                bits.get(report_id, 0) + state["report_size"] * state["report_count"]
+            )
+
+    return {
+        report_id: (total + 7) // 8 + (1 if report_id else 0)
+        for report_id, total in bits.items()
+    }
+
+
+def max_input_report_length(descriptor):
+    """Longest Input report in bytes (with its ID byte), or None if none"""
+    lengths = report_lengths(descriptor, INPUT)
+    return max(lengths.values()) if lengths else None
+
+
+class Field:
+    """One value of an Input report, or one array of usage indices
+
+    bit_offset counts from the start of the report data as read, i.e.
+    including the report ID byte. A variable field holds a single value
+    for usage; an array field holds count indices into usages (e.g. the
+    keys held down on a keyboard), offset by logical_minimum.
+    """
+
+    def __init__(
+        self,
+        usage,
+        bit_offset,
+        bit_size,
+        logical_minimum,
+        logical_maximum,
+        count=1,
+        usages=None,
+    ):
+        self.usage = usage
+        self.bit_offset = bit_offset
+        self.bit_size = bit_size
+        self.logical_minimum = logical_minimum
+        self.logical_maximum = logical_maximum
+        self.count = count
+        self.usages = usages  # None for variable fields
+
+    @property
+    def is_array(self):
+        return self.usages is not None
+
+    @property
+    def is_signed(self):
+        return self.logical_minimum < 0
+
+    @property
+    def usage_page(self):
+        return self.usage >> 16
+
+
+class Report:
+    """The fields of one Input report"""
+
+    def __init__(self, report_id):
+        self.report_id = report_id
+        self.fields = []
+        self.bit_length = 8 if report_id else 0
+
+    @property
+    def length(self):
+        """Report length in bytes, with the report ID byte"""
+        return (self.bit_length + 7) // 8
+
+
+def parse_input_reports(descriptor):
+    """{report_id: Report} describing every Input report of a descriptor"""
+    reports = {}
+    for tag, flags, state, usages in iter_main_items(descriptor):
+        if tag != INPUT:
+            continue
+
+        report_id = state["report_id"]
+        report = reports.get(report_id)
+        if report is None:
+            report = reports[report_id] = Report(report_id)
+
+        size = state["report_size"]
+        count = state["report_count"]
+        if flags & CONSTANT or not size or not count:
+            report.bit_length += size * count  # Padding
+            continue
+
+        minimum = state["logical_minimum"]
+        maximum = state["logical_maximum"]
+        default_usage = state["usage_page"] << 16
+        if flags & VARIABLE:
+            for index in range(count):
+                # The last usage repeats for any remaining values
+                usage = usages[min(index, len(usages) - 1)] if usages else default_usage
+                report.fields.append(
+                    Field(usage, report.bit_length, size, minimum, maximum)
+                )
+                report.bit_length += size
+        else:
+            usage = usages[0] if usages else default_usage
+            report.fields.append(
+                Field(
+                    usage,
+                    report.bit_length,
+                    size,
+                    minimum,
+                    maximum,
+                    count,
+                    list(usages),
+                )
+            )
+            report.bit_length += size * count
+    return reports
+
+
+class ReportDecoder:
+    """Decodes one Input report with offsets and masks worked out up front
+
+    Byte-aligned 8, 16 and 32-bit values are unpacked in one go by a
+    struct.Struct. Every other value is shifted and masked out of the
+    report read as a single integer, and each run of 1-bit buttons (or
+    keyboard modifiers) comes out with one mask. Vendor-defined fields
+    are left out; they stay visible in the raw data.
+
+    decode() returns {name: value}, with the buttons that are down and
+    the usage ids held in array fields (e.g. key codes) as tuples.
+    """
+
+    STRUCT_CODES = {8: "b", 16: "h", 32: "i"}
+
+    def __init__(self, report):
+        self.report_id = report.report_id
+        self.length = report.length
+
+        aligned = []  # (byte offset, struct code, name)
+        self.bit_fields = []  # (name, shift, mask, sign bit or 0)
+        self.flag_runs = []  # (name, shift, mask, first usage id)
+        self.arrays = []  # (name, shift, size, mask, count, minimum, usage ids)
+        self.formats = []  # (name, hex) in report order, for describe()
+
+        runs = []  # [page, shift, count, first usage id] of each flag run
+        for field in report.fields:
+            page = field.usage_page
+            if page >= VENDOR_DEFINED:
+                continue
+
+            usage_id = field.usage & 0xFFFF
+            if not field.is_array and field.bit_size == 1 and page in FLAG_NAMES:
+                run = runs[-1] if runs else None
+                if (
+                    run is not None
+                    and run[0] == page
+                    and run[1] + run[2] == field.bit_offset
+                    and run[3] + run[2] == usage_id
+                ):
+                    run[2] += 1
+                    continue
+                name = self._add_name(FLAG_NAMES[page], page != BUTTON)
+                runs.append([page, field.bit_offset, 1, usage_id, name])
+                continue
+
+            if field.is_array:
+                name = self._add_name(ARRAY_NAMES.get(page, "Array"), page != BUTTON)
+                self.arrays.append(
+                    (
+                        name,
+                        field.bit_offset,
+                        field.bit_size,
+                        (1 << field.bit_size) - 1,
+                        field.count,
+                        field.logical_minimum,
+                        tuple(usage & 0xFFFF for usage in field.usages),
+                    )
+                )
+                continue
+
+            name = self._add_name(usage_name(field.usage), False)
+            code = self.STRUCT_CODES.get(field.bit_size)
+            if code is not None and field.bit_offset % 8 == 0:
+                aligned.append(
+                    (
+                        field.bit_offset // 8,
+                        code if field.is_signed else code.upper(),
+                        name,
+                    )
+                )
+            else:
+                sign_bit = 1 << (field.bit_size - 1) if field.is_signed else 0
+                self.bit_fields.append(
+                    (name, field.bit_offset, (1 << field.bit_size) - 1, sign_bit)
+                )
+
+        self.flag_runs = [
+            (name, shift, (1 << count) - 1, first)
+            for page, shift, count, first, name in runs
+        ]
+
+        # One struct for every aligned value, with pad bytes in between
+        aligned.sort()
+        layout = "<"
+        pos = 0
+        for offset, code, name in aligned:
+            layout += "x" * (offset - pos) + code
+            pos = offset + struct.calcsize("<" + code)
+        self.struct = struct.Struct(layout)
+        self.struct_names = tuple(name for offset, code, name in aligned)
+        self.needs_int = bool(self.bit_fields or self.flag_runs or self.arrays)
+
+    def _add_name(self, name, hex_ids):
+        """Unique name for the next value ("X", "X 2", ...)"""
+        taken = {taken_name for taken_name, _ in self.formats}
+        base = name
+        number = 2
+        while name in taken:
+            name = f"{base} {number}"
+            number += 1
+        self.formats.append((name, hex_ids))
+        return name
+
+    @property
+    def names(self):
+        return [name for name, _ in self.formats]
+
+    def decode(self, data):
+        """{name: value} for one report"""
+        if len(data) < self.length:
+            data = bytes(data).ljust(self.length, b"\0")
+
+        values = dict(zip(self.struct_names, self.struct.unpack_from(data)))
+        if not self.needs_int:
+            return values
+
+        bits = int.from_bytes(data, "little")
+        for name, shift, mask, sign_bit in self.bit_fields:
+            value = (bits >> shift) & mask
+            if value & sign_bit:
+                value -= sign_bit << 1
+            values[name] = value
+
+        for name, shift, mask, first in self.flag_runs:
+            flags = (bits >> shift) & mask
+            usage_id = first
+            held = []
+            while flags:
+                if flags & 1:
+                    held.append(usage_id)
+                flags >>= 1
+                usage_id += 1
+            values[name] = tuple(held)
+
+        for name, shift, size, mask, count, minimum, usage_ids in self.arrays:
+            held = []
+            for index in range(count):
+                value = ((bits >> (shift + index * size)) & mask) - minimum
+                if 0 <= value < len(usage_ids) and usage_ids[value]:
+                    held.append(usage_ids[value])
+            values[name] = tuple(held)
+        return values
+
+    def describe(self, values):
+        """One line of text for decode()'s values"""
+        parts = []
+        for name, hex_ids in self.formats:
+            value = values[name]
+            if isinstance(value, tuple):
+                if not value:
+                    value = "-"
+                elif hex_ids:
+                    value = ",".join(f"{usage_id:02X}" for usage_id in value)
+                else:
+                    value = ",".join(str(usage_id) for usage_id in value)
+            parts.append(f"{name}={value}")
+        return " ".join(parts)
+
+
+class DeviceDecoder:
+    """Compiled decoders for every Input report of one device
+
+    Built once from the report descriptor (e.g. at connect time); picks
+    the report's decoder by its leading report ID byte when the device
+    uses report IDs.
+    """
+
+    def __init__(self, descriptor):
+        reports = parse_input_reports(descriptor)
+        self.decoders = {
+            report_id: ReportDecoder(report) for report_id, report in reports.items()
+        }
+        self.uses_report_ids = any(self.decoders)
+
+    def decoder_for(self, data):
+        """ReportDecoder for a report, or None if it is unknown"""
+        if not data:
+            return None
+        return self.decoders.get(data[0] if self.uses_report_ids else 0)
+
+    def decode(self, data):
+        """{name: value} for one report, or None if it is unknown"""
+        decoder = self.decoder_for(data)
+        return decoder.decode(data) if decoder is not None else None
+
+    def decode_batch(self, reports):
+        """decode() for a list of reports"""
+        if not self.uses_report_ids and 0 in self.decoders:
+            decode = self.decoders[0].decode
+            return [decode(data) for data in reports]
+        return [self.decode(data) for data in reports]
+
+    def describe(self, data):
+        """One line such as "Buttons=1,3 X=12 Y=-3", or "" if unknown"""
+        decoder = self.decoder_for(data)
+        if decoder is None:
+            return ""
+        return decoder.describe(decoder.decode(data))
@@ -0,0 +1,207 @@
+# midi_hid_app/hidraw_backend.py - Linux hidraw reading from one poller thread
+import os
+import selectors
+import threading
+from collections import deque
+
+# Read size for devices whose report descriptor can't be read or parsed
+HIDRAW_READ_SIZE = 4096
+
+# Report descriptor ioctls from <linux/hidraw.h>: _IOR('H', 1, int) and
+# _IOR('H', 2, struct hidraw_report_descriptor { __u32 size; __u8 value[4096]; })
+HID_MAX_DESCRIPTOR_SIZE = 4096
+HIDIOCGRDESCSIZE = 0x80044801
+HIDIOCGRDESC = 0x80000000 | ((4 + HID_MAX_DESCRIPTOR_SIZE) << 16) | 0x4802
+
+
+# Where the kernel lists hidraw nodes; hidrawN/device links to the HID
+# device ("0003:046D:C21D.0001", i.e. bus:vendor:product.instance), which
+# sits under its USB interface ("1-2.3:1.0", i.e. bus-ports:config.interface)
+SYSFS_HIDRAW = "/sys/class/hidraw"
+
+
+def parse_hid_id(name):
+    """(bus, vendor_id, product_id) of a sysfs HID device name, or None"""
+    try:
+        bus, vendor, rest = name.split(":")
+        return int(bus, 16), int(vendor, 16), int(rest.split(".")[0], 16)
+    except ValueError:
+        return None
+
+
+def find_hidraw_node(device_info, sysfs_root=None):
+    """/dev/hidraw node of a device from hid.enumerate(), or None
+
+    hidapi's hidraw backend reports the node as the path already. Its
+    libusb backend, which the hidapi wheels use on Linux, reports the
+    USB interface instead ("1-2.3:1.0"). That is matched against the
+    interface each hidraw node in sysfs hangs off. Paths in another
+    format fall back to the vendor/product id and interface number, as
+    long as only one node matches them.
+    """
+    path = os.fsdecode(device_info.get("path") or b"")
+    if path.startswith("/dev/hidraw"):
+        return path
+
+    root = SYSFS_HIDRAW if sysfs_root is None else sysfs_root
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return None  # Not Linux, or no hidraw driver
+
+    ids = (device_info.get("vendor_id"), device_info.get("product_id"))
+    interface = device_info.get("interface_number")
+    candidates = []
+    for name in names:
+        hid_dir = os.path.realpath(os.path.join(root, name, "device"))
+        hid_id = parse_hid_id(os.path.basename(hid_dir))
+        if hid_id is None or hid_id[1:] != ids:
+            continue
+        usb_interface = os.path.basename(os.path.dirname(hid_dir))
+        if usb_interface == path:
+            return f"/dev/{name}"
+        if interface is not None and usb_interface.endswith(f".{interface}"):
+            candidates.append(name)
+
+    if len(candidates) == 1:
+        return f"/dev/{candidates[0]}"
+    return None
+
+
+def open_hidraw(path):
+    """Open a hidraw node for non-blocking reads; returns the fd"""
+    return os.open(os.fsdecode(path), os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+
+
+def read_hidraw_descriptor(fd):
+    """Report descriptor of an open hidraw node, as bytes"""
+    import fcntl
+
+    size_buffer = bytearray(4)
+    fcntl.ioctl(fd, HIDIOCGRDESCSIZE, size_buffer)
+    size = min(int.from_bytes(size_buffer, "little"), HID_MAX_DESCRIPTOR_SIZE)
+
+    descriptor_buffer = bytearray(4 + HID_MAX_DESCRIPTOR_SIZE)
+    descriptor_buffer[:4] = size_buffer
+    fcntl.ioctl(fd, HIDIOCGRDESC, descriptor_buffer)
+    return bytes(descriptor_buffer[4 : 4 + size])
+
+
+class HidrawPoller:
+    """Waits on any number of non-blocking fds from a single thread
+
+    watch(fd, callback) makes the poller thread call callback(fd) whenever
+    fd is readable; the callback should read until EAGAIN. The thread
+    sleeps in epoll (via selectors) with no timeout, so idle devices cost
+    no wakeups at all, and one thread serves every device.
+
+    watch() and unwatch() may be called from any thread: they are handed
+    to the poller thread through a wake pipe and return once it has
+    applied them, so after unwatch() the fd can be closed safely. Called
+    from a callback they take effect immediately.
+    """
+
+    def __init__(self):
+        self._selector = None
+        self._thread = None
+        self._wake_r = self._wake_w = None
+        self._requests = deque()  # (function, done event) for the thread
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def __len__(self):
+        """Number of watched fds"""
+        if self._selector is None:
+            return 0
+        return len(self._selector.get_map()) - 1  # minus the wake pipe
+
+    def start(self):
+        """Start the poller thread (watch() does this when needed)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            self._selector.register(self._wake_r, selectors.EVENT_READ)
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the poller thread; watched fds are left open"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._thread = None
+
+        self._stopping = True
+        os.write(self._wake_w, b"\0")
+        thread.join(2.0)
+
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        self._selector = None
+        self._wake_r = self._wake_w = None
+
+    def watch(self, fd, callback):
+        """Call callback(fd) on the poller thread whenever fd is readable"""
+        self.start()
+        self._call(lambda: self._selector.register(fd, selectors.EVENT_READ, callback))
+
+    def unwatch(self, fd):
+        """Stop watching fd; returns once the poller thread has let go of it"""
+        if self._thread is None:
+            return
+
+        def unregister():
+            try:
+                self._selector.unregister(fd)
+            except KeyError:
+                pass
+
+        self._call(unregister)
+
+    def _call(self, function):
+        """Run function on the poller thread and wait for it"""
+        if threading.current_thread() is self._thread:
+            function()
+            return
+
+        done = threading.Event()
+        self._requests.append((function, done))
+        os.write(self._wake_w, b"\0")
+        done.wait(2.0)
+
+    def _run_requests(self):
+        try:
+            os.read(self._wake_r, 512)
+        except BlockingIOError:
+            pass
+        while self._requests:
+            function, done = self._requests.popleft()
+            try:
+                function()
+            except Exception as e:
+                print(f"HID poller: {e}")
+            done.set()
+
+    def _run(self):
+        """Thread function dispatching readable fds to their callbacks"""
+        selector = self._selector
+        wake_r = self._wake_r
+        while not self._stopping:
+            for key, events in selector.select():
+                if key.fd == wake_r:
+                    self._run_requests()
+                    continue
+                if selector.get_map().get(key.fd) is not key:
+                    continue  # Unwatched earlier in this pass
+                try:
+                    key.data(key.fd)
+                except Exception as e:
+                    print(f"HID poller: error reading fd {key.fd}: {e}")
+        # Don't leave watch()/unwatch() callers waiting
+        self._run_requests()
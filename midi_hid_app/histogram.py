@@ -0,0 +1,103 @@
+# midi_hid_app/histogram.py - Fixed-size log-linear histogram for timings
+from array import array
+
+# Each power of two is split into 2**SUB_BITS buckets (<= 6.25% error)
+SUB_BITS = 4
+SUB_COUNT = 1 << SUB_BITS
+
+# Enough buckets for any value below 2**63
+BUCKET_COUNT = (64 - SUB_BITS) * SUB_COUNT
+
+
+def bucket_index(value):
+    """Bucket of a non-negative integer value"""
+    if value < 2 * SUB_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return shift * SUB_COUNT + (value >> shift)
+
+
+def bucket_bounds(index):
+    """(lowest, highest + 1) value that falls into a bucket"""
+    if index < 2 * SUB_COUNT:
+        return index, index + 1
+    shift = index // SUB_COUNT - 1
+    mantissa = index - shift * SUB_COUNT
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class LogHistogram:
+    """Counts integer samples (e.g. nanoseconds) in log-linear buckets
+
+    Recording is a couple of integer operations on a preallocated array,
+    so it is cheap enough for per-event use on a device thread. count,
+    total, min and max are exact; percentiles are accurate to the bucket
+    width. Negative samples are counted in the zero bucket but still show
+    up in min.
+    """
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        """Add one sample"""
+        value = int(value)
+        self.counts[bucket_index(value) if value > 0 else 0] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add every sample of another histogram"""
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                if self.min is None or value < self.min:
+                    self.min = value
+                if self.max is None or value > self.max:
+                    self.max = value
+
+    def clear(self):
+        """Forget all samples"""
+        self.__init__()
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent):
+        """Approximate value below which percent of the samples fall"""
+        if not self.count:
+            return None
+
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                # Never report beyond the exact extremes
+                return min(max((low + high - 1) // 2, self.min), self.max)
+        return self.max
+
+    def summary(self, scale=1000, unit="us"):
+        """One line with count, mean, p50, p99 and max, divided by scale"""
+        if not self.count:
+            return "no samples"
+        return (
+            f"n={self.count} mean={self.mean / scale:.1f}{unit} "
+            f"p50={self.percentile(50) / scale:.1f}{unit} "
+            f"p99={self.percentile(99) / scale:.1f}{unit} "
+            f"max={self.max / scale:.1f}{unit}"
+        )
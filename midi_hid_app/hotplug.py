@@ -0,0 +1,159 @@
+# midi_hid_app/hotplug.py - Qt-free device hotplug monitoring
+import os
+import socket
+import selectors
+import threading
+from midi_hid_app.event_bus import EventBus
+
+# Kernel uevent multicast (no udev daemon needed)
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_GROUP_KERNEL = 1
+
+# Subsystems whose devices show up as HID devices or MIDI ports
+WATCHED_SUBSYSTEMS = ("hidraw", "sound")
+
+
+def parse_uevent(message):
+    """Return (action, subsystem, devname) for a kernel uevent, or None
+
+    Kernel uevents are NUL separated: "add@/devices/..." followed by
+    KEY=value pairs. devname falls back to DEVPATH for devices without a
+    /dev node (e.g. the sound card itself).
+    """
+    fields = message.split(b"\0")
+    if b"@" not in fields[0]:
+        return None  # Not a kernel uevent (e.g. a libudev broadcast)
+
+    env = {}
+    for field in fields[1:]:
+        key, sep, value = field.partition(b"=")
+        if sep:
+            env[key] = value.decode("utf-8", "replace")
+
+    action = env.get(b"ACTION")
+    subsystem = env.get(b"SUBSYSTEM")
+    if action is None or subsystem is None:
+        return None
+    return action, subsystem, env.get(b"DEVNAME") or env.get(b"DEVPATH", "")
+
+
+class HotplugMonitor:
+    """Publishes device add/remove events on event_bus from its own thread
+
+    On Linux this listens to kernel uevents for the hidraw and sound
+    subsystems, so nothing is enumerated until a device actually comes or
+    goes; events are (action, subsystem, devname). Elsewhere (or when the
+    netlink socket can't be opened) it falls back to calling list_midi and
+    list_hid every poll_interval seconds and publishing the difference as
+    (action, "midi", port_name) / (action, "hid", path).
+    """
+
+    def __init__(self, list_midi=None, list_hid=None, poll_interval=2.0):
+        self.list_midi = list_midi
+        self.list_hid = list_hid
+        self.poll_interval = poll_interval
+
+        # Subscribers get (action, subsystem, name) for every change
+        self.event_bus = EventBus()
+
+        self.mode = None  # "netlink" or "polling" once started
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake_r = self._wake_w = None
+
+    def start(self, use_netlink=True):
+        """Start watching; returns the mode that was chosen"""
+        if self._thread is not None:
+            return self.mode
+
+        sock = self._open_netlink() if use_netlink else None
+        self._stop_event.clear()
+        if sock is not None:
+            self.mode = "netlink"
+            self._wake_r, self._wake_w = os.pipe()
+            target, args = self._run_netlink, (sock,)
+        else:
+            self.mode = "polling"
+            target, args = self._run_polling, ()
+
+        self._thread = threading.Thread(target=target, args=args, daemon=True)
+        self._thread.start()
+        return self.mode
+
+    def stop(self):
+        """Stop watching and wait for the monitor thread"""
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"\0")
+        self._thread.join(2.0)
+        self._thread = None
+
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+
+    def _open_netlink(self):
+        if not hasattr(socket, "AF_NETLINK"):
+            return None
+        try:
+            sock = socket.socket(
+                socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT
+            )
+            sock.bind((0, UEVENT_GROUP_KERNEL))
+            return sock
+        except OSError as e:
+            print(f"Hotplug: netlink unavailable, polling instead ({e})")
+            return None
+
+    def _run_netlink(self, sock):
+        """Thread function reading kernel uevents"""
+        with sock, selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            selector.register(self._wake_r, selectors.EVENT_READ)
+
+            while not self._stop_event.is_set():
+                for key, events in selector.select():
+                    if key.fileobj is not sock:
+                        continue
+                    try:
+                        message = sock.recv(16384)
+                    except OSError:
+                        continue
+
+                    event = parse_uevent(message)
+                    if event is None:
+                        continue
+                    action, subsystem, name = event
+                    if action in ("add", "remove") and subsystem in WATCHED_SUBSYSTEMS:
+                        self.event_bus.publish(action, subsystem, name)
+
+    def _snapshot(self, previous):
+        """Current {"midi": ports, "hid": paths}; keeps previous on errors"""
+        snapshot = dict(previous)
+        try:
+            if self.list_midi is not None:
+                snapshot["midi"] = set(self.list_midi())
+        except Exception as e:
+            print(f"Hotplug: error listing MIDI ports: {e}")
+        try:
+            if self.list_hid is not None:
+                snapshot["hid"] = {device["path"] for device in self.list_hid()}
+        except Exception as e:
+            print(f"Hotplug: error listing HID devices: {e}")
+        return snapshot
+
+    def _run_polling(self):
+        """Thread function diffing the device lists every poll_interval"""
+        previous = self._snapshot({"midi": set(), "hid": set()})
+        while not self._stop_event.wait(self.poll_interval):
+            current = self._snapshot(previous)
+            for subsystem in ("midi", "hid"):
+                for name in current[subsystem] - previous[subsystem]:
+                    self.event_bus.publish("add", subsystem, name)
+                for name in previous[subsystem] - current[subsystem]:
+                    self.event_bus.publish("remove", subsystem, name)
+            previous = current
@@ -0,0 +1,135 @@
+# midi_hid_app/latency.py - Round-trip latency probe over a MIDI loopback
+import platform
+import threading
+import time
+from midi_hid_app.histogram import LogHistogram
+from midi_hid_app.scheduler import now_ns
+
+# SysEx with the non-commercial manufacturer id, a probe marker byte and a
+# 28-bit sequence number in four 7-bit bytes
+PROBE_HEADER = [0xF0, 0x7D, 0x4C]
+PROBE_LENGTH = len(PROBE_HEADER) + 5
+
+DEFAULT_PORT_NAME = "MIDI/HID Inspektr Latency"
+
+
+def encode_probe(seq):
+    """Probe SysEx message carrying seq"""
+    return PROBE_HEADER + [(seq >> shift) & 0x7F for shift in (21, 14, 7, 0)] + [0xF7]
+
+
+def decode_probe(data):
+    """Sequence number of a probe message, or None for anything else"""
+    if len(data) != PROBE_LENGTH or list(data[:3]) != PROBE_HEADER:
+        return None
+    seq = 0
+    for byte in data[3:7]:
+        seq = (seq << 7) | byte
+    return seq
+
+
+class LatencyProbe:
+    """Measures how long tagged messages take to come back through a loopback
+
+    send(data) puts a message on the output side; the probe listens on
+    message_bus (a MIDIHandler's, publishing (data, timestamp, port)) for
+    it to arrive. rtt holds round-trip times in ns; jitter holds the
+    difference between consecutive round trips (RFC 3550 style), in ns.
+    """
+
+    def __init__(self, message_bus, send):
+        self.message_bus = message_bus
+        self.send = send
+
+        self.rtt = LogHistogram()
+        self.jitter = LogHistogram()
+        self.sent = 0
+        self.received = 0
+
+        self._pending = {}  # seq -> send time (ns)
+        self._previous_rtt = None
+        self._all_back = threading.Event()
+
+    @property
+    def lost(self):
+        return len(self._pending)
+
+    def _on_message(self, data, time_stamp, port_name):
+        received_ns = now_ns()
+        seq = decode_probe(data)
+        if seq is None:
+            return
+        sent_ns = self._pending.pop(seq, None)
+        if sent_ns is None:
+            return
+
+        rtt = received_ns - sent_ns
+        self.rtt.record(rtt)
+        if self._previous_rtt is not None:
+            self.jitter.record(abs(rtt - self._previous_rtt))
+        self._previous_rtt = rtt
+        self.received += 1
+        if self.received == self.sent:
+            self._all_back.set()
+
+    def run(self, count, interval=0.002, timeout=2.0):
+        """Send count probes interval seconds apart and collect the replies"""
+        subscriber = self.message_bus.subscribe(self._on_message)
+        try:
+            next_ns = now_ns()
+            for seq in range(count):
+                message = encode_probe(seq)
+                self._all_back.clear()
+                self.sent += 1
+                self._pending[seq] = now_ns()
+                self.send(message)
+
+                next_ns += int(interval * 1e9)
+                delay = next_ns - now_ns()
+                if delay > 0:
+                    time.sleep(delay / 1e9)
+
+            # Give the last probes time to come back
+            self._all_back.wait(timeout)
+        finally:
+            self.message_bus.unsubscribe(subscriber)
+
+    def report(self):
+        """Print the round-trip and jitter summaries"""
+        print(f"Probes: {self.sent} sent, {self.received} received, {self.lost} lost")
+        print(f"Round trip: {self.rtt.summary()}")
+        print(f"Jitter:     {self.jitter.summary()}")
+
+
+def run_latency(count=2000, interval=0.002, port=None):
+    """Entry point for main.py --latency; returns a process exit code
+
+    Creates a virtual port pair, connects to its output like any other
+    input port and sends the probes out of it.
+    """
+    if platform.system() not in ("Darwin", "Linux"):
+        print("Virtual MIDI ports are not supported on this platform")
+        return 1
+
+    from midi_hid_app.midi_core import MIDIHandler
+
+    handler = MIDIHandler()
+    name = port or DEFAULT_PORT_NAME
+    if not handler.create_virtual_port(name):
+        return 1
+
+    loopback = [p for p in handler.get_ports() if f"{name} Output" in p]
+    if not loopback or not handler.connect_port(loopback[0]):
+        print(f"Could not connect to the virtual port '{name} Output'")
+        return 1
+
+    print(f"Probing {count} round trips through '{loopback[0]}'...")
+    probe = LatencyProbe(handler.message_bus, handler.midi_out.send_message)
+    try:
+        probe.run(count, interval)
+    except KeyboardInterrupt:
+        pass
+    handler.close_all()
+
+    probe.report()
+    return 0
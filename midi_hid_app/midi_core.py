@@ -0,0 +1,229 @@
+# midi_hid_app/midi_core.py - Qt-free MIDI handling
+import re
+import platform
+import threading
+from midi_hid_app.capture_store import SOURCE_MIDI
+from midi_hid_app.counters import SourceCounters
+from midi_hid_app.event_bus import EventBus
+from midi_hid_app.midi_output import MidiOutputPool, PortNotFoundError
+from midi_hid_app.scheduler import MidiScheduler
+
+
+def _rtmidi():
+    """Import rtmidi on first use; loading it opens the system MIDI backend"""
+    import rtmidi
+
+    return rtmidi
+
+
+class MIDIHandler:
+    """MIDI port handling without any Qt dependency
+
+    Received messages go into the capture store (if one is set) and are then
+    published on message_bus as (data, timestamp, port_name) from the
+    rtmidi callback thread. SimpleMIDIHandler wraps this for the GUI.
+
+    rtmidi is only loaded, and the MidiIn/MidiOut clients only created,
+    the first time a port is listed, opened or sent to.
+    """
+
+    def __init__(self):
+        self._midi_in = None
+        self._midi_out = None
+
+        # Guards the shared MidiIn client; ports may be listed from a scan thread
+        self._client_lock = threading.Lock()
+        self.connected_ports = {}  # port_name -> midi_in object
+
+        # Per-port message, byte and drop totals, updated by the callbacks
+        self.counters = SourceCounters()
+
+        # Output ports stay open between send_midi calls
+        self.output_pool = MidiOutputPool()
+        self._scheduler = None
+
+        # Subscribers get (data, timestamp, port_name) for every message
+        self.message_bus = EventBus()
+
+        # Central capture store shared with the HID handler (see set_capture_store)
+        self.capture_store = None
+        self._store_sources = {}  # port_name -> capture store source id
+
+        # Common virtual port identifiers
+        self.virtual_port_patterns = [
+            r"(?i)virtual",  # Any port with "virtual" in the name
+            r"(?i)neyrinck",  # Neyrinck V-Control
+            r"(?i)IAC",  # macOS Inter-Application Communication
+            r"(?i)LoopBe",  # LoopBe Internal MIDI
+            r"(?i)LoopMIDI",  # LoopMIDI
+            r"(?i)Microsoft GS",  # Microsoft GS Wavetable Synth
+            r"(?i)VMPK",  # Virtual MIDI Piano Keyboard
+            r"(?i)rtpMIDI",  # Network MIDI
+            r"(?i)MIDI Yoke",  # MIDI Yoke
+            r"(?i)Midi Through",  # MIDI Through port
+        ]
+
+    @property
+    def midi_in(self):
+        """MidiIn client used for port enumeration and virtual ports"""
+        if self._midi_in is None:
+            self._midi_in = _rtmidi().MidiIn()
+        return self._midi_in
+
+    @property
+    def midi_out(self):
+        """MidiOut client used for output port lookup and virtual ports"""
+        if self._midi_out is None:
+            self._midi_out = _rtmidi().MidiOut()
+        return self._midi_out
+
+    @property
+    def scheduler(self):
+        """MidiScheduler that sends through send_midi, started on first use"""
+        if self._scheduler is None:
+            self._scheduler = MidiScheduler(self.send_midi)
+            self._scheduler.start()
+        return self._scheduler
+
+    def get_ports(self):
+        """Get list of all available MIDI ports"""
+        with self._client_lock:
+            return self.midi_in.get_ports()
+
+    def get_ports_by_type(self):
+        """Get MIDI ports categorized as physical or virtual"""
+        all_ports = self.get_ports()
+        physical_ports = []
+        virtual_ports = []
+
+        for port in all_ports:
+            if self._is_likely_virtual_port(port):
+                virtual_ports.append(port)
+            else:
+                physical_ports.append(port)
+
+        return {"all": all_ports, "physical": physical_ports, "virtual": virtual_ports}
+
+    def _is_likely_virtual_port(self, port_name):
+        """Determine if a port is likely a virtual port based on its name"""
+        for pattern in self.virtual_port_patterns:
+            if re.search(pattern, port_name):
+                return True
+        return False
+
+    def create_virtual_port(self, name="MIDI Test Virtual Port"):
+        """Create a virtual MIDI port for testing"""
+        try:
+            # Different behavior based on platform
+            if platform.system() == "Darwin":  # macOS
+                with self._client_lock:
+                    self.midi_in.open_virtual_port(name + " Input")
+                self.midi_out.open_virtual_port(name + " Output")
+                return True
+            elif platform.system() == "Linux":
+                with self._client_lock:
+                    self.midi_in.open_virtual_port(name + " Input")
+                self.midi_out.open_virtual_port(name + " Output")
+                return True
+            else:  # Windows doesn't properly support virtual ports in rtmidi
+                return False
+        except Exception as e:
+            print(f"Error creating virtual port: {e}")
+            return False
+
+    def connect_port(self, port_name):
+        """Connect to a specific MIDI port by name"""
+        if port_name in self.connected_ports:
+            return True  # Already connected
+
+        try:
+            ports = self.get_ports()
+            if port_name not in ports:
+                print(f"Port '{port_name}' not found")
+                return False
+
+            port_index = ports.index(port_name)
+
+            # Create a new MidiIn instance for this port
+            midi_in = _rtmidi().MidiIn()
+            midi_in.open_port(port_index)
+
+            # Let SysEx through (rtmidi drops it by default); clock and
+            # active sensing stay filtered
+            midi_in.ignore_types(sysex=False, timing=True, active_sense=True)
+
+            # Create closure to capture port name and counter slot
+            slot = self.counters.register(port_name, port_name)
+            messages, byte_counts = self.counters.messages, self.counters.bytes
+
+            def callback(message, time_stamp):
+                data = message[0]
+                messages[slot] += 1
+                byte_counts[slot] += len(data)
+                self._on_midi_message(port_name, data, time_stamp)
+
+            if self.capture_store is not None:
+                self._store_sources[port_name] = self.capture_store.register_source(
+                    SOURCE_MIDI, port_name
+                )
+
+            midi_in.set_callback(callback)
+            self.connected_ports[port_name] = midi_in
+            return True
+
+        except Exception as e:
+            print(f"Error connecting to MIDI port '{port_name}': {e}")
+            return False
+
+    def set_capture_store(self, store):
+        """Write every received message into a CaptureStore"""
+        self._store_sources = {
+            port_name: store.register_source(SOURCE_MIDI, port_name)
+            for port_name in self.connected_ports
+        }
+        self.capture_store = store
+
+    def _on_midi_message(self, port_name, data, time_stamp):
+        """Deliver one message from the rtmidi callback thread"""
+        store = self.capture_store
+        if store is not None:
+            store.append(self._store_sources[port_name], data)
+
+        self.message_bus.publish(data, time_stamp, port_name)
+
+    def send_midi(self, port_name, midi_data):
+        """Send MIDI data to a port"""
+        try:
+            self.output_pool.send(port_name, midi_data)
+            return True
+
+        except PortNotFoundError as e:
+            print(e)
+            return False
+        except Exception as e:
+            print(f"Error sending MIDI to port '{port_name}': {e}")
+            return False
+
+    def disconnect_port(self, port_name):
+        """Disconnect from a MIDI port"""
+        if port_name not in self.connected_ports:
+            return False
+
+        try:
+            midi_in = self.connected_ports[port_name]
+            midi_in.cancel_callback()
+            midi_in.close_port()
+            del self.connected_ports[port_name]
+            self.counters.release(port_name)
+            return True
+        except Exception as e:
+            print(f"Error disconnecting from MIDI port '{port_name}': {e}")
+            return False
+
+    def close_all(self):
+        """Disconnect all ports"""
+        for port_name in list(self.connected_ports.keys()):
+            self.disconnect_port(port_name)
+        if self._scheduler is not None:
+            self._scheduler.stop()
+        self.output_pool.close_all()
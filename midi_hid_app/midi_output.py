@@ -0,0 +1,81 @@
+# midi_hid_app/midi_output.py - Pool of open MIDI output ports
+import threading
+from collections import OrderedDict
+
+
+class PortNotFoundError(LookupError):
+    """Raised when a MIDI output port is not (or no longer) available"""
+
+
+def _new_midi_out():
+    import rtmidi
+
+    return rtmidi.MidiOut()
+
+
+class MidiOutputPool:
+    """Keeps MIDI output ports open between sends
+
+    Ports are opened on first use and kept in least-recently-used order;
+    once more than max_open are open the oldest is closed. A send that
+    fails closes the port and retries once on a freshly opened one, which
+    covers devices that were unplugged and plugged back in. Safe to use
+    from several threads.
+    """
+
+    def __init__(self, max_open=8, client_factory=_new_midi_out):
+        self.max_open = max_open
+        self.client_factory = client_factory
+        self._ports = OrderedDict()  # port_name -> open MidiOut
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ports)
+
+    def __contains__(self, port_name):
+        return port_name in self._ports
+
+    def send(self, port_name, data):
+        """Send one message, opening (or reopening) the port as needed"""
+        with self._lock:
+            midi_out = self._ports.get(port_name)
+            if midi_out is not None:
+                self._ports.move_to_end(port_name)
+                try:
+                    midi_out.send_message(data)
+                    return
+                except Exception:
+                    self._close(port_name)
+
+            self._open(port_name).send_message(data)
+
+    def _open(self, port_name):
+        midi_out = self.client_factory()
+        ports = midi_out.get_ports()
+        if port_name not in ports:
+            raise PortNotFoundError(f"Output port '{port_name}' not found")
+        midi_out.open_port(ports.index(port_name))
+
+        self._ports[port_name] = midi_out
+        while len(self._ports) > self.max_open:
+            self._close(next(iter(self._ports)))
+        return midi_out
+
+    def _close(self, port_name):
+        midi_out = self._ports.pop(port_name)
+        try:
+            midi_out.close_port()
+        except Exception:
+            pass
+
+    def close(self, port_name):
+        """Close one pooled port (no-op if it is not open)"""
+        with self._lock:
+            if port_name in self._ports:
+                self._close(port_name)
+
+    def close_all(self):
+        """Close every pooled port"""
+        with self._lock:
+            for port_name in list(self._ports):
+                self._close(port_name)
@@ -0,0 +1,169 @@
+# midi_hid_app/replay.py - Play the MIDI events of a capture back in real time
+import platform
+import threading
+import time
+from midi_hid_app.capture_store import SOURCE_MIDI
+from midi_hid_app.capture_file import CaptureReader, CaptureFormatError
+from midi_hid_app.scheduler import MidiScheduler, now_ns
+
+DEFAULT_PORT_NAME = "MIDI/HID Inspektr Replay"
+
+
+class CaptureReplay:
+    """Sends the MIDI events of a capture file with their original timing
+
+    A feeder thread walks the capture and hands each event to a
+    MidiScheduler LOOKAHEAD_NS before it is due, so only a short window of
+    events is ever queued however long the capture is. Event times are the
+    capture timestamps divided by speed; with loop=True the capture starts
+    over right after its last event. lateness holds how late every event
+    went out relative to its replay time (ns), i.e. the replay jitter.
+
+    send is called as send(data) on the scheduler thread. sources limits
+    the replay to MIDI sources with those names.
+    """
+
+    LOOKAHEAD_NS = 100_000_000
+
+    def __init__(self, path, send, speed=1.0, loop=False, sources=None):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+
+        self.reader = CaptureReader(path)
+        self.speed = speed
+        self.loop = loop
+
+        self.source_ids = {
+            source_id
+            for source_id, (kind, name) in enumerate(self.reader.sources)
+            if kind == SOURCE_MIDI and (sources is None or name in sources)
+        }
+
+        self.scheduler = MidiScheduler(lambda port, data: send(data))
+        self.passes = 0
+        self.finished = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def lateness(self):
+        return self.scheduler.lateness
+
+    @property
+    def sent(self):
+        return self.scheduler.sent
+
+    def start(self):
+        """Start replaying"""
+        self.scheduler.start()
+        self._thread = threading.Thread(target=self._feed, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop replaying; events not sent yet are dropped"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+        self.scheduler.cancel_all()
+        self.scheduler.stop()
+        self.finished.set()
+
+    def close(self):
+        """Stop and close the capture file"""
+        self.stop()
+        self.reader.close()
+
+    def wait(self, timeout=None):
+        """Wait until the replay has finished; returns False on timeout"""
+        return self.finished.wait(timeout)
+
+    def _wait_until(self, at_ns):
+        """Sleep until at_ns unless stopped; returns False if stopped"""
+        remaining = at_ns - now_ns()
+        if remaining <= 0:
+            return not self._stop_event.is_set()
+        return not self._stop_event.wait(remaining / 1e9)
+
+    def _feed(self):
+        """Thread function scheduling one lookahead window at a time"""
+        first, stop = self.reader.event_range()
+        if first == stop:
+            self.finished.set()
+            return
+
+        first_ts = self.reader.get_event(first)[0]
+        base_ns = now_ns() + self.LOOKAHEAD_NS
+        last_offset = 0
+
+        while True:
+            for index in range(first, stop):
+                timestamp, source_id, payload = self.reader.get_event(index)
+                last_offset = int((timestamp - first_ts) / self.speed)
+                if source_id not in self.source_ids:
+                    continue
+
+                at_ns = base_ns + last_offset
+                if not self._wait_until(at_ns - self.LOOKAHEAD_NS):
+                    return
+                self.scheduler.schedule(None, list(payload), at_ns)
+
+            self.passes += 1
+            if not self.loop:
+                break
+            base_ns += last_offset
+
+        # Let the scheduler send the tail of the capture
+        while len(self.scheduler) and not self._stop_event.is_set():
+            time.sleep(0.01)
+        self.finished.set()
+
+
+def run_replay(path, port=None, speed=1.0, loop=False, sources=None):
+    """Entry point for main.py --replay; returns a process exit code
+
+    Events go to a new virtual output port named port (Linux/macOS), or
+    with port=None to DEFAULT_PORT_NAME.
+    """
+    if platform.system() not in ("Darwin", "Linux"):
+        print("Virtual MIDI ports are not supported on this platform")
+        return 1
+
+    from midi_hid_app.midi_core import MIDIHandler
+
+    handler = MIDIHandler()
+    name = port or DEFAULT_PORT_NAME
+    try:
+        handler.midi_out.open_virtual_port(name)
+    except Exception as e:
+        print(f"Error creating virtual port: {e}")
+        return 1
+
+    try:
+        replay = CaptureReplay(
+            path, handler.midi_out.send_message, speed, loop, sources
+        )
+    except (OSError, CaptureFormatError, ValueError) as e:
+        print(f"Cannot replay {path}: {e}")
+        return 1
+
+    if not replay.source_ids:
+        print(f"{path} contains no MIDI events to replay")
+        replay.close()
+        return 1
+
+    print(
+        f"Replaying {path} to virtual port '{name}' at {speed}x"
+        + (" (looping, Ctrl+C to stop)" if loop else "")
+    )
+    replay.start()
+    try:
+        while not replay.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    replay.close()
+
+    print(f"Sent {replay.sent} events in {replay.passes} pass(es)")
+    print(f"Lateness: {replay.lateness.summary()}")
+    return 0
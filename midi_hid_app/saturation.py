@@ -0,0 +1,237 @@
+# midi_hid_app/saturation.py - MIDI input saturation benchmark over virtual ports
+import os
+import platform
+import tempfile
+import threading
+import time
+from array import array
+from midi_hid_app.capture_store import SOURCE_MIDI
+from midi_hid_app.capture_file import CaptureWriter
+from midi_hid_app.histogram import LogHistogram
+from midi_hid_app.scheduler import now_ns
+
+# Offered rates (messages/second), tried in order until a pipeline fails one
+RATES = (1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000)
+
+# A rate is sustained if this share of the messages arrived...
+MIN_DELIVERED = 0.999
+# ...the sender managed this share of the offered rate...
+MIN_OFFERED = 0.95
+# ...and 99% of them arrived within this many ns of being sent
+MAX_P99_LAG_NS = 50_000_000
+
+# Messages are Control Changes carrying an 18-bit sequence number
+SEQ_MASK = (1 << 18) - 1
+
+CONFIGS = ("headless", "per-message", "batched")
+PORT_NAME = "MIDI/HID Inspektr Benchmark"
+
+
+def encode_seq(seq):
+    seq &= SEQ_MASK
+    return [0xB0 | (seq >> 14), (seq >> 7) & 0x7F, seq & 0x7F]
+
+
+def decode_seq(data):
+    return ((data[0] & 0x0F) << 14) | (data[1] << 7) | data[2]
+
+
+class RateResult:
+    """Outcome of offering one rate to one pipeline"""
+
+    def __init__(self, rate, sent, received, elapsed, lag):
+        self.rate = rate
+        self.sent = sent
+        self.received = received
+        self.elapsed = elapsed
+        self.lag = lag
+
+    @property
+    def offered(self):
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def sustained(self):
+        return (
+            self.sent > 0
+            and self.received >= self.sent * MIN_DELIVERED
+            and self.offered >= self.rate * MIN_OFFERED
+            and self.lag.percentile(99) <= MAX_P99_LAG_NS
+        )
+
+    def __str__(self):
+        return (
+            f"{self.rate:>8,} msg/s  offered {self.offered:>9,.0f}  "
+            f"delivered {self.received}/{self.sent}  "
+            f"lag p50 {self.lag.percentile(50) / 1e6 if self.lag.count else 0:.2f} ms "
+            f"p99 {self.lag.percentile(99) / 1e6 if self.lag.count else 0:.2f} ms  "
+            f"{'ok' if self.sustained else 'FAIL'}"
+        )
+
+
+class Recorder:
+    """Counts delivered messages and how long after sending they arrived"""
+
+    def __init__(self):
+        self.send_ns = array("q", bytes(8 * (SEQ_MASK + 1)))
+        self.reset()
+
+    def reset(self):
+        self.received = 0
+        self.lag = LogHistogram()
+
+    def on_messages(self, messages):
+        received_ns = now_ns()
+        for data in messages:
+            self.lag.record(received_ns - self.send_ns[decode_seq(data)])
+        self.received += len(messages)
+
+
+def send_at_rate(send, recorder, rate, duration):
+    """Send rate messages/second for duration seconds; returns (sent, elapsed)"""
+    total = int(rate * duration)
+    start = now_ns()
+    sent = 0
+    while sent < total:
+        due = min(total, (now_ns() - start) * rate // 1_000_000_000 + 1)
+        while sent < due:
+            recorder.send_ns[sent & SEQ_MASK] = now_ns()
+            send(encode_seq(sent))
+            sent += 1
+        time.sleep(0.0005)
+    return sent, (now_ns() - start) / 1e9
+
+
+class Pipeline:
+    """One delivery configuration fed from a virtual port loopback
+
+    headless writes every message into a capture file from the rtmidi
+    callback like --capture does; per-message and batched go through
+    SimpleMIDIHandler's signals to a Qt event loop.
+    """
+
+    def __init__(self, config):
+        from midi_hid_app.midi_core import MIDIHandler
+
+        self.config = config
+        self.recorder = Recorder()
+        self.core = MIDIHandler()
+        self.qt_handler = None
+        self.app = None
+        self.writer = None
+
+        name = f"{PORT_NAME} {config}"
+        if not self.core.create_virtual_port(name):
+            raise RuntimeError("could not create the virtual ports")
+        ports = [p for p in self.core.get_ports() if f"{name} Output" in p]
+        if not ports or not self.core.connect_port(ports[0]):
+            raise RuntimeError(f"could not connect to '{name} Output'")
+
+        if config == "headless":
+            fd, path = tempfile.mkstemp(suffix=".mhc")
+            os.close(fd)
+            self.writer = CaptureWriter(path, [(SOURCE_MIDI, ports[0])])
+
+            def on_message(data, time_stamp, port_name):
+                self.writer.write_event(0, data, time.time_ns())
+                self.recorder.on_messages((data,))
+
+            self.core.message_bus.subscribe(on_message)
+            return
+
+        from PySide6.QtCore import QCoreApplication
+        from midi_hid_app.simple_midi import SimpleMIDIHandler
+
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.qt_handler = SimpleMIDIHandler(self.core)
+        if config == "batched":
+            self.qt_handler.set_batching(60)
+            self.qt_handler.messages_received.connect(
+                lambda batch: self.recorder.on_messages([m[0] for m in batch])
+            )
+        else:
+            self.qt_handler.message_received.connect(
+                lambda data, time_stamp, port_name: self.recorder.on_messages((data,))
+            )
+
+    def wait(self, seconds):
+        """Let the pipeline deliver for seconds (runs the Qt loop if needed)"""
+        if self.app is None:
+            time.sleep(seconds)
+            return
+
+        from PySide6.QtCore import QEventLoop, QTimer
+
+        loop = QEventLoop()
+        QTimer.singleShot(int(seconds * 1000), loop.quit)
+        loop.exec()
+
+    def offer(self, rate, duration):
+        """Send at rate for duration seconds and collect what arrives"""
+        self.recorder.reset()
+        result = {}
+
+        def sender():
+            result["sent"], result["elapsed"] = send_at_rate(
+                self.core.midi_out.send_message, self.recorder, rate, duration
+            )
+
+        thread = threading.Thread(target=sender, daemon=True)
+        thread.start()
+        while thread.is_alive():
+            self.wait(0.05)
+
+        # Grace period for messages still in flight
+        deadline = time.monotonic() + 1.0
+        while self.recorder.received < result["sent"] and time.monotonic() < deadline:
+            self.wait(0.05)
+
+        return RateResult(
+            rate,
+            result["sent"],
+            self.recorder.received,
+            result["elapsed"],
+            self.recorder.lag,
+        )
+
+    def close(self):
+        if self.qt_handler is not None:
+            self.qt_handler.set_batching(None)
+        self.core.close_all()
+        if self.writer is not None:
+            self.writer.close()
+            os.remove(self.writer.path)
+
+
+def run_benchmark(configs=CONFIGS, rates=RATES, duration=2.0):
+    """Entry point for main.py --benchmark; returns a process exit code"""
+    if platform.system() not in ("Darwin", "Linux"):
+        print("Virtual MIDI ports are not supported on this platform")
+        return 1
+
+    summary = []
+    for config in configs:
+        print(f"\n=== {config} ===")
+        try:
+            pipeline = Pipeline(config)
+        except Exception as e:
+            print(f"Skipped: {e}")
+            continue
+
+        best = None
+        for rate in rates:
+            result = pipeline.offer(rate, duration)
+            print(result)
+            if not result.sustained:
+                break
+            best = rate
+        pipeline.close()
+        summary.append((config, best))
+
+    print("\n=== Maximum sustained rate ===")
+    for config, best in summary:
+        print(
+            f"  {config:<12} "
+            + (f"{best:,} msg/s" if best else "below the lowest rate")
+        )
+    return 0
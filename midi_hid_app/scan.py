@@ -0,0 +1,79 @@
+# midi_hid_app/scan.py - Qt-free device scan for main.py --scan
+from concurrent.futures import ThreadPoolExecutor
+
+
+def scan_midi():
+    """Return MIDI ports as {"physical": [...], "virtual": [...]}"""
+    from midi_hid_app.midi_core import MIDIHandler
+
+    ports = MIDIHandler().get_ports_by_type()
+    return {"physical": ports["physical"], "virtual": ports["virtual"]}
+
+
+def scan_hid():
+    """Return HID devices as a list of JSON-friendly dicts"""
+    from midi_hid_app.hid_core import HIDHandler
+
+    devices = []
+    for device in HIDHandler().get_devices():
+        path = device.get("path", b"")
+        devices.append(
+            {
+                "vendor_id": device.get("vendor_id", 0),
+                "product_id": device.get("product_id", 0),
+                "manufacturer": device.get("manufacturer_string") or "Unknown",
+                "product": device.get("product_string") or "Unknown",
+                "serial_number": device.get("serial_number") or "",
+                "usage_page": device.get("usage_page", 0),
+                "usage": device.get("usage", 0),
+                "interface_number": device.get("interface_number", -1),
+                "path": (
+                    path.decode("utf-8", "replace") if isinstance(path, bytes) else path
+                ),
+            }
+        )
+    return devices
+
+
+def scan_devices():
+    """Enumerate MIDI and HID at the same time
+
+    Returns {"midi": ..., "hid": ..., "errors": {...}}; a backend that fails
+    to load or enumerate leaves its section empty and reports why in errors.
+    """
+    result = {"midi": {"physical": [], "virtual": []}, "hid": [], "errors": {}}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = {"midi": pool.submit(scan_midi), "hid": pool.submit(scan_hid)}
+        for name, future in futures.items():
+            try:
+                result[name] = future.result()
+            except Exception as e:
+                result["errors"][name] = str(e)
+    return result
+
+
+def print_scan(result):
+    """Print a scan result in the human readable --scan format"""
+    midi_ports = result["midi"]
+    print("\n=== MIDI Ports ===")
+    if "midi" in result["errors"]:
+        print(f"MIDI unavailable: {result['errors']['midi']}")
+    print(f"Physical ports ({len(midi_ports['physical'])}):")
+    for port in midi_ports["physical"]:
+        print(f"  - {port}")
+
+    print(f"\nVirtual ports ({len(midi_ports['virtual'])}):")
+    for port in midi_ports["virtual"]:
+        print(f"  - {port}")
+
+    hid_devices = result["hid"]
+    print(f"\n=== HID Devices ({len(hid_devices)}) ===")
+    if "hid" in result["errors"]:
+        print(f"HID unavailable: {result['errors']['hid']}")
+    for device in hid_devices:
+        print(
+            f"  - {device['manufacturer']} {device['product']} "
+            f"({device['vendor_id']:04x}:{device['product_id']:04x})"
+        )
+
+    print("")
@@ -0,0 +1,118 @@
+# midi_hid_app/scheduler.py - Timestamped MIDI output from a dedicated thread
+import heapq
+import itertools
+import threading
+import time
+from midi_hid_app.histogram import LogHistogram
+
+
+def now_ns():
+    """Scheduler clock (time.perf_counter_ns)"""
+    return time.perf_counter_ns()
+
+
+class MidiScheduler:
+    """Sends MIDI messages at exact times on the perf_counter_ns clock
+
+    Messages wait in a heap ordered by due time. The scheduler thread
+    sleeps until SPIN_NS before the earliest one is due and busy-waits the
+    rest of the way, since OS sleeps routinely overshoot by 50-100 us or
+    more. Lateness (send time minus due time, in ns) of every message goes
+    into the lateness histogram.
+
+    send is called as send(port, data) on the scheduler thread, e.g.
+    MIDIHandler.send_midi; a False return counts as a failed send.
+    """
+
+    SPIN_NS = 1_000_000
+
+    def __init__(self, send, spin_ns=SPIN_NS):
+        self.send = send
+        self.spin_ns = spin_ns
+
+        self.lateness = LogHistogram()
+        self.sent = 0
+        self.failed = 0
+
+        self._heap = []  # (at_ns, order, port, data)
+        self._order = itertools.count()  # keeps equal times in FIFO order
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def __len__(self):
+        return len(self._heap)
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread; unsent messages stay queued"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(2.0)
+        self._thread = None
+
+    def schedule(self, port, data, at_ns):
+        """Send data to port when now_ns() reaches at_ns"""
+        with self._condition:
+            heapq.heappush(self._heap, (at_ns, next(self._order), port, data))
+            if self._heap[0][0] == at_ns:
+                self._condition.notify()
+
+    def schedule_batch(self, events):
+        """Schedule (port, data, at_ns) tuples in one go"""
+        with self._condition:
+            for port, data, at_ns in events:
+                self._heap.append((at_ns, next(self._order), port, data))
+            heapq.heapify(self._heap)
+            self._condition.notify()
+
+    def cancel_all(self):
+        """Drop every message that has not been sent yet"""
+        with self._condition:
+            self._heap.clear()
+
+    def reset_stats(self):
+        """Start the lateness statistics and counters over"""
+        self.lateness.clear()
+        self.sent = 0
+        self.failed = 0
+
+    def _run(self):
+        """Thread function: wait for the next due message and send it"""
+        heap = self._heap
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                if not heap:
+                    self._condition.wait()
+                    continue
+
+                at_ns = heap[0][0]
+                remaining = at_ns - now_ns()
+                if remaining > self.spin_ns:
+                    # Woken early by stop() or an earlier message: re-check
+                    self._condition.wait((remaining - self.spin_ns) / 1e9)
+                    continue
+
+                at_ns, order, port, data = heapq.heappop(heap)
+
+            while now_ns() < at_ns:
+                pass
+
+            late = now_ns() - at_ns
+            if self.send(port, data) is False:
+                self.failed += 1
+            else:
+                self.sent += 1
+            self.lateness.record(late)
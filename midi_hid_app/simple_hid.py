@@ -1,117 +1,135 @@
-# midi_hid_app/simple_hid.py - Simple HID handling class
-import hid
-import threading
+# midi_hid_app/simple_hid.py - Qt adapter around the core HID handler
 from PySide6.QtCore import QObject, Signal
+from midi_hid_app.event_bus import BoundedEventQueue, DROP_OLDEST
+from midi_hid_app.hid_core import HIDHandler
 
 
 class SimpleHIDHandler(QObject):
-    """A minimal HID handler that emits signals when HID data is received"""
+    """A minimal HID handler that emits signals when HID data is received
+
+    Thin Qt layer over hid_core.HIDHandler that turns its report bus into
+    signals; everything else is forwarded to the core handler.
+
+    Like SimpleMIDIHandler, reader threads hand their drain passes over
+    through a bounded queue that the GUI thread empties when woken; see
+    set_backpressure(). Dropped reports are counted per device in
+    counters.dropped.
+    """
+
+    # Drain passes (of up to max_batch_size reports) that may wait for the
+    # GUI thread by default
+    QUEUE_CAPACITY = 1024
 
     # Signal emitted when HID data is received: device_info, data, device_name
     message_received = Signal(dict, bytes, str)
 
-    def __init__(self):
+    # Signal emitted with every report drained in one read pass when batching
+    # is enabled: device_info, [(timestamp_ns, data), ...], device_name
+    messages_received = Signal(dict, list, str)
+
+    # Internal: asks the GUI thread to drain the hand-off queue
+    _wake = Signal()
+
+    def __init__(self, core=None):
         super().__init__()
-        self.connected_devices = {}  # path -> (device, thread, stop_event)
+        self.core = core if core is not None else HIDHandler()
+
+        # Batched delivery (off by default, see set_batching)
+        self.batching = False
+
+        # Hand-off between the reader threads and the GUI thread
+        self._queue = BoundedEventQueue(
+            self.QUEUE_CAPACITY, DROP_OLDEST, on_drop=self._count_drop
+        )
+        self._wake_pending = False
+        self._wake.connect(self._on_wake)
+
+        self.core.report_bus.subscribe(self._on_core_reports)
+
+    @property
+    def connected_devices(self):
+        return self.core.connected_devices
+
+    @property
+    def counters(self):
+        return self.core.counters
+
+    @property
+    def report_decoders(self):
+        return self.core.report_decoders
+
+    @property
+    def dropped(self):
+        return self._queue.dropped
+
+    @property
+    def capture_store(self):
+        return self.core.capture_store
+
+    def set_batching(self, enabled=True, max_batch_size=256):
+        """Deliver drained reports through messages_received as one batch
+
+        With batching off every report still gets its own message_received.
+        max_batch_size bounds how many reports one drain pass collects.
+        """
+        self.batching = enabled
+        self.core.max_batch_size = max(1, int(max_batch_size))
+
+    def set_capture_store(self, store):
+        """Write every received report into a CaptureStore"""
+        self.core.set_capture_store(store)
+
+    def set_backpressure(self, policy=DROP_OLDEST, capacity=QUEUE_CAPACITY):
+        """Set what happens when capacity drain passes are waiting for the GUI
+
+        policy is one of event_bus.DROP_OLDEST, DROP_NEWEST or BLOCK.
+        """
+        self._queue.configure(capacity, policy)
+
+    def _count_drop(self, item):
+        """Charge a dropped drain pass to its device (queue lock held)"""
+        counters = self.core.counters
+        slot = counters.slot_of(item[0]["path"])
+        if slot is not None:
+            counters.dropped[slot] += len(item[1])
+
+    def _on_core_reports(self, device_info, reports, device_name):
+        """Hand one drain pass over from a device reader thread"""
+        self._queue.put((device_info, reports, device_name))
+        if not self._wake_pending:
+            self._wake_pending = True
+            self._wake.emit()
+
+    def _on_wake(self):
+        self._wake_pending = False
+        self.flush_reports()
+
+    def flush_reports(self):
+        """Deliver every pending drain pass"""
+        for device_info, reports, device_name in self._queue.drain():
+            if self.batching:
+                self.messages_received.emit(device_info, reports, device_name)
+            else:
+                for timestamp_ns, report in reports:
+                    self.message_received.emit(device_info, report, device_name)
 
     def get_devices(self):
         """Get list of available HID devices"""
-        try:
-            return hid.enumerate()
-        except Exception as e:
-            print(f"Error enumerating HID devices: {e}")
-            return []
+        return self.core.get_devices()
 
     def connect_device(self, device_info):
         """Connect to an HID device using its info dict"""
-        try:
-            path = device_info["path"]
-            if path in self.connected_devices:
-                return True  # Already connected
-
-            # Create a friendly name for the device
-            vendor_id = device_info.get("vendor_id", 0)
-            product_id = device_info.get("product_id", 0)
-            manufacturer = device_info.get("manufacturer_string", "Unknown")
-            product = device_info.get("product_string", "Unknown")
-
-            device_name = f"{manufacturer} {product} ({vendor_id:04x}:{product_id:04x})"
-
-            # Open the device
-            device = hid.device()
-            device.open_path(path)
-
-            # Set up a stop event for the thread
-            stop_event = threading.Event()
-
-            # Create and start a thread to read from the device
-            thread = threading.Thread(
-                target=self._read_device_thread,
-                args=(device, device_info, device_name, stop_event),
-                daemon=True,
-            )
-            thread.start()
-
-            # Store references
-            self.connected_devices[path] = (device, thread, stop_event)
-            return True
-
-        except Exception as e:
-            print(f"Error connecting to HID device: {e}")
-            return False
-
-    def _read_device_thread(self, device, device_info, device_name, stop_event):
-        """Thread function to continuously read from the device"""
-        try:
-            while not stop_event.is_set():
-                try:
-                    # Non-blocking read with timeout (100ms)
-                    data = device.read(64, timeout_ms=100)
-                    if data:
-                        # Use bytes() to ensure we have a proper bytes object
-                        self.message_received.emit(
-                            device_info, bytes(data), device_name
-                        )
-                except IOError:
-                    # Device disconnected or read error
-                    break
-        except Exception as e:
-            print(f"Error reading from HID device: {e}")
-        finally:
-            try:
-                device.close()
-            except:
-                pass
+        return self.core.connect_device(device_info)
 
     def disconnect_device(self, device_path):
         """Disconnect from an HID device"""
-        if device_path not in self.connected_devices:
+        if not self.core.disconnect_device(device_path):
             return False
 
-        try:
-            device, thread, stop_event = self.connected_devices[device_path]
-
-            # Signal thread to stop
-            stop_event.set()
-
-            # Close device
-            try:
-                device.close()
-            except:
-                pass
-
-            # Wait for thread with timeout
-            thread.join(1.0)
-
-            # Remove from connected devices
-            del self.connected_devices[device_path]
-            return True
-
-        except Exception as e:
-            print(f"Error disconnecting HID device: {e}")
-            return False
+        # Deliver whatever the device sent before it was closed
+        self.flush_reports()
+        return True
 
     def close_all(self):
         """Disconnect all devices"""
-        for path in list(self.connected_devices.keys()):
-            self.disconnect_device(path)
+        self.core.close_all()
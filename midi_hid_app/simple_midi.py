@@ -1,145 +1,177 @@
-# midi_hid_app/simple_midi.py
-import rtmidi
-import re
-import platform
-from PySide6.QtCore import QObject, Signal
+# midi_hid_app/simple_midi.py - Qt adapter around the core MIDI handler
+from PySide6.QtCore import QObject, QTimer, Signal
+from midi_hid_app.event_bus import BoundedEventQueue, DROP_OLDEST
+from midi_hid_app.midi_core import MIDIHandler
 
 
 class SimpleMIDIHandler(QObject):
-    """A more robust MIDI handler that can detect physical vs. virtual ports"""
+    """A more robust MIDI handler that can detect physical vs. virtual ports
+
+    Thin Qt layer over midi_core.MIDIHandler that turns its message bus into
+    signals; everything else is forwarded to the core handler.
+
+    Callbacks never emit the messages themselves: they go into a bounded
+    hand-off queue and the GUI thread is woken (at most once at a time) to
+    drain it, so a flooding port can't build an unbounded backlog of
+    queued signals. What happens when the queue is full is set with
+    set_backpressure(); dropped messages are counted per port in
+    counters.dropped.
+    """
+
+    # Messages that may wait for the GUI thread by default
+    QUEUE_CAPACITY = 8192
 
     # Signal emitted when MIDI data is received: data, timestamp, port_name
     message_received = Signal(list, float, str)
 
-    def __init__(self):
+    # Signal emitted with a batch of MIDI messages when batching is enabled:
+    # [(data, timestamp, port_name), ...]
+    messages_received = Signal(list)
+
+    # Internal: asks the GUI thread to drain the hand-off queue
+    _wake = Signal()
+
+    def __init__(self, core=None):
         super().__init__()
-        self.midi_in = rtmidi.MidiIn()
-        self.midi_out = rtmidi.MidiOut()
-        self.connected_ports = {}  # port_name -> midi_in object
-
-        # Common virtual port identifiers
-        self.virtual_port_patterns = [
-            r"(?i)virtual",  # Any port with "virtual" in the name
-            r"(?i)neyrinck",  # Neyrinck V-Control
-            r"(?i)IAC",  # macOS Inter-Application Communication
-            r"(?i)LoopBe",  # LoopBe Internal MIDI
-            r"(?i)LoopMIDI",  # LoopMIDI
-            r"(?i)Microsoft GS",  # Microsoft GS Wavetable Synth
-            r"(?i)VMPK",  # Virtual MIDI Piano Keyboard
-            r"(?i)rtpMIDI",  # Network MIDI
-            r"(?i)MIDI Yoke",  # MIDI Yoke
-            r"(?i)Midi Through",  # MIDI Through port
-        ]
+        self.core = core if core is not None else MIDIHandler()
 
-    def get_ports(self):
-        """Get list of all available MIDI ports"""
-        return self.midi_in.get_ports()
+        # Batched delivery (off by default, see set_batching)
+        self.batching = False
+        self.max_batch_size = 256
+        self._flush_timer = None
 
-    def get_ports_by_type(self):
-        """Get MIDI ports categorized as physical or virtual"""
-        all_ports = self.get_ports()
-        physical_ports = []
-        virtual_ports = []
+        # Hand-off between the rtmidi callbacks and the GUI thread
+        self._queue = BoundedEventQueue(
+            self.QUEUE_CAPACITY, DROP_OLDEST, on_drop=self._count_drop
+        )
+        self._wake_pending = False
+        self._wake.connect(self._on_wake)
 
-        for port in all_ports:
-            if self._is_likely_virtual_port(port):
-                virtual_ports.append(port)
-            else:
-                physical_ports.append(port)
+        self.core.message_bus.subscribe(self._on_core_message)
 
-        return {"all": all_ports, "physical": physical_ports, "virtual": virtual_ports}
+    @property
+    def midi_in(self):
+        return self.core.midi_in
 
-    def _is_likely_virtual_port(self, port_name):
-        """Determine if a port is likely a virtual port based on its name"""
-        for pattern in self.virtual_port_patterns:
-            if re.search(pattern, port_name):
-                return True
-        return False
+    @property
+    def midi_out(self):
+        return self.core.midi_out
 
-    def create_virtual_port(self, name="MIDI Test Virtual Port"):
-        """Create a virtual MIDI port for testing"""
-        try:
-            # Different behavior based on platform
-            if platform.system() == "Darwin":  # macOS
-                self.midi_in.open_virtual_port(name + " Input")
-                self.midi_out.open_virtual_port(name + " Output")
-                return True
-            elif platform.system() == "Linux":
-                self.midi_in.open_virtual_port(name + " Input")
-                self.midi_out.open_virtual_port(name + " Output")
-                return True
-            else:  # Windows doesn't properly support virtual ports in rtmidi
-                return False
-        except Exception as e:
-            print(f"Error creating virtual port: {e}")
-            return False
+    @property
+    def connected_ports(self):
+        return self.core.connected_ports
 
-    def connect_port(self, port_name):
-        """Connect to a specific MIDI port by name"""
-        if port_name in self.connected_ports:
-            return True  # Already connected
+    @property
+    def counters(self):
+        return self.core.counters
 
-        try:
-            ports = self.get_ports()
-            if port_name not in ports:
-                print(f"Port '{port_name}' not found")
-                return False
+    @property
+    def dropped(self):
+        return self._queue.dropped
 
-            port_index = ports.index(port_name)
+    @property
+    def capture_store(self):
+        return self.core.capture_store
 
-            # Create a new MidiIn instance for this port
-            midi_in = rtmidi.MidiIn()
-            midi_in.open_port(port_index)
+    @property
+    def scheduler(self):
+        return self.core.scheduler
 
-            # Create closure to capture port name
-            def callback(message, time_stamp):
-                self.message_received.emit(message[0], time_stamp, port_name)
+    def get_ports(self):
+        """Get list of all available MIDI ports"""
+        return self.core.get_ports()
 
-            midi_in.set_callback(callback)
-            self.connected_ports[port_name] = midi_in
-            return True
+    def get_ports_by_type(self):
+        """Get MIDI ports categorized as physical or virtual"""
+        return self.core.get_ports_by_type()
 
-        except Exception as e:
-            print(f"Error connecting to MIDI port '{port_name}': {e}")
-            return False
+    def create_virtual_port(self, name="MIDI Test Virtual Port"):
+        """Create a virtual MIDI port for testing"""
+        return self.core.create_virtual_port(name)
+
+    def connect_port(self, port_name):
+        """Connect to a specific MIDI port by name"""
+        return self.core.connect_port(port_name)
+
+    def set_capture_store(self, store):
+        """Write every received message into a CaptureStore"""
+        self.core.set_capture_store(store)
 
     def send_midi(self, port_name, midi_data):
         """Send MIDI data to a port"""
-        try:
-            ports = self.midi_out.get_ports()
-            if port_name not in ports:
-                print(f"Output port '{port_name}' not found")
-                return False
-
-            port_index = ports.index(port_name)
-
-            # Open port, send message, and close
-            midi_out = rtmidi.MidiOut()
-            midi_out.open_port(port_index)
-            midi_out.send_message(midi_data)
-            midi_out.close_port()
-            return True
-
-        except Exception as e:
-            print(f"Error sending MIDI to port '{port_name}': {e}")
-            return False
+        return self.core.send_midi(port_name, midi_data)
+
+    def set_batching(self, rate_hz=60, max_batch_size=256):
+        """Deliver messages through messages_received instead of message_received
+
+        The hand-off queue is flushed rate_hz times per second, or as soon
+        as max_batch_size messages are pending. Pass rate_hz=None to go back
+        to one signal per message.
+        """
+        if not rate_hz:
+            if self._flush_timer is not None:
+                self._flush_timer.stop()
+            self.flush_batches()
+            self.batching = False
+            return
+
+        self.max_batch_size = max(1, int(max_batch_size))
+        if self._flush_timer is None:
+            self._flush_timer = QTimer(self)
+            self._flush_timer.timeout.connect(self.flush_batches)
+        self._flush_timer.start(max(1, round(1000 / rate_hz)))
+        self.batching = True
+
+    def set_backpressure(self, policy=DROP_OLDEST, capacity=QUEUE_CAPACITY):
+        """Set what happens when capacity messages are waiting for the GUI
+
+        policy is one of event_bus.DROP_OLDEST, DROP_NEWEST or BLOCK.
+        """
+        self._queue.configure(capacity, policy)
+
+    def _count_drop(self, item):
+        """Charge a dropped message to its port (queue lock held)"""
+        counters = self.core.counters
+        slot = counters.slot_of(item[2])
+        if slot is not None:
+            counters.dropped[slot] += 1
+
+    def _on_core_message(self, data, time_stamp, port_name):
+        """Hand one message over from the rtmidi callback thread"""
+        queue = self._queue
+        queue.put((data, time_stamp, port_name))
+        if not self._wake_pending and (
+            not self.batching or len(queue) >= self.max_batch_size
+        ):
+            self._wake_pending = True
+            self._wake.emit()
+
+    def _on_wake(self):
+        self._wake_pending = False
+        self.flush_batches()
+
+    def flush_batches(self):
+        """Deliver all pending messages (as one messages_received when batching)"""
+        items = self._queue.drain()
+        if not items:
+            return
+        if self.batching:
+            self.messages_received.emit(items)
+        else:
+            for data, time_stamp, port_name in items:
+                self.message_received.emit(data, time_stamp, port_name)
 
     def disconnect_port(self, port_name):
         """Disconnect from a MIDI port"""
-        if port_name not in self.connected_ports:
+        if not self.core.disconnect_port(port_name):
             return False
 
-        try:
-            midi_in = self.connected_ports[port_name]
-            midi_in.cancel_callback()
-            midi_in.close_port()
-            del self.connected_ports[port_name]
-            return True
-        except Exception as e:
-            print(f"Error disconnecting from MIDI port '{port_name}': {e}")
-            return False
+        # Deliver whatever the port sent before it was closed
+        self.flush_batches()
+        return True
 
     def close_all(self):
         """Disconnect all ports"""
         for port_name in list(self.connected_ports.keys()):
             self.disconnect_port(port_name)
+        self.core.close_all()
@@ -1,16 +1,41 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                              QLabel, QPushButton, QComboBox, QTextEdit,
+                              QLabel, QPushButton, QComboBox, QTableView,
+                              QHeaderView, QAbstractItemView,
                               QGroupBox, QSplitter, QCheckBox, QRadioButton,
                               QButtonGroup, QMessageBox, QTabWidget,
                               QMenuBar, QMenu)  # These are in QtWidgets
-from PySide6.QtGui import QAction  # QAction is in QtGui, not QtWidgets
-from PySide6.QtCore import Qt, QTimer, Slot
+from PySide6.QtGui import QAction, QActionGroup, QFontDatabase  # QAction is in QtGui, not QtWidgets
+from PySide6.QtCore import Qt, QTimer, Signal, Slot
 from midi_hid_app.about import AboutDialog  # Import the About dialog
+from midi_hid_app.capture_store import CaptureStore, SOURCE_HID
+from midi_hid_app.capture_file import CaptureReader, CaptureWriter, CaptureFormatError
+from midi_hid_app.event_model import EventTableModel
+from midi_hid_app.source_stats import SourceStats
+from midi_hid_app.stats_model import SourceStatsModel
+from midi_hid_app.counters import ThroughputMeter, format_throughput
+from midi_hid_app.event_bus import DROP_OLDEST, DROP_NEWEST, BLOCK
+from midi_hid_app.device_scanner import DeviceScanner
+from midi_hid_app.device_list_model import midi_port_model, hid_device_model
+from midi_hid_app.hotplug import HotplugMonitor
+from midi_hid_app.hid_core import device_display_name
+from midi_hid_app.scheduler import now_ns
 
 class SimpleMainWindow(QMainWindow):
     """An improved main window that properly handles virtual and physical ports"""
     
-    def __init__(self, midi_handler, hid_handler):
+    # How often new events are pushed into the table (ms)
+    SYNC_INTERVAL_MS = 33
+    
+    # How often the timing statistics panel is redrawn (ms)
+    STATS_INTERVAL_MS = 500
+    
+    # How often the throughput strip is redrawn (ms)
+    THROUGHPUT_INTERVAL_MS = 250
+    
+    # Emitted whenever the device lists have been refreshed
+    devices_refreshed = Signal()
+    
+    def __init__(self, midi_handler, hid_handler, capture_store=None):
         super().__init__()
         self.setWindowTitle("MIDI/HID Inspektr")
         self.resize(900, 700)
@@ -18,6 +43,58 @@ class SimpleMainWindow(QMainWindow):
         self.midi_handler = midi_handler
         self.hid_handler = hid_handler
         
+        # The Data Monitor shows whatever the handlers write into the store
+        if capture_store is None:
+            capture_store = CaptureStore()
+            midi_handler.set_capture_store(capture_store)
+            hid_handler.set_capture_store(capture_store)
+        self.capture_store = capture_store
+        self.event_model = EventTableModel(capture_store, self)
+        
+        # Inter-arrival timing per source, updated in the capture path
+        self.source_stats = SourceStats()
+        self.source_stats.attach(capture_store)
+        self.stats_model = SourceStatsModel(capture_store, self.source_stats, self)
+        
+        # Live recording to a capture file (see toggle_recording)
+        self.capture_writer = None
+        self.capture_listener = None
+        
+        # Capture file shown in the Data Monitor instead of live data
+        self.capture_reader = None
+        
+        # Device lists from the last scan; enumeration runs off the GUI thread
+        self.midi_ports = {'all': [], 'physical': [], 'virtual': []}
+        self.midi_model = midi_port_model(self)
+        self.hid_model = hid_device_model(self)
+        self.scanner = DeviceScanner(midi_handler, hid_handler, self)
+        
+        # Device lists follow devices being plugged in and out. The monitor
+        # starts after the first scan (see on_scan_finished): its polling
+        # fallback enumerates devices straight away, which must not happen
+        # before the window is up
+        self.hotplug = HotplugMonitor(midi_handler.get_ports, hid_handler.get_devices)
+        self.scanner.watch_hotplug(self.hotplug)
+        self.hotplug_started = False
+        
+        # Coalesces data signals into one table update per interval
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.setInterval(self.SYNC_INTERVAL_MS)
+        self.sync_timer.timeout.connect(self.sync_event_view)
+        
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(self.STATS_INTERVAL_MS)
+        self.stats_timer.timeout.connect(self.stats_model.refresh)
+        self.stats_timer.start()
+        
+        # Per-source rates from the handlers' reader-thread counters
+        self.throughput_meter = ThroughputMeter(midi_handler.counters, hid_handler.counters)
+        self.throughput_timer = QTimer(self)
+        self.throughput_timer.setInterval(self.THROUGHPUT_INTERVAL_MS)
+        self.throughput_timer.timeout.connect(self.update_throughput)
+        self.throughput_timer.start()
+        
         # Apply platform-specific tweaks
         self.apply_platform_tweaks()
         
@@ -30,8 +107,8 @@ class SimpleMainWindow(QMainWindow):
         # Connect signals
         self.setup_connections()
         
-        # Initial device scan (after a short delay to ensure UI is fully built)
-        QTimer.singleShot(100, self.refresh_devices)
+        # The initial device scan is left to the caller so the window can be
+        # shown before rtmidi and hidapi are loaded (see main.py)
 
     def apply_platform_tweaks(self):
         """Apply platform-specific UI tweaks"""
@@ -63,6 +140,23 @@ class SimpleMainWindow(QMainWindow):
         save_log_action.triggered.connect(self.save_log)
         file_menu.addAction(save_log_action)
         
+        # Open capture file action
+        open_capture_action = QAction("Open Capture...", self)
+        open_capture_action.setShortcut("Ctrl+O")
+        open_capture_action.triggered.connect(self.open_capture)
+        file_menu.addAction(open_capture_action)
+        
+        self.live_data_action = QAction("Show Live Data", self)
+        self.live_data_action.setEnabled(False)
+        self.live_data_action.triggered.connect(self.show_live_data)
+        file_menu.addAction(self.live_data_action)
+        
+        # Record to capture file action
+        self.record_action = QAction("Start Recording...", self)
+        self.record_action.setShortcut("Ctrl+R")
+        self.record_action.triggered.connect(self.toggle_recording)
+        file_menu.addAction(self.record_action)
+        
         file_menu.addSeparator()
         
         # Exit action
@@ -107,6 +201,22 @@ class SimpleMainWindow(QMainWindow):
         clear_action.triggered.connect(self.clear_display)
         view_menu.addAction(clear_action)
         
+        view_menu.addSeparator()
+        
+        # What to do when devices send faster than the display keeps up
+        overload_menu = view_menu.addMenu("When Overloaded")
+        overload_group = QActionGroup(self)
+        for label, policy in (("Drop Oldest Events", DROP_OLDEST),
+                              ("Drop Newest Events", DROP_NEWEST),
+                              ("Slow Down Readers", BLOCK)):
+            policy_action = QAction(label, self)
+            policy_action.setCheckable(True)
+            policy_action.setChecked(policy == DROP_OLDEST)
+            policy_action.triggered.connect(
+                lambda checked, policy=policy: self.set_overload_policy(policy))
+            overload_group.addAction(policy_action)
+            overload_menu.addAction(policy_action)
+        
         # Tools menu
         tools_menu = menu_bar.addMenu("&Tools")
         
@@ -162,6 +272,7 @@ class SimpleMainWindow(QMainWindow):
         # MIDI port selection
         self.midi_combo = QComboBox()
         self.midi_combo.setMinimumWidth(300)
+        self.midi_combo.setModel(self.midi_model)
         midi_layout.addWidget(QLabel("Select MIDI Port:"))
         midi_layout.addWidget(self.midi_combo)
         
@@ -199,6 +310,8 @@ class SimpleMainWindow(QMainWindow):
         
         self.hid_combo = QComboBox()
         self.hid_combo.setMinimumWidth(300)
+        self.hid_combo.setModel(self.hid_model)
+        self.hid_combo.setPlaceholderText("No HID devices found")
         hid_layout.addWidget(QLabel("Select HID Device:"))
         hid_layout.addWidget(self.hid_combo)
         
@@ -243,11 +356,50 @@ class SimpleMainWindow(QMainWindow):
         
         # Data display
         monitor_layout.addWidget(QLabel("MIDI/HID Data:"))
-        self.data_display = QTextEdit()
-        self.data_display.setReadOnly(True)
-        self.data_display.setFontFamily("Monospace")
-        self.data_display.setText("Connect to a device to see data...\n")
-        monitor_layout.addWidget(self.data_display)
+        self.event_view = QTableView()
+        self.event_view.setModel(self.event_model)
+        self.event_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.event_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.event_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.event_view.setShowGrid(False)
+        self.event_view.setWordWrap(False)
+        self.event_view.setAlternatingRowColors(True)
+        
+        # Uniform row heights, so only visible rows are ever measured
+        vertical_header = self.event_view.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(self.event_view.fontMetrics().height() + 4)
+        
+        horizontal_header = self.event_view.horizontalHeader()
+        horizontal_header.setSectionResizeMode(QHeaderView.Interactive)
+        horizontal_header.setStretchLastSection(True)
+        self.event_view.setColumnWidth(EventTableModel.TIME_COLUMN, 110)
+        self.event_view.setColumnWidth(EventTableModel.SOURCE_COLUMN, 260)
+        self.event_view.setColumnWidth(EventTableModel.DATA_COLUMN, 220)
+        
+        # Timing statistics panel beside the data
+        stats_group = QGroupBox("Inter-arrival Time (ms)")
+        stats_layout = QVBoxLayout(stats_group)
+        self.stats_view = QTableView()
+        self.stats_view.setModel(self.stats_model)
+        self.stats_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.stats_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_view.setShowGrid(False)
+        self.stats_view.setWordWrap(False)
+        self.stats_view.verticalHeader().setVisible(False)
+        self.stats_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        stats_layout.addWidget(self.stats_view)
+        
+        self.reset_stats_btn = QPushButton("Reset Statistics")
+        stats_layout.addWidget(self.reset_stats_btn)
+        
+        monitor_splitter = QSplitter(Qt.Horizontal)
+        monitor_splitter.addWidget(self.event_view)
+        monitor_splitter.addWidget(stats_group)
+        monitor_splitter.setStretchFactor(0, 3)
+        monitor_splitter.setStretchFactor(1, 2)
+        monitor_layout.addWidget(monitor_splitter)
         
         # Clear button
         controls_layout = QHBoxLayout()
@@ -261,6 +413,11 @@ class SimpleMainWindow(QMainWindow):
         
         # Add to tabs
         self.tabs.addTab(monitor_tab, "Data Monitor")
+        
+        # Throughput strip, kept in the status bar next to status messages
+        self.throughput_label = QLabel()
+        self.throughput_label.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.statusBar().addPermanentWidget(self.throughput_label)
     
     def setup_connections(self):
         # Button connections
@@ -269,8 +426,12 @@ class SimpleMainWindow(QMainWindow):
         self.hid_connect_btn.clicked.connect(self.connect_hid)
         self.clear_btn.clicked.connect(self.clear_display)
         self.save_btn.clicked.connect(self.save_log)
+        self.reset_stats_btn.clicked.connect(self.reset_stats)
         self.midi_test_btn.clicked.connect(self.send_test_midi)
         
+        # Page older/newer events in when the table is scrolled to an edge
+        self.event_view.verticalScrollBar().valueChanged.connect(self.on_event_view_scrolled)
+        
         # Port type radio buttons
         self.all_ports_radio.toggled.connect(self.update_midi_ports)
         self.physical_ports_radio.toggled.connect(self.update_midi_ports)
@@ -280,9 +441,23 @@ class SimpleMainWindow(QMainWindow):
         if self.is_virtual_port_supported():
             self.create_virtual_btn.clicked.connect(self.create_virtual_port)
         
-        # MIDI/HID data signals
+        # Device scan results
+        self.scanner.scanning_changed.connect(self.on_scanning_changed)
+        self.scanner.midi_ports_changed.connect(self.on_midi_ports_changed)
+        self.scanner.hid_devices_changed.connect(self.on_hid_devices_changed)
+        self.scanner.scan_finished.connect(self.on_scan_finished)
+        
+        # MIDI/HID data signals (the data itself is read from the capture store)
         self.midi_handler.message_received.connect(self.on_midi_data)
+        self.midi_handler.messages_received.connect(self.on_midi_batch)
+        self.midi_handler.set_batching(60)
         self.hid_handler.message_received.connect(self.on_hid_data)
+        self.hid_handler.messages_received.connect(self.on_hid_batch)
+        self.hid_handler.set_batching(True)
+        
+        # Display options
+        self.timestamp_check.toggled.connect(self.update_display_options)
+        self.interpret_check.toggled.connect(self.update_display_options)
     
         # Checkbox connections for syncing with menu
         self.autoscroll_check.toggled.connect(self.on_autoscroll_toggled)
@@ -295,19 +470,40 @@ class SimpleMainWindow(QMainWindow):
         return platform.system() in ('Darwin', 'Linux')
     
     def refresh_devices(self):
-        """Refresh the device lists"""
-        # Get MIDI ports
+        """Rescan the device lists in the background"""
+        self.scanner.request_scan()
+    
+    def on_scanning_changed(self, scanning):
+        """Show that a device scan is running"""
+        self.refresh_btn.setEnabled(not scanning)
+        self.refresh_btn.setText("Scanning…" if scanning else "Refresh Devices")
+        if scanning:
+            self.statusBar().showMessage("Scanning devices…")
+    
+    def on_midi_ports_changed(self, ports_by_type, added, removed):
+        """Take the MIDI ports from a scan that found changes"""
+        self.midi_ports = ports_by_type
         self.update_midi_ports()
-        
-        # Get HID devices
-        self.update_hid_devices()
-        
+    
+    def on_hid_devices_changed(self, devices, added, removed):
+        """Take the HID devices from a scan that found changes"""
+        self.hid_model.set_items(devices)
+        if self.hid_combo.currentIndex() < 0 and self.hid_model.rowCount():
+            self.hid_combo.setCurrentIndex(0)
+        self.hid_connect_btn.setEnabled(self.hid_model.rowCount() > 0)
+    
+    def on_scan_finished(self):
+        """Scan done, whether or not anything changed"""
         self.status_message("Devices refreshed")
+        if not self.hotplug_started:
+            self.hotplug_started = True
+            self.hotplug.start()
+        self.devices_refreshed.emit()
     
     def update_midi_ports(self):
         """Update the MIDI port dropdown based on selected port type"""
-        # Get ports categorized by type
-        ports_by_type = self.midi_handler.get_ports_by_type()
+        # Ports categorized by type, from the last scan
+        ports_by_type = self.midi_ports
         
         # Determine which ports to show
         if self.all_ports_radio.isChecked():
@@ -320,62 +516,17 @@ class SimpleMainWindow(QMainWindow):
             ports = ports_by_type['virtual']
             port_type = "virtual"
         
-        # Update the combo box
-        self.midi_combo.clear()
-        
-        if not ports:
-            self.midi_combo.addItem(f"No {port_type} MIDI ports found")
-            self.midi_connect_btn.setEnabled(False)
-        else:
-            for port in ports:
-                # Add a visual indicator for connected ports
-                if port in self.midi_handler.connected_ports:
-                    self.midi_combo.addItem(f"► {port}")
-                else:
-                    self.midi_combo.addItem(port)
-            self.midi_connect_btn.setEnabled(True)
-    
-    def update_hid_devices(self):
-        """Update the HID device dropdown"""
-        # Get HID devices
-        hid_devices = self.hid_handler.get_devices()
-        self.hid_devices = hid_devices  # Store for later access
-        
-        # Update the combo box
-        self.hid_combo.clear()
-        
-        if not hid_devices:
-            self.hid_combo.addItem("No HID devices found")
-            self.hid_connect_btn.setEnabled(False)
-        else:
-            for i, device in enumerate(hid_devices):
-                vendor_id = device.get('vendor_id', 0)
-                product_id = device.get('product_id', 0)
-                manufacturer = device.get('manufacturer_string', 'Unknown')
-                product = device.get('product_string', 'Unknown')
-                
-                display_name = f"{manufacturer} {product} ({vendor_id:04x}:{product_id:04x})"
-                
-                # Add a visual indicator for connected devices
-                path = device['path']
-                if path in self.hid_handler.connected_devices:
-                    self.hid_combo.addItem(f"► {display_name}", i)
-                else:
-                    self.hid_combo.addItem(display_name, i)
-            
-            self.hid_connect_btn.setEnabled(True)
+        # Apply the difference to the combo box (keeps the selection)
+        self.midi_combo.setPlaceholderText(f"No {port_type} MIDI ports found")
+        self.midi_model.set_items(ports)
+        if self.midi_combo.currentIndex() < 0 and self.midi_model.rowCount():
+            self.midi_combo.setCurrentIndex(0)
+        self.midi_connect_btn.setEnabled(self.midi_model.rowCount() > 0)
     
     def connect_midi(self):
         """Connect to or disconnect from the selected MIDI port"""
-        # Get the port name (remove the connection indicator if present)
-        port_text = self.midi_combo.currentText()
-        if port_text.startswith("► "):
-            port_name = port_text[2:]  # Remove the indicator
-        else:
-            port_name = port_text
-        
-        # Check if "No ports found" message
-        if "No" in port_name and "found" in port_name:
+        port_name = self.midi_model.key(self.midi_combo.currentIndex())
+        if port_name is None:
             return
         
         # Check if already connected
@@ -385,7 +536,7 @@ class SimpleMainWindow(QMainWindow):
                 self.status_message(f"Disconnected from MIDI port: {port_name}")
                 self.midi_connect_btn.setText("Connect")
                 self.midi_test_btn.setEnabled(False)
-                self.update_midi_ports()  # Refresh the ports list
+                self.midi_model.set_connected(port_name, False)
         else:
             # Connect
             if self.midi_handler.connect_port(port_name):
@@ -396,7 +547,7 @@ class SimpleMainWindow(QMainWindow):
                 out_ports = self.midi_handler.midi_out.get_ports()
                 self.midi_test_btn.setEnabled(port_name in out_ports)
                 
-                self.update_midi_ports()  # Refresh the ports list
+                self.midi_model.set_connected(port_name, True)
                 
                 # Switch to Data Monitor tab
                 self.tabs.setCurrentIndex(1)
@@ -412,39 +563,44 @@ class SimpleMainWindow(QMainWindow):
                 
     def connect_hid(self):
         """Connect to or disconnect from the selected HID device"""
-        if self.hid_combo.currentIndex() < 0:
-            return
-            
         # Get the device info
-        index = self.hid_combo.currentData()
-        if index is None or "No HID devices found" in self.hid_combo.currentText():
+        device_info = self.hid_model.item(self.hid_combo.currentIndex())
+        if device_info is None:
             return
-            
-        if 0 <= index < len(self.hid_devices):
-            device_info = self.hid_devices[index]
-            path = device_info['path']
-            
-            # Format a nice name for display
-            manufacturer = device_info.get('manufacturer_string', 'Unknown')
-            product = device_info.get('product_string', 'Unknown')
-            device_name = f"{manufacturer} {product}"
-            
-            # Check if already connected
-            if path in self.hid_handler.connected_devices:
-                # Disconnect
-                if self.hid_handler.disconnect_device(path):
-                    self.status_message(f"Disconnected from HID device: {device_name}")
-                    self.hid_connect_btn.setText("Connect")
-                    self.update_hid_devices()  # Refresh the devices list
-            else:
-                # Connect
-                if self.hid_handler.connect_device(device_info):
-                    self.status_message(f"Connected to HID device: {device_name}")
-                    self.hid_connect_btn.setText("Disconnect")
-                    self.update_hid_devices()  # Refresh the devices list
-                    
-                    # Switch to Data Monitor tab
-                    self.tabs.setCurrentIndex(1)
+        path = device_info['path']
+        
+        # Format a nice name for display
+        manufacturer = device_info.get('manufacturer_string', 'Unknown')
+        product = device_info.get('product_string', 'Unknown')
+        device_name = f"{manufacturer} {product}"
+        
+        # Check if already connected
+        if path in self.hid_handler.connected_devices:
+            # Disconnect
+            if self.hid_handler.disconnect_device(path):
+                self.event_model.set_hid_decoder(self.hid_source_id(device_info), None)
+                self.status_message(f"Disconnected from HID device: {device_name}")
+                self.hid_connect_btn.setText("Connect")
+                self.hid_model.set_connected(path, False)
+        else:
+            # Connect
+            if self.hid_handler.connect_device(device_info):
+                self.status_message(f"Connected to HID device: {device_name}")
+                self.hid_connect_btn.setText("Disconnect")
+                self.hid_model.set_connected(path, True)
+                
+                # Show decoded axes and buttons in the Data Monitor
+                self.event_model.set_hid_decoder(
+                    self.hid_source_id(device_info),
+                    self.hid_handler.report_decoders.get(path))
+                
+                # Switch to Data Monitor tab
+                self.tabs.setCurrentIndex(1)
+    
+    def hid_source_id(self, device_info):
+        """Capture store source id of a HID device (one per device path)"""
+        return self.capture_store.register_source(
+            SOURCE_HID, device_display_name(device_info), device_info['path'])
     
     def create_virtual_port(self):
         """Create a virtual MIDI port"""
@@ -466,86 +622,70 @@ class SimpleMainWindow(QMainWindow):
     def send_test_midi(self):
         """Send a test MIDI note"""
         # Get the port name
-        port_text = self.midi_combo.currentText()
-        if port_text.startswith("► "):
-            port_name = port_text[2:]  # Remove the indicator
-        else:
-            port_name = port_text
+        port_name = self.midi_model.key(self.midi_combo.currentIndex())
+        if port_name is None:
+            return
         
         # Send a note on message (channel 1, note 60, velocity 100)
         note_on = [0x90, 60, 100]
         if self.midi_handler.send_midi(port_name, note_on):
             self.status_message(f"Sent test note to {port_name}")
             
-            # After a moment, send note off
-            def send_note_off():
-                note_off = [0x80, 60, 0]
-                self.midi_handler.send_midi(port_name, note_off)
-            
-            # Use a timer to send note off after 300ms
-            QTimer.singleShot(300, send_note_off)
+            # Send note off 300ms later from the output scheduler
+            note_off = [0x80, 60, 0]
+            self.midi_handler.scheduler.schedule(
+                port_name, note_off, now_ns() + 300_000_000)
         else:
             self.status_message(f"Failed to send test note to {port_name}")
     
     def on_midi_data(self, data, timestamp, port_name):
         """Handle incoming MIDI data"""
-        from datetime import datetime
-        
-        # Format timestamp
-        time_str = ""
-        if self.timestamp_check.isChecked():
-            time_str = f"[{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] "
-        
-        # Format as hex
-        hex_data = " ".join([f"{b:02X}" for b in data])
-        
-        # Basic MIDI decoding if requested
-        description = ""
-        if self.interpret_check.isChecked() and data:
-            status = data[0]
-            message_type = status & 0xF0
-            channel = (status & 0x0F) + 1
-            
-            if message_type == 0x80:
-                description = f" - Note Off (Ch: {channel}, Note: {data[1]}, Velocity: {data[2]})"
-            elif message_type == 0x90:
-                if data[2] == 0:
-                    description = f" - Note Off (Ch: {channel}, Note: {data[1]})"
-                else:
-                    description = f" - Note On (Ch: {channel}, Note: {data[1]}, Velocity: {data[2]})"
-            elif message_type == 0xB0:
-                description = f" - Control Change (Ch: {channel}, Control: {data[1]}, Value: {data[2]})"
-            elif message_type == 0xE0:
-                value = (data[2] << 7) | data[1]
-                description = f" - Pitch Bend (Ch: {channel}, Value: {value})"
-            elif data[0] == 0xF0:
-                description = " - SysEx"
-        
-        # Add to display
-        self.data_display.append(f"{time_str}MIDI [{port_name}]: {hex_data}{description}")
-        
-        # Auto-scroll if enabled
-        if self.autoscroll_check.isChecked():
-            self.data_display.ensureCursorVisible()
+        self.schedule_sync()
+    
+    def on_midi_batch(self, batch):
+        """Handle a batch of incoming MIDI data"""
+        self.schedule_sync()
     
     def on_hid_data(self, device_info, data, device_name):
         """Handle incoming HID data"""
-        from datetime import datetime
-        
-        # Format timestamp
-        time_str = ""
-        if self.timestamp_check.isChecked():
-            time_str = f"[{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] "
-        
-        # Format as hex
-        hex_data = " ".join([f"{b:02X}" for b in data])
-        
-        # Add to display
-        self.data_display.append(f"{time_str}HID [{device_name}]: {hex_data}")
+        self.schedule_sync()
+    
+    def on_hid_batch(self, device_info, reports, device_name):
+        """Handle a batch of HID reports drained from one device"""
+        self.schedule_sync()
+    
+    def schedule_sync(self):
+        """Update the event table at most once per SYNC_INTERVAL_MS"""
+        if not self.sync_timer.isActive():
+            self.sync_timer.start()
+    
+    def sync_event_view(self):
+        """Insert all events captured since the last update"""
+        autoscroll = self.autoscroll_check.isChecked()
+        if self.event_model.sync(follow=autoscroll) and autoscroll:
+            self.event_view.scrollToBottom()
+    
+    def on_event_view_scrolled(self, value):
+        """Move the table's window of events when it is scrolled to an edge"""
+        scroll_bar = self.event_view.verticalScrollBar()
+        model = self.event_model
+        top_row = max(self.event_view.rowAt(0), 0)
+        if value == scroll_bar.minimum() and model.has_older():
+            shift = model.page_older()
+        elif value == scroll_bar.maximum() and model.has_newer():
+            shift = -model.page_newer()
+        else:
+            return
         
-        # Auto-scroll if enabled
-        if self.autoscroll_check.isChecked():
-            self.data_display.ensureCursorVisible()
+        # Keep the rows that were on screen where they were
+        self.event_view.scrollTo(model.index(max(top_row + shift, 0), 0),
+                                 QAbstractItemView.PositionAtTop)
+    
+    def update_display_options(self):
+        """Apply the timestamp and MIDI interpretation options to the table"""
+        self.event_view.setColumnHidden(EventTableModel.TIME_COLUMN,
+                                        not self.timestamp_check.isChecked())
+        self.event_model.set_interpret_midi(self.interpret_check.isChecked())
     
     @Slot()
     def show_about(self):
@@ -582,41 +722,174 @@ class SimpleMainWindow(QMainWindow):
 
     def clear_display(self):
         """Clear the data display"""
-        self.data_display.clear()
-        self.data_display.setText("Connect to a device to see data...\n")
+        self.show_live_data()
+        self.capture_store.clear()
+        self.event_model.sync()
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Start the inter-arrival statistics over"""
+        self.source_stats.clear()
+        self.stats_model.refresh()
     
     def save_log(self):
-        """Save the current log to a file"""
+        """Save the current scrollback as a capture file or a text log"""
         from PySide6.QtWidgets import QFileDialog
         from datetime import datetime
         
-        filename, _ = QFileDialog.getSaveFileName(
+        filename, selected_filter = QFileDialog.getSaveFileName(
             self, "Save Log", 
-            f"midi_hid_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-            "Text Files (*.txt)"
+            f"midi_hid_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mhc",
+            "Capture Files (*.mhc);;Text Files (*.txt)"
         )
         
         if filename:
             try:
-                with open(filename, 'w') as f:
-                    f.write(self.data_display.toPlainText())
+                if filename.endswith(".txt") or selected_filter.startswith("Text"):
+                    self.save_text_log(filename)
+                else:
+                    self.save_capture(filename)
                 self.status_message(f"Log saved to {filename}")
             except Exception as e:
                 self.status_message(f"Error saving log: {e}")
     
-    def status_message(self, message):
-        """Display a status message in the data display"""
-        # Add a horizontal line before status messages
-        self.data_display.append("----------------------------------------")
-        self.data_display.append(f"STATUS: {message}")
-        self.data_display.append("----------------------------------------")
+    def save_capture(self, filename):
+        """Write every event shown in the Data Monitor to a capture file"""
+        import os
+        
+        store = self.event_model.store
+        if (store is self.capture_reader and os.path.exists(filename)
+                and os.path.samefile(store.path, filename)):
+            raise ValueError("cannot overwrite the capture that is being shown")
+        # Take the range first: every source with events in it is listed by then
+        first, stop = store.event_range()
+        writer = CaptureWriter(filename, store.sources)
+        try:
+            # Add any source the header still missed when its first event comes up
+            file_ids = {source_id: source_id for source_id in range(len(writer.sources))}
+            for start in range(first, stop, 4096):
+                for timestamp_ns, source_id, payload in store.get_events(start, start + 4096):
+                    file_id = file_ids.get(source_id)
+                    if file_id is None:
+                        file_id = file_ids[source_id] = writer.add_source(
+                            *store.get_source(source_id))
+                    writer.write_event(file_id, payload, timestamp_ns)
+        finally:
+            writer.close()
+    
+    def save_text_log(self, filename):
+        """Write every event shown in the Data Monitor as a line of text"""
+        # Stream the rows out instead of building one big string
+        first, stop = self.event_model.store.event_range()
+        with open(filename, 'w') as f:
+            for seq in range(first, stop):
+                row = self.event_model.format_row(seq)
+                if row is None:
+                    continue  # Overwritten while saving
+                time_str, source, hex_data, description = row
+                line = f"[{time_str}] {source}: {hex_data}"
+                if description:
+                    line += f" - {description}"
+                f.write(line + "\n")
+    
+    def open_capture(self):
+        """Show a capture file in the Data Monitor"""
+        from PySide6.QtWidgets import QFileDialog
+        
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Open Capture", "", "Capture Files (*.mhc)"
+        )
+        if not filename:
+            return
+        
+        try:
+            reader = CaptureReader(filename)
+        except (OSError, CaptureFormatError) as e:
+            self.status_message(f"Error opening capture: {e}")
+            return
+        
+        self.show_live_data()
+        self.capture_reader = reader
+        self.event_model.set_store(reader, newest=False)
+        self.live_data_action.setEnabled(True)
+        self.tabs.setCurrentIndex(1)
+        self.status_message(f"Showing {len(reader)} events from {filename}")
+    
+    def show_live_data(self):
+        """Go back to showing live data after open_capture()"""
+        if self.capture_reader is None:
+            return
+        
+        self.event_model.set_store(self.capture_store)
+        self.capture_reader.close()
+        self.capture_reader = None
+        self.live_data_action.setEnabled(False)
+    
+    def toggle_recording(self):
+        """Start or stop streaming captured events to a capture file"""
+        from PySide6.QtWidgets import QFileDialog
+        from datetime import datetime
+        
+        if self.capture_writer is not None:
+            self.stop_recording()
+            return
         
-        # Auto-scroll
-        self.data_display.ensureCursorVisible()
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Record Capture",
+            f"midi_hid_capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mhc",
+            "Capture Files (*.mhc)"
+        )
+        if not filename:
+            return
+        
+        try:
+            # List the devices seen so far in the header; attach() maps
+            # their store source ids onto the file's
+            self.capture_writer = CaptureWriter(filename, self.capture_store.sources)
+        except OSError as e:
+            self.status_message(f"Error starting recording: {e}")
+            return
+        self.capture_listener = self.capture_writer.attach(self.capture_store)
+        self.record_action.setText("Stop Recording")
+        self.status_message(f"Recording to {filename}")
+    
+    def stop_recording(self):
+        """Stop recording and write the capture file index"""
+        if self.capture_writer is None:
+            return
+        
+        self.capture_store.remove_listener(self.capture_listener)
+        self.capture_writer.close()
+        self.status_message(
+            f"Recorded {self.capture_writer.event_count} events to {self.capture_writer.path}")
+        self.capture_writer = None
+        self.capture_listener = None
+        self.record_action.setText("Start Recording...")
+    
+    def set_overload_policy(self, policy):
+        """Set how both handlers cope with a full hand-off queue"""
+        self.midi_handler.set_backpressure(policy)
+        self.hid_handler.set_backpressure(policy)
+    
+    def update_throughput(self):
+        """Show the current rates and totals of every connected source"""
+        self.throughput_label.setText(format_throughput(self.throughput_meter.sample()))
+    
+    def status_message(self, message):
+        """Display a status message in the status bar"""
+        self.statusBar().showMessage(message, 5000)
     
     def closeEvent(self, event):
         """Handle window close event"""
         # Clean up connections
+        self.hotplug_started = True  # A late scan must not start it again
+        self.hotplug.stop()
+        self.scanner.shutdown()
         self.midi_handler.close_all()
         self.hid_handler.close_all()
+        self.stop_recording()
+        self.show_live_data()
+        
+        # Delete the scrollback spill file
+        self.capture_store.close()
         super().closeEvent(event)
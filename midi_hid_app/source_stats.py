@@ -0,0 +1,68 @@
+# midi_hid_app/source_stats.py - Per-source inter-arrival timing statistics
+import time
+from midi_hid_app.histogram import LogHistogram
+
+
+class SourceStats:
+    """Inter-arrival times of every capture store source, in ns
+
+    Attached to a CaptureStore it sees every event as it is appended, on
+    the reading thread, and records the time since the previous event of
+    the same source into that source's LogHistogram: constant time and no
+    allocation per event. Histograms are indexed by store source id.
+
+    Events carry wall clock stamps, which jump when NTP or the user
+    steps the clock, so the intervals are measured with clock (a
+    monotonic ns counter) at the time each event is appended instead.
+    """
+
+    def __init__(self, clock=time.monotonic_ns):
+        self.clock = clock
+
+        # (source_id -> LogHistogram, source_id -> clock value (ns) at the
+        # previous event), swapped as one by clear() so a reader thread in
+        # record() never sees one list without the other
+        self._state = ([], [])
+
+    @property
+    def histograms(self):
+        return self._state[0]
+
+    def attach(self, store):
+        """Collect statistics for every event appended to store from now on
+
+        Returns the store listener; pass it to store.remove_listener() to stop.
+        """
+        store.add_listener(self.record)
+        return self.record
+
+    def record(self, source_id, data, timestamp_ns):
+        """Store listener: account for one event (timestamp_ns is not used)"""
+        now = self.clock()
+        histograms, last_times = self._state
+        if source_id >= len(last_times):
+            self._grow(histograms, last_times, source_id)
+
+        last = last_times[source_id]
+        last_times[source_id] = now
+        if last is not None:
+            histograms[source_id].record(now - last)
+
+    @staticmethod
+    def _grow(histograms, last_times, source_id):
+        """Make room for a source seen for the first time"""
+        while len(last_times) <= source_id:
+            histograms.append(LogHistogram())
+            last_times.append(None)
+
+    def get(self, source_id):
+        """Histogram of a source, or None if it has no events yet"""
+        histograms = self.histograms
+        if source_id < len(histograms):
+            return histograms[source_id]
+        return None
+
+    def clear(self):
+        """Start every source over; safe while readers are recording"""
+        count = len(self.histograms)
+        self._state = ([LogHistogram() for _ in range(count)], [None] * count)
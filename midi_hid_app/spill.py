@@ -0,0 +1,122 @@
+# midi_hid_app/spill.py - On-disk overflow for events evicted from the capture store
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+
+# Record header: timestamp_ns, source_id, payload length
+RECORD = struct.Struct("<qHI")
+
+
+class SpillFile:
+    """Append-only file of events that no longer fit in memory
+
+    Events keep the sequence numbers they had in the capture store. Only
+    every INDEX_STRIDE-th record offset is kept in memory, and reads decode
+    a whole page of INDEX_STRIDE records at once into a small LRU cache, so
+    memory stays flat however long the session runs.
+    """
+
+    INDEX_STRIDE = 1024
+    CACHED_PAGES = 8
+    WRITE_BUFFER = 1024 * 1024
+
+    def __init__(self, directory=None):
+        fd, self.path = tempfile.mkstemp(
+            prefix="midi_hid_spill_", suffix=".bin", dir=directory
+        )
+        os.close(fd)
+        self._writer = open(self.path, "wb", buffering=self.WRITE_BUFFER)
+        self._reader = open(self.path, "rb")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._reset(0)
+
+    def _reset(self, first_seq):
+        self.first_seq = first_seq  # seq of the first spilled event
+        self.next_seq = first_seq  # seq the next spilled event must have
+        self.bytes_written = 0
+        self._index = array("Q")  # file offset of every INDEX_STRIDE-th record
+        self._pages = OrderedDict()  # page number -> [(ts, source_id, payload)]
+
+    def append(self, seq, timestamp_ns, source_id, payload):
+        """Write one evicted event; seq must follow the previous one"""
+        with self._lock:
+            if seq != self.next_seq:
+                # Gap (e.g. the store was cleared); start a fresh file
+                self._truncate(seq)
+
+            if (seq - self.first_seq) % self.INDEX_STRIDE == 0:
+                self._index.append(self.bytes_written)
+            self._writer.write(RECORD.pack(timestamp_ns, source_id, len(payload)))
+            self._writer.write(payload)
+            self.bytes_written += RECORD.size + len(payload)
+            self.next_seq = seq + 1
+            self._dirty = True
+
+    def __contains__(self, seq):
+        return self.first_seq <= seq < self.next_seq
+
+    def get_event(self, seq):
+        """Return (timestamp_ns, source_id, payload) of a spilled event"""
+        with self._lock:
+            if not self.first_seq <= seq < self.next_seq:
+                raise IndexError(f"event {seq} was not spilled")
+            page, row = divmod(seq - self.first_seq, self.INDEX_STRIDE)
+            events = self._pages.get(page)
+            if events is None or len(events) <= row:
+                events = self._load_page(page)
+            else:
+                self._pages.move_to_end(page)
+            return events[row]
+
+    def _load_page(self, page):
+        """Decode one page of records into the cache"""
+        if self._dirty:
+            self._writer.flush()
+            self._dirty = False
+
+        start = self._index[page]
+        if page + 1 < len(self._index):
+            end = self._index[page + 1]
+        else:
+            end = self.bytes_written
+        self._reader.seek(start)
+        chunk = self._reader.read(end - start)
+
+        events = []
+        offset = 0
+        while offset < len(chunk):
+            timestamp_ns, source_id, length = RECORD.unpack_from(chunk, offset)
+            offset += RECORD.size
+            events.append((timestamp_ns, source_id, chunk[offset : offset + length]))
+            offset += length
+
+        self._pages[page] = events
+        if len(self._pages) > self.CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return events
+
+    def _truncate(self, first_seq):
+        self._writer.flush()
+        self._writer.seek(0)
+        self._writer.truncate()
+        self._dirty = False
+        self._reset(first_seq)
+
+    def clear(self, first_seq=0):
+        """Forget every spilled event"""
+        with self._lock:
+            self._truncate(first_seq)
+
+    def close(self):
+        """Close and delete the spill file"""
+        with self._lock:
+            self._writer.close()
+            self._reader.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
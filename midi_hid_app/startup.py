@@ -0,0 +1,44 @@
+# midi_hid_app/startup.py - Startup phase timing for main.py --profile-startup
+import time
+
+
+class StartupProfile:
+    """Records when each startup phase finished
+
+    mark() closes the current phase; report() prints how long each phase
+    took and when it finished, relative to start. A disabled profile
+    ignores every call so main() can mark phases unconditionally.
+    """
+
+    def __init__(self, enabled=True, start=None):
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = []  # (phase, seconds since start)
+
+    def mark(self, phase):
+        """Record that phase has just finished"""
+        if self.enabled:
+            self.marks.append((phase, time.perf_counter() - self.start))
+
+    def elapsed(self, phase):
+        """Seconds from start until phase finished, or None if not marked"""
+        for name, at in self.marks:
+            if name == phase:
+                return at
+        return None
+
+    def report(self, file=None):
+        """Print the phase breakdown"""
+        if not self.enabled:
+            return
+
+        print("\n=== Startup profile ===", file=file)
+        previous = 0.0
+        for phase, at in self.marks:
+            print(
+                f"  {phase:<24} {(at - previous) * 1000:8.1f} ms"
+                f"   (at {at * 1000:8.1f} ms)",
+                file=file,
+            )
+            previous = at
+        print("", file=file)
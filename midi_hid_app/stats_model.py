@@ -0,0 +1,83 @@
+# midi_hid_app/stats_model.py - Table model for the inter-arrival statistics
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from midi_hid_app.capture_store import SOURCE_MIDI
+
+
+def format_ms(value_ns):
+    """Nanoseconds as milliseconds with microsecond resolution"""
+    if value_ns is None:
+        return "-"
+    return f"{value_ns / 1e6:.3f}"
+
+
+class SourceStatsModel(QAbstractTableModel):
+    """One row of inter-arrival statistics (ms) per source with events
+
+    The histograms are updated on the reader threads; call refresh()
+    periodically to show their current state.
+    """
+
+    COLUMNS = ["Source", "Count", "Min", "Mean", "p50", "p99", "p99.9", "Max"]
+    SOURCE_COLUMN = 0
+
+    def __init__(self, store, stats, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.stats = stats
+        self._rows = []  # formatted rows
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        if role == Qt.TextAlignmentRole and index.column() != self.SOURCE_COLUMN:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def format_row(self, source_id, histogram):
+        """Display strings for one source"""
+        kind, name = self.store.get_source(source_id)
+        source = f"MIDI [{name}]" if kind == SOURCE_MIDI else f"HID [{name}]"
+        return (
+            source,
+            str(histogram.count),
+            format_ms(histogram.min),
+            format_ms(histogram.mean),
+            format_ms(histogram.percentile(50)),
+            format_ms(histogram.percentile(99)),
+            format_ms(histogram.percentile(99.9)),
+            format_ms(histogram.max),
+        )
+
+    def refresh(self):
+        """Re-read every histogram"""
+        rows = [
+            self.format_row(source_id, histogram)
+            for source_id, histogram in enumerate(list(self.stats.histograms))
+            if histogram.count
+        ]
+        if len(rows) != len(self._rows):
+            self.beginResetModel()
+            self._rows = rows
+            self.endResetModel()
+        elif rows != self._rows:
+            self._rows = rows
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(len(rows) - 1, len(self.COLUMNS) - 1)
+            )
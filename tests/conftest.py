@@ -10,6 +10,19 @@ def pytest_configure(config):
     )
 
 
+@pytest.fixture(scope="module")
+def app():
+    """The QApplication for tests that need a Qt event loop
+
+    Shut down again after each module, so tests that create their own
+    QApplication (test_core.py) work whatever order modules run in.
+    """
+    QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    yield app
+    app.shutdown()
+
+
 # A helper function to check if PySide6 is available
 def is_pyside6_available():
     try:
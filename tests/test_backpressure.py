@@ -0,0 +1,56 @@
+# tests/test_backpressure.py - Test the bounded hand-off to the GUI thread
+import threading
+
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from midi_hid_app.event_bus import DROP_NEWEST, DROP_OLDEST
+from midi_hid_app.simple_midi import SimpleMIDIHandler
+
+
+def flood(handler, count):
+    """Publish count messages from a reader thread, as rtmidi would"""
+
+    def reader():
+        for i in range(count):
+            handler.core.message_bus.publish([0xB0, 1, i], 0.0, "Keys")
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    thread.join()
+
+
+@pytest.mark.parametrize("policy, kept", [(DROP_OLDEST, 6), (DROP_NEWEST, 0)])
+def test_flood_is_bounded_and_counted(app, policy, kept):
+    handler = SimpleMIDIHandler()
+    slot = handler.core.counters.register("Keys", "Keys")
+    handler.set_backpressure(policy, capacity=4)
+    received = []
+    handler.message_received.connect(
+        lambda data, time_stamp, port_name: received.append(data[2])
+    )
+
+    flood(handler, 10)
+    assert received == []  # nothing is emitted from the reader thread
+    app.processEvents()
+
+    assert received == list(range(kept, kept + 4))
+    assert handler.dropped == 6
+    assert handler.core.counters.dropped[slot] == 6
+
+
+def test_batches_are_flushed_in_the_gui_thread(app):
+    handler = SimpleMIDIHandler()
+    handler.set_batching(60, max_batch_size=8)
+    batches = []
+    handler.messages_received.connect(
+        lambda batch: batches.append(
+            (len(batch), threading.current_thread() is threading.main_thread())
+        )
+    )
+
+    flood(handler, 20)
+    app.processEvents()
+    assert batches == [(20, True)]
+    handler.set_batching(None)
@@ -0,0 +1,157 @@
+# tests/test_capture_file.py - Test the binary capture file format
+from midi_hid_app.capture_store import CaptureStore, SOURCE_MIDI, SOURCE_HID
+from midi_hid_app.capture_file import (
+    CaptureReader,
+    CaptureWriter,
+    decode_varint,
+    iter_capture,
+)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "round_trip.mhc"
+    writer = CaptureWriter(path, [(SOURCE_MIDI, "Port A")])
+    writer.CHECKPOINT_EVENTS = 3
+
+    writer.write_event(0, [0x90, 60, 100], 1_000_000_000)
+    hid = writer.add_source(SOURCE_HID, "Pad (046d:c21d)")
+    writer.write_event(hid, b"\x01\x02\x03\x04", 1_000_000_500)
+    # Out-of-order timestamps survive the zigzag deltas
+    writer.write_event(0, b"\x80\x3c\x00", 999_999_000)
+    for i in range(10):
+        writer.write_event(hid, bytes([i]), 2_000_000_000 + i)
+    writer.close()
+
+    events = list(iter_capture(path))
+    assert len(events) == 13
+    assert events[0] == (1_000_000_000, (SOURCE_MIDI, "Port A"), b"\x90\x3c\x64")
+    assert events[1] == (
+        1_000_000_500,
+        (SOURCE_HID, "Pad (046d:c21d)"),
+        b"\x01\x02\x03\x04",
+    )
+    assert events[2][0] == 999_999_000
+    assert events[-1] == (2_000_000_009, (SOURCE_HID, "Pad (046d:c21d)"), b"\x09")
+
+
+def test_unclosed_capture_is_readable(tmp_path):
+    path = tmp_path / "crashed.mhc"
+    writer = CaptureWriter(path, [(SOURCE_MIDI, "Port A")])
+    for i in range(5):
+        writer.write_event(0, [0xB0, 1, i], 100 + i)
+    writer._file.flush()
+
+    assert [payload[2] for _, _, payload in iter_capture(path)] == list(range(5))
+
+
+def test_record_from_store(tmp_path):
+    path = tmp_path / "recorded.mhc"
+    store = CaptureStore(capacity=4, arena_size=64)
+    port = store.register_source(SOURCE_MIDI, "Port A")
+    store.append(port, b"\xf8", timestamp_ns=1)  # Before recording starts
+
+    writer = CaptureWriter(path)
+    listener = writer.attach(store)
+    for i in range(10):
+        store.append(port, b"\xf8", timestamp_ns=10 + i)
+    store.remove_listener(listener)
+    store.append(port, b"\xf8", timestamp_ns=99)
+    writer.close()
+
+    events = list(iter_capture(path))
+    assert [ts for ts, _, _ in events] == list(range(10, 20))
+    assert events[0][1] == (SOURCE_MIDI, "Port A")
+
+
+def test_reader_random_access(tmp_path):
+    path = tmp_path / "indexed.mhc"
+    writer = CaptureWriter(path, [(SOURCE_MIDI, "Port A")])
+    writer.CHECKPOINT_EVENTS = 16
+    for i in range(1000):
+        writer.write_event(0, [0xB0, 1, i & 0x7F], 1_000 * i)
+    writer.close()
+
+    with CaptureReader(path) as reader:
+        assert len(reader) == 1000
+        assert reader.get_source(0) == (SOURCE_MIDI, "Port A")
+        for index in (999, 0, 17, 16, 15, 500, 501, 250):
+            timestamp_ns, source_id, payload = reader.get_event(index)
+            assert timestamp_ns == 1_000 * index
+            assert isinstance(payload, memoryview)
+            assert bytes(payload) == bytes([0xB0, 1, index & 0x7F])
+        assert reader.find_time(123_456) == 124
+        assert reader.find_time(10**12) == 1000
+        assert len(reader.get_events(990, 2000)) == 10
+        del payload
+
+
+def test_reader_indexes_unclosed_capture(tmp_path):
+    path = tmp_path / "crashed.mhc"
+    writer = CaptureWriter(path)
+    writer.CHECKPOINT_EVENTS = 8
+    port = writer.add_source(SOURCE_MIDI, "Port A")
+    for i in range(50):
+        writer.write_event(port, b"\xf8", i)
+    writer._file.flush()
+    # Simulate a crash in the middle of a record
+    with open(path, "ab") as f:
+        f.write(b"\x09\x00")
+
+    with CaptureReader(path) as reader:
+        assert len(reader) == 50
+        assert reader.sources == [(SOURCE_MIDI, "Port A")]
+        assert reader.get_event(42)[0] == 42
+
+
+def test_recording_lists_known_sources_in_the_header(tmp_path):
+    path = tmp_path / "seeded.mhc"
+    store = CaptureStore(capacity=16, arena_size=256)
+    keys = store.register_source(SOURCE_MIDI, "Keys")
+    pad = store.register_source(SOURCE_HID, "Pad")
+
+    writer = CaptureWriter(path, store.sources)
+    listener = writer.attach(store)
+    store.append(pad, b"\x01", timestamp_ns=10)
+    knob = store.register_source(SOURCE_MIDI, "Knob")  # After recording starts
+    store.append(knob, b"\xb0\x01\x02", timestamp_ns=20)
+    store.append(keys, b"\xf8", timestamp_ns=30)
+    store.remove_listener(listener)
+    writer.close()
+
+    with open(path, "rb") as f:
+        assert decode_varint(f.read(), 5)[0] == 2  # Devices in the header
+    assert [(ts, source) for ts, source, _ in iter_capture(path)] == [
+        (10, (SOURCE_HID, "Pad")),
+        (20, (SOURCE_MIDI, "Knob")),
+        (30, (SOURCE_MIDI, "Keys")),
+    ]
+
+
+def test_saved_captures_list_sources_registered_while_saving(app, tmp_path):
+    from midi_hid_app.simple_hid import SimpleHIDHandler
+    from midi_hid_app.simple_midi import SimpleMIDIHandler
+    from midi_hid_app.simple_ui import SimpleMainWindow
+
+    class BusyStore(CaptureStore):
+        saving = False
+
+        def event_range(self):
+            if self.saving:
+                # A device turns up and sends something as the save starts
+                self.saving = False
+                knob = self.register_source(SOURCE_MIDI, "Knob")
+                self.append(knob, b"\xb0\x01\x02", timestamp_ns=20)
+            return super().event_range()
+
+    store = BusyStore(capacity=16, arena_size=256)
+    store.append(store.register_source(SOURCE_HID, "Pad"), b"\x01", timestamp_ns=10)
+    window = SimpleMainWindow(SimpleMIDIHandler(), SimpleHIDHandler(), store)
+
+    path = tmp_path / "saved.mhc"
+    store.saving = True
+    window.save_capture(str(path))
+    window.close()
+    assert list(iter_capture(path)) == [
+        (10, (SOURCE_HID, "Pad"), b"\x01"),
+        (20, (SOURCE_MIDI, "Knob"), b"\xb0\x01\x02"),
+    ]
@@ -0,0 +1,107 @@
+# tests/test_capture_store.py - Test the ring-buffer capture store
+import os
+import threading
+from midi_hid_app.capture_store import CaptureStore, SOURCE_MIDI, SOURCE_HID
+from midi_hid_app.spill import SpillFile
+
+
+def test_register_source_is_stable():
+    store = CaptureStore(capacity=8, arena_size=64)
+    midi = store.register_source(SOURCE_MIDI, "Port A")
+    hid = store.register_source(SOURCE_HID, "Pad (046d:c21d)")
+
+    assert store.register_source(SOURCE_MIDI, "Port A") == midi
+    assert midi != hid
+    assert store.get_source(hid) == (SOURCE_HID, "Pad (046d:c21d)")
+
+
+def test_sources_with_one_name_and_two_keys_are_separate():
+    # e.g. two interfaces of one composite device, or two identical pads
+    store = CaptureStore(capacity=8, arena_size=64)
+    first = store.register_source(SOURCE_HID, "Pad (046d:c21d)", b"/dev/hidraw0")
+    second = store.register_source(SOURCE_HID, "Pad (046d:c21d)", b"/dev/hidraw1")
+
+    assert first != second
+    assert (
+        store.register_source(SOURCE_HID, "Pad (046d:c21d)", b"/dev/hidraw1") == second
+    )
+    assert store.get_source(first) == store.get_source(second)
+
+
+def test_append_and_read_back():
+    store = CaptureStore(capacity=8, arena_size=64)
+    source = store.register_source(SOURCE_MIDI, "Port A")
+
+    store.append(source, [0x90, 60, 100], timestamp_ns=1000)
+    store.append(source, b"\x80\x3c\x00", timestamp_ns=2000)
+
+    assert store.event_range() == (0, 2)
+    assert store.get_event(0) == (1000, source, b"\x90\x3c\x64")
+    assert store.get_events(0, 10)[1] == (2000, source, b"\x80\x3c\x00")
+
+
+def test_capacity_evicts_oldest():
+    store = CaptureStore(capacity=4, arena_size=1024)
+    for i in range(10):
+        store.append(0, bytes([i]), timestamp_ns=i)
+
+    assert store.event_range() == (6, 10)
+    assert store.evicted == 6
+    assert [payload for _, _, payload in store.get_events(0, 10)] == [
+        bytes([i]) for i in range(6, 10)
+    ]
+
+
+def test_arena_wrap_evicts_overwritten_payloads():
+    store = CaptureStore(capacity=100, arena_size=10)
+    for i in range(7):
+        store.append(0, bytes([i]) * 3, timestamp_ns=i)
+
+    first, stop = store.event_range()
+    assert stop == 7
+    # At most three 3-byte payloads fit into 10 bytes
+    assert stop - first == 3
+    for seq in range(first, stop):
+        assert store.get_event(seq)[2] == bytes([seq]) * 3
+
+
+def test_concurrent_appends():
+    store = CaptureStore(capacity=1000, arena_size=4096)
+
+    def writer(source):
+        for i in range(500):
+            store.append(source, [source, i & 0x7F])
+
+    threads = [threading.Thread(target=writer, args=(s,)) for s in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.next_seq == 2000
+    assert len(store) == 1000
+    for _, source, payload in store.get_events(0, 2000):
+        assert payload[0] == source
+
+
+def test_spill_keeps_evicted_events_readable(tmp_path):
+    store = CaptureStore(capacity=16, arena_size=256)
+    spill = SpillFile(directory=tmp_path)
+    store.set_spill(spill)
+    spill.INDEX_STRIDE = 8  # Exercise several pages
+
+    for i in range(100):
+        store.append(i % 3, bytes([i, i, i]), timestamp_ns=i)
+
+    assert store.event_range() == (0, 100)
+    assert len(store) == 16
+    for seq in (0, 7, 8, 50, 83, 84, 99):
+        assert store.get_event(seq) == (seq, seq % 3, bytes([seq] * 3))
+    assert [ts for ts, _, _ in store.get_events(80, 90)] == list(range(80, 90))
+
+    store.clear()
+    store.append(0, b"\x01", timestamp_ns=1)
+    assert store.event_range() == (100, 101)
+
+    store.close()
+    assert not os.path.exists(spill.path)
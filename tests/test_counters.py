@@ -0,0 +1,64 @@
+# tests/test_counters.py - Test the per-source throughput counters
+import pytest
+
+from midi_hid_app.counters import SourceCounters, ThroughputMeter, format_throughput
+
+
+def test_slots_are_reused_and_reset():
+    counters = SourceCounters(max_sources=2)
+    keys = counters.register("Keys", "Keys")
+    pads = counters.register("/dev/hidraw0", "Pads")
+    assert keys != pads
+    assert counters.register("Keys", "Keys") == keys
+
+    counters.messages[keys] += 3
+    counters.bytes[keys] += 9
+    with pytest.raises(RuntimeError):
+        counters.register("Drums", "Drums")
+
+    counters.release("/dev/hidraw0")
+    assert counters.register("Drums", "Drums") == pads
+    assert counters.snapshot() == [
+        ("Keys", "Keys", 3, 9, 0, 0),
+        ("Drums", "Drums", 0, 0, 0, 0),
+    ]
+
+
+def test_meter_rates():
+    midi, hid = SourceCounters(), SourceCounters()
+    keys = midi.register("Keys", "Keys")
+    pads = hid.register("/dev/hidraw0", "Pads")
+    meter = ThroughputMeter(midi, hid)
+    assert meter.sample(now=10.0) == [
+        ("Keys", 0.0, 0.0, 0, 0, 0),
+        ("Pads", 0.0, 0.0, 0, 0, 0),
+    ]
+
+    midi.messages[keys] += 100
+    midi.bytes[keys] += 300
+    hid.messages[pads] += 64
+    hid.bytes[pads] += 4096
+    hid.overflow_passes[pads] += 1
+    rows = meter.sample(now=10.5)
+    assert rows == [
+        ("Keys", 200.0, 600.0, 100, 0, 0),
+        ("Pads", 128.0, 8192.0, 64, 0, 1),
+    ]
+    assert "1 possible overflow passes" in format_throughput(rows)
+
+    # A reconnect starts the totals over without a negative rate
+    midi.register("Keys", "Keys")
+    midi.messages[keys] += 5
+    assert meter.sample(now=11.5)[0][:2] == ("Keys", 5.0)
+
+
+def test_meter_keeps_sources_with_one_name_apart():
+    hid = SourceCounters()
+    first = hid.register("/dev/hidraw0", "Pad")
+    second = hid.register("/dev/hidraw1", "Pad")
+    meter = ThroughputMeter(hid)
+    meter.sample(now=10.0)
+
+    hid.messages[first] += 10
+    hid.messages[second] += 30
+    assert [row[1] for row in meter.sample(now=11.0)] == [10.0, 30.0]
@@ -0,0 +1,68 @@
+# tests/test_device_list_model.py - Test incremental device list updates
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from midi_hid_app.device_list_model import hid_device_model, midi_port_model
+
+
+def record_signals(model):
+    events = []
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("+", first)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("-", first)))
+    model.rowsMoved.connect(
+        lambda parent, first, last, destination, row: events.append((">", first, row))
+    )
+    model.dataChanged.connect(lambda top, bottom: events.append(("~", top.row())))
+    model.modelReset.connect(lambda: events.append(("reset",)))
+    return events
+
+
+def labels(model):
+    return [model.data(model.index(row)) for row in range(model.rowCount())]
+
+
+def test_refresh_applies_only_the_difference(app):
+    model = midi_port_model()
+    model.set_items(["Keys", "Pads", "Drums"])
+    events = record_signals(model)
+
+    model.set_items(["Keys", "Drums", "Synth"])
+
+    assert labels(model) == ["Keys", "Drums", "Synth"]
+    assert events == [("-", 1), ("+", 2)]
+
+    events.clear()
+    model.set_items(["Keys", "Drums", "Synth"])
+    assert events == []
+
+
+def test_refresh_follows_the_scan_order(app):
+    model = midi_port_model()
+    model.set_items(["Keys", "Pads", "Drums", "Synth"])
+    model.set_connected("Drums", True)
+    events = record_signals(model)
+
+    model.set_items(["Drums", "Keys", "Bass", "Synth", "Pads"])
+
+    assert labels(model) == ["► Drums", "Keys", "Bass", "Synth", "Pads"]
+    assert events == [(">", 2, 0), ("+", 2), (">", 4, 3)]
+    assert model.row_of("Drums") == 0
+
+
+def test_connection_state_changes_one_row(app):
+    model = hid_device_model()
+    devices = [
+        {"path": b"/dev/hidraw0", "vendor_id": 1, "product_id": 2},
+        {"path": b"/dev/hidraw1", "vendor_id": 3, "product_id": 4},
+    ]
+    model.set_items(devices)
+    events = record_signals(model)
+
+    model.set_connected(b"/dev/hidraw1", True)
+
+    assert events == [("~", 1)]
+    assert model.data(model.index(1)).startswith("► ")
+    assert model.item(1) is devices[1]
+    assert model.key(1) == b"/dev/hidraw1"
+    assert model.key(2) is None
@@ -0,0 +1,99 @@
+# tests/test_device_scanner.py - Test background device enumeration
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from midi_hid_app.device_scanner import DeviceScanner
+
+
+class FakeMIDI:
+    def __init__(self):
+        self.ports = []
+        self.calls = 0
+
+    def get_ports_by_type(self):
+        self.calls += 1
+        return {"all": list(self.ports), "physical": list(self.ports), "virtual": []}
+
+
+class FakeHID:
+    def __init__(self):
+        self.devices = []
+
+    def get_devices(self):
+        return list(self.devices)
+
+
+def wait_for_scan(app, scanner):
+    loop = QtCore.QEventLoop()
+    scanner.scan_finished.connect(loop.quit)
+    QtCore.QTimer.singleShot(5000, loop.quit)
+    loop.exec()
+    scanner.scan_finished.disconnect(loop.quit)
+
+
+def test_scans_report_only_differences(app):
+    midi, hid = FakeMIDI(), FakeHID()
+    scanner = DeviceScanner(midi, hid)
+    scanner._debounce_timer.setInterval(0)
+    changes = []
+    scanner.midi_ports_changed.connect(
+        lambda ports, added, removed: changes.append(("midi", added, removed))
+    )
+    scanner.hid_devices_changed.connect(
+        lambda devices, added, removed: changes.append(("hid", added, removed))
+    )
+
+    midi.ports = ["Keys", "Pads"]
+    scanner.request_scan()
+    wait_for_scan(app, scanner)
+    assert sorted(changes) == [("hid", [], []), ("midi", ["Keys", "Pads"], [])]
+
+    changes.clear()
+    midi.ports = ["Pads", "Drums"]
+    hid.devices = [{"path": b"/dev/hidraw0"}]
+    scanner.request_scan()
+    wait_for_scan(app, scanner)
+    assert sorted(changes, key=str) == [
+        ("hid", [{"path": b"/dev/hidraw0"}], []),
+        ("midi", ["Drums"], ["Keys"]),
+    ]
+
+    changes.clear()
+    scanner.request_scan()
+    wait_for_scan(app, scanner)
+    assert changes == []
+    scanner.shutdown()
+
+
+def test_requests_during_a_scan_are_coalesced(app):
+    midi, hid = FakeMIDI(), FakeHID()
+    scanner = DeviceScanner(midi, hid)
+    scanner._debounce_timer.setInterval(0)
+
+    for i in range(10):
+        scanner.request_scan()
+    assert scanner.scanning
+
+    wait_for_scan(app, scanner)
+    wait_for_scan(app, scanner)
+
+    assert midi.calls == 2
+    scanner.shutdown()
+
+
+def test_hotplug_burst_triggers_one_rescan(app):
+    from midi_hid_app.hotplug import HotplugMonitor
+
+    midi, hid = FakeMIDI(), FakeHID()
+    scanner = DeviceScanner(midi, hid)
+    scanner._hotplug_timer.setInterval(10)
+    monitor = HotplugMonitor()
+    scanner.watch_hotplug(monitor)
+
+    for name in ("card3", "midiC3D0", "controlC3"):
+        monitor.event_bus.publish("add", "sound", name)
+
+    wait_for_scan(app, scanner)
+    assert midi.calls == 1
+    scanner.shutdown()
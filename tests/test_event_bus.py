@@ -0,0 +1,94 @@
+# tests/test_event_bus.py - Test the Qt-free event bus and queue
+import threading
+
+import pytest
+
+from midi_hid_app.event_bus import (
+    BLOCK,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    BoundedEventQueue,
+    EventBus,
+    EventQueue,
+)
+
+
+def test_publish_reaches_every_subscriber():
+    bus = EventBus()
+    received = []
+    first = bus.subscribe(lambda *args: received.append(("first", args)))
+    bus.subscribe(lambda *args: received.append(("second", args)))
+
+    bus.publish([0x90, 60, 100], 0.5, "Port A")
+    bus.unsubscribe(first)
+    bus.publish([0x80, 60, 0], 0.1, "Port A")
+
+    assert received == [
+        ("first", ([0x90, 60, 100], 0.5, "Port A")),
+        ("second", ([0x90, 60, 100], 0.5, "Port A")),
+        ("second", ([0x80, 60, 0], 0.1, "Port A")),
+    ]
+
+
+def test_queue_drains_in_order_across_threads():
+    queue = EventQueue()
+
+    def producer(tag):
+        for i in range(1000):
+            queue.put((tag, i))
+
+    threads = [threading.Thread(target=producer, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+
+    drained = []
+    while any(thread.is_alive() for thread in threads) or len(queue):
+        drained.extend(queue.drain())
+    for thread in threads:
+        thread.join()
+    drained.extend(queue.drain())
+
+    assert len(drained) == 4000
+    for tag in range(4):
+        assert [i for t, i in drained if t == tag] == list(range(1000))
+
+
+def test_bounded_queue_policies():
+    dropped = []
+    queue = BoundedEventQueue(3, DROP_OLDEST, on_drop=dropped.append)
+    for i in range(5):
+        assert queue.put(i)
+    assert queue.drain() == [2, 3, 4]
+    assert dropped == [0, 1] and queue.dropped == 2
+
+    queue.configure(3, DROP_NEWEST)
+    assert [queue.put(i) for i in range(5)] == [True, True, True, False, False]
+    assert queue.drain() == [0, 1, 2]
+    assert dropped[2:] == [3, 4]
+
+    with pytest.raises(ValueError):
+        queue.configure(3, "drop-everything")
+
+
+def test_blocked_reader_waits_for_the_consumer():
+    queue = BoundedEventQueue(2, BLOCK, block_timeout=5.0)
+    done = threading.Event()
+
+    def producer():
+        for i in range(4):
+            queue.put(i)
+        done.set()
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    drained = []
+    while not done.is_set() or len(queue):
+        drained.extend(queue.drain())
+    thread.join()
+
+    assert drained == [0, 1, 2, 3] and queue.dropped == 0
+
+    # A consumer that never drains only stalls the reader for block_timeout
+    queue = BoundedEventQueue(1, BLOCK, block_timeout=0.01)
+    assert queue.put("kept") and not queue.put("late")
+    assert queue.dropped == 1
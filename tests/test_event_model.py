@@ -0,0 +1,116 @@
+# tests/test_event_model.py - Test the Data Monitor table model
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+
+from midi_hid_app.capture_store import SOURCE_HID, CaptureStore
+from midi_hid_app.event_model import EventTableModel
+from midi_hid_app.hid_descriptor import DeviceDecoder
+from midi_hid_app.spill import SpillFile
+
+# One Input report: X and Y, signed bytes
+JOYSTICK = bytes.fromhex("05 01 09 30 09 31 15 81 25 7f 75 08 95 02 81 02")
+# One Input report: eight buttons
+BUTTONS = bytes.fromhex("05 09 19 01 29 08 15 00 25 01 75 01 95 08 81 02")
+
+
+class SmallWindowModel(EventTableModel):
+    MAX_ROWS = 10
+    PAGE_ROWS = 4
+
+
+def data_column(model):
+    return [
+        model.data(model.index(row, EventTableModel.DATA_COLUMN))
+        for row in range(model.rowCount())
+    ]
+
+
+def spilling_store(tmp_path, count):
+    store = CaptureStore(capacity=8, arena_size=256)
+    store.set_spill(SpillFile(directory=tmp_path))
+    store.register_source(SOURCE_HID, "Pad", b"/dev/hidraw0")
+    for i in range(count):
+        store.append(0, bytes([i]), i)
+    return store
+
+
+def description(model, row):
+    return model.data(model.index(row, EventTableModel.DESCRIPTION_COLUMN))
+
+
+def test_hid_decoders_follow_the_source_not_its_name(app):
+    # Two interfaces of one composite device share a display name
+    store = CaptureStore(capacity=16, arena_size=256)
+    stick = store.register_source(SOURCE_HID, "Pad (046d:c21d)", b"/dev/hidraw0")
+    buttons = store.register_source(SOURCE_HID, "Pad (046d:c21d)", b"/dev/hidraw1")
+    store.append(stick, b"\x05\xff", 1000)
+    store.append(buttons, b"\x05", 2000)
+
+    model = EventTableModel(store)
+    model.sync()
+    model.set_hid_decoder(stick, DeviceDecoder(JOYSTICK))
+    model.set_hid_decoder(buttons, DeviceDecoder(BUTTONS))
+    assert description(model, 0) == "X=5 Y=-1"
+    assert description(model, 1) == "Buttons=1,3"
+
+    # Disconnecting a device drops its decoder
+    model.set_hid_decoder(stick, None)
+    assert description(model, 0) == ""
+    assert description(model, 1) == "Buttons=1,3"
+
+
+def test_rows_are_a_window_on_the_newest_events(app, tmp_path):
+    store = spilling_store(tmp_path, 25)
+    model = SmallWindowModel(store)
+    assert model.rowCount() == 10 and model.seq_of_row(0) == 15
+    assert model.following and model.has_older() and not model.has_newer()
+
+    for i in range(25, 28):
+        store.append(0, bytes([i]), i)
+    assert model.sync()
+    assert model.rowCount() == 10 and model.seq_of_row(0) == 18
+    assert data_column(model)[-1] == "1B"
+
+    # A burst of more than a window between syncs
+    for i in range(28, 60):
+        store.append(0, bytes([i]), i)
+    assert model.sync()
+    assert model.rowCount() == 10 and model.seq_of_row(0) == 50
+    store.close()
+
+
+def test_paging_reads_spilled_events_back(app, tmp_path):
+    store = spilling_store(tmp_path, 25)
+    model = SmallWindowModel(store)
+
+    assert model.page_older() == 4
+    assert model.rowCount() == 10 and model.seq_of_row(0) == 11
+    assert not model.following and model.has_newer()
+    assert data_column(model)[0] == "0B"  # From the spill file
+
+    model.page_older(100)
+    assert model.seq_of_row(0) == 0 and not model.has_older()
+
+    # New events wait until the window is back at the newest ones...
+    store.append(0, b"\x19", 25)
+    assert not model.sync()
+    assert model.page_newer() == 4 and model.seq_of_row(0) == 4
+    # ...or a sync that follows them jumps there
+    store.append(0, b"\x1a", 26)
+    assert model.sync(follow=True)
+    assert model.following and model.seq_of_row(0) == 17
+    assert data_column(model)[-1] == "1A"
+    store.close()
+
+
+def test_captures_open_at_their_oldest_events(app, tmp_path):
+    store = spilling_store(tmp_path, 25)
+    model = SmallWindowModel(CaptureStore())
+    model.set_store(store, newest=False)
+    assert model.seq_of_row(0) == 0 and model.rowCount() == 10
+
+    while model.has_newer():
+        model.page_newer()
+    assert model.following and model.seq_of_row(0) == 15
+    store.close()
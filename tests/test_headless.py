@@ -0,0 +1,115 @@
+# tests/test_headless.py - Test the Qt-free capture to disk
+from midi_hid_app.capture_file import TRAILER_MAGIC, CaptureReader
+from midi_hid_app.capture_store import SOURCE_HID, SOURCE_MIDI
+from midi_hid_app.event_bus import EventBus
+from midi_hid_app.headless import HeadlessCapture
+
+
+class StubMIDICore:
+    """MIDIHandler stand-in with a few ports"""
+
+    def __init__(self, ports):
+        self.ports = ports
+        self.message_bus = EventBus()
+        self.connected = []
+        self.closed = False
+
+    def get_ports(self):
+        return self.ports
+
+    def connect_port(self, port_name):
+        self.connected.append(port_name)
+        return True
+
+    def close_all(self):
+        self.closed = True
+
+
+class StubHIDCore:
+    """HIDHandler stand-in with a few devices"""
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.report_bus = EventBus()
+        self.connected = []
+        self.closed = False
+
+    def get_devices(self):
+        return self.devices
+
+    def connect_device(self, device_info):
+        self.connected.append(device_info["path"])
+        return True
+
+    def close_all(self):
+        self.closed = True
+
+
+def hid_device(path, product_id, interface):
+    return {
+        "path": path,
+        "vendor_id": 0x046D,
+        "product_id": product_id,
+        "manufacturer_string": "Logitech",
+        "product_string": "Pad",
+        "interface_number": interface,
+    }
+
+
+def test_capture_streams_both_cores_to_disk(tmp_path):
+    path = str(tmp_path / "headless.mhc")
+    midi = StubMIDICore(["Keys MIDI 1", "Through"])
+    # Two interfaces of one pad share a name, and a device not asked for
+    pad0 = hid_device(b"1-2:1.0", 0xC21D, 0)
+    pad1 = hid_device(b"1-2:1.1", 0xC21D, 1)
+    other = hid_device(b"1-3:1.0", 0xC52B, 0)
+    hid = StubHIDCore([pad0, pad1, other])
+
+    capture = HeadlessCapture(path, midi=midi, hid=hid)
+    assert capture.open_midi("keys")
+    assert capture.open_hid(0x046D, 0xC21D)
+    assert midi.connected == ["Keys MIDI 1"]
+    assert hid.connected == [b"1-2:1.0", b"1-2:1.1"]
+
+    midi.message_bus.publish([0x90, 0x3C, 0x40], 0.0, "Keys MIDI 1")
+    hid.report_bus.publish(
+        pad1, [(1_700_000_000_123_456_789, b"\x01\x02")], "Logitech Pad (046d:c21d)"
+    )
+    hid.report_bus.publish(
+        pad0,
+        [(1_700_000_000_223_456_789, b"\x03"), (1_700_000_000_223_456_790, b"\x04")],
+        "Logitech Pad (046d:c21d)",
+    )
+    midi.message_bus.publish([0x80, 0x3C, 0x00], 0.0, "Keys MIDI 1")
+    assert capture.counts == [[2, 6], [2, 2], [1, 2]]
+
+    capture.close()
+    assert midi.closed and hid.closed
+    with open(path, "rb") as f:
+        assert f.read()[-4:] == TRAILER_MAGIC  # Footer index written
+
+    with CaptureReader(path) as reader:
+        assert reader.sources == [
+            (SOURCE_MIDI, "Keys MIDI 1"),
+            (SOURCE_HID, "Logitech Pad (046d:c21d)"),
+            (SOURCE_HID, "Logitech Pad (046d:c21d)"),
+        ]
+        events = [
+            (timestamp_ns, source_id, bytes(payload))
+            for timestamp_ns, source_id, payload in reader.get_events(
+                *reader.event_range()
+            )
+        ]
+    assert [(source_id, payload) for _, source_id, payload in events] == [
+        (0, b"\x90\x3c\x40"),
+        (2, b"\x01\x02"),
+        (1, b"\x03"),
+        (1, b"\x04"),
+        (0, b"\x80\x3c\x00"),
+    ]
+    # HID reports keep their exact ns timestamps
+    assert [timestamp_ns for timestamp_ns, _, _ in events[1:4]] == [
+        1_700_000_000_123_456_789,
+        1_700_000_000_223_456_789,
+        1_700_000_000_223_456_790,
+    ]
@@ -0,0 +1,99 @@
+# tests/test_hid_core.py - Test the hidapi reader path of the core HID handler
+import sys
+import threading
+import time
+import types
+from collections import deque
+
+from midi_hid_app import hid_core
+from midi_hid_app.hid_core import HIDHandler
+
+
+class FakeHidDevice:
+    """hidapi device handing out queued reports, then empty reads"""
+
+    def __init__(self, reports=()):
+        self.reports = deque(reports)
+        self.path = None
+        self.closed = False
+
+    def open_path(self, path):
+        self.path = path
+
+    def get_report_descriptor(self):
+        return []
+
+    def set_nonblocking(self, enabled):
+        pass
+
+    def read(self, size, timeout_ms=0):
+        if self.reports:
+            return list(self.reports.popleft())
+        if timeout_ms:
+            time.sleep(0.001)
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+def fake_hidapi(monkeypatch, device):
+    """Make `import hid` hand out device"""
+    monkeypatch.setitem(
+        sys.modules, "hid", types.SimpleNamespace(device=lambda: device)
+    )
+
+
+def test_unopenable_hidraw_nodes_are_read_through_hidapi(monkeypatch):
+    def open_hidraw(node):
+        raise PermissionError(13, "Permission denied", node)
+
+    monkeypatch.setattr(hid_core, "open_hidraw", open_hidraw)
+    device = FakeHidDevice([b"\x01\x02"])
+    fake_hidapi(monkeypatch, device)
+
+    handler = HIDHandler(use_hidraw=True)
+    received = []
+    done = threading.Event()
+    handler.report_bus.subscribe(
+        lambda info, reports, name: (received.extend(reports), done.set())
+    )
+    assert handler.connect_device({"path": b"/dev/hidraw5"})
+    assert device.path == b"/dev/hidraw5"
+    assert handler.connected_devices[b"/dev/hidraw5"][1] is not None  # a thread
+    assert len(handler.poller) == 0
+
+    assert done.wait(2.0)
+    assert [data for timestamp_ns, data in received] == [b"\x01\x02"]
+    handler.close_all()
+    assert device.closed
+
+
+def test_hidapi_reader_publishes_one_batch_per_drain(monkeypatch):
+    reports = [bytes([1, i]) for i in range(5)]
+    device = FakeHidDevice(reports)
+    fake_hidapi(monkeypatch, device)
+
+    handler = HIDHandler(use_hidraw=False)
+    handler.max_batch_size = 3
+    batches = []
+    done = threading.Event()
+
+    def on_reports(device_info, reports, device_name):
+        batches.append(reports)
+        if sum(len(batch) for batch in batches) == 5:
+            done.set()
+
+    handler.report_bus.subscribe(on_reports)
+    assert handler.connect_device({"path": b"1-2:1.0"})
+    assert done.wait(2.0)
+    handler.close_all()
+
+    # The queue drains in two passes: one cut at max_batch_size, then the rest
+    assert [[data for timestamp_ns, data in batch] for batch in batches] == [
+        reports[:3],
+        reports[3:],
+    ]
+    timestamps = [timestamp_ns for batch in batches for timestamp_ns, data in batch]
+    assert timestamps == sorted(timestamps)
+    assert device.closed
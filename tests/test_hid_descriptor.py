@@ -0,0 +1,98 @@
+# tests/test_hid_descriptor.py - Test HID report descriptor parsing
+import pytest
+
+from midi_hid_app.hid_descriptor import (
+    FEATURE,
+    OUTPUT,
+    DescriptorError,
+    DeviceDecoder,
+    iter_items,
+    max_input_report_length,
+    report_lengths,
+)
+
+# Boot keyboard: modifiers, reserved byte and six key codes in; LEDs out
+BOOT_KEYBOARD = bytes.fromhex(
+    "05 01 09 06 a1 01 05 07 19 e0 29 e7 15 00 25 01 75 01 95 08 81 02"
+    "95 01 75 08 81 01 95 05 75 01 05 08 19 01 29 05 91 02 95 01 75 03"
+    "91 01 95 06 75 08 15 00 25 65 05 07 19 00 29 65 81 00 c0"
+)
+
+# Mouse (report 1) and consumer control (report 2) on one interface
+MOUSE_AND_CONSUMER = bytes.fromhex(
+    "05 01 09 02 a1 01 85 01 09 01 a1 00 05 09 19 01 29 03 15 00 25 01"
+    "95 03 75 01 81 02 95 01 75 05 81 03 05 01 09 30 09 31 09 38 15 81"
+    "25 7f 75 08 95 03 81 06 c0 c0"
+    "05 0c 09 01 a1 01 85 02 15 00 26 ff 03 19 00 2a ff 03 75 10 95 01"
+    "81 00 c0"
+)
+
+# Gamepad: 12-bit X and Y, a 4-bit hat and four buttons in 32 bits
+GAMEPAD = bytes.fromhex(
+    "05 01 09 04 a1 01 09 30 09 31 15 00 26 ff 0f 75 0c 95 02 81 02 09 39"
+    "15 00 25 07 75 04 95 01 81 42 05 09 19 01 29 04 25 01 75 01 95 04 81 02"
+    "c0"
+)
+
+
+def test_boot_keyboard_lengths():
+    assert report_lengths(BOOT_KEYBOARD) == {0: 8}
+    assert report_lengths(BOOT_KEYBOARD, OUTPUT) == {0: 1}
+    assert report_lengths(BOOT_KEYBOARD, FEATURE) == {}
+    assert max_input_report_length(BOOT_KEYBOARD) == 8
+
+
+def test_report_ids_add_a_byte():
+    assert report_lengths(MOUSE_AND_CONSUMER) == {1: 5, 2: 3}
+    assert max_input_report_length(MOUSE_AND_CONSUMER) == 5
+
+
+def test_push_and_pop_restore_the_globals():
+    # Report Size 8, Count 2, Push, Size 16, Count 4, Input, Pop, Input
+    descriptor = bytes.fromhex("75 08 95 02 a4 75 10 95 04 81 02 b4 81 02")
+    assert report_lengths(descriptor) == {0: 10}
+
+
+def test_malformed_descriptors():
+    with pytest.raises(DescriptorError):
+        list(iter_items(b"\x26\xff"))  # two data bytes announced, one given
+    with pytest.raises(DescriptorError):
+        report_lengths(b"\xb4")
+    with pytest.raises(DescriptorError):
+        report_lengths(b"\x85\x00")
+
+
+def test_decode_boot_keyboard():
+    decoder = DeviceDecoder(BOOT_KEYBOARD)
+    report = bytes([0x22, 0, 0x04, 0x2C, 0, 0, 0, 0])  # Shift held, "a" and space
+    assert decoder.decode(report) == {"Modifiers": (0xE1, 0xE5), "Keys": (4, 0x2C)}
+    assert decoder.describe(report) == "Modifiers=E1,E5 Keys=04,2C"
+    assert decoder.describe(bytes(8)) == "Modifiers=- Keys=-"
+
+
+def test_decode_by_report_id():
+    decoder = DeviceDecoder(MOUSE_AND_CONSUMER)
+    mouse = bytes([1, 0b101, 3, 0xFF, 0x81])
+    assert decoder.decode(mouse) == {"Buttons": (1, 3), "X": 3, "Y": -1, "Wheel": -127}
+    assert decoder.describe(mouse) == "Buttons=1,3 X=3 Y=-1 Wheel=-127"
+    assert decoder.decode(bytes([2, 0xE9, 0])) == {"Consumer": (0xE9,)}
+    assert decoder.decode(bytes([9, 0])) is None
+    assert decoder.describe(bytes([9, 0])) == ""
+    assert decoder.decode_batch([mouse, bytes([2, 0, 0])]) == [
+        decoder.decode(mouse),
+        {"Consumer": ()},
+    ]
+
+
+def test_decode_unaligned_fields():
+    decoder = DeviceDecoder(GAMEPAD)
+    bits = 0xABC | 0x123 << 12 | 5 << 24 | 0b1010 << 28
+    report = bits.to_bytes(4, "little")
+    assert decoder.decode(report) == {
+        "X": 0xABC,
+        "Y": 0x123,
+        "Hat": 5,
+        "Buttons": (2, 4),
+    }
+    # Short reads decode as if zero-padded
+    assert decoder.decode(report[:2])["X"] == 0xABC
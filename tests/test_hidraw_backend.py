@@ -0,0 +1,219 @@
+# tests/test_hidraw_backend.py - Test the single-thread hidraw poller
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from midi_hid_app import hid_core, hidraw_backend
+from midi_hid_app.hid_core import HIDHandler
+from midi_hid_app.hidraw_backend import HidrawPoller, find_hidraw_node
+
+
+def fake_device():
+    """Socket pair keeping report boundaries, like a hidraw node"""
+    device, feeder = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    device.setblocking(False)
+    return device, feeder
+
+
+def fake_sysfs(root, nodes):
+    """Lay out (node, USB interface, HID device) like /sys/class/hidraw"""
+    hidraw = root / "class" / "hidraw"
+    hidraw.mkdir(parents=True)
+    for node, usb_interface, hid_id in nodes:
+        hid_dir = root / "devices" / "usb1" / usb_interface / hid_id
+        node_dir = hid_dir / "hidraw" / node
+        node_dir.mkdir(parents=True)
+        (node_dir / "device").symlink_to(hid_dir)
+        (hidraw / node).symlink_to(node_dir)
+    return str(hidraw)
+
+
+# A receiver with two interfaces of one device, and a second device
+RECEIVER = 0x046D, 0xC52B
+SYSFS_NODES = [
+    ("hidraw0", "1-2.3:1.0", "0003:046D:C52B.0001"),
+    ("hidraw1", "1-2.3:1.1", "0003:046D:C52B.0002"),
+    ("hidraw2", "1-4:1.0", "0003:1234:5678.0003"),
+    ("hidraw3", "1-5:1.0", "0003:046D:C52B.0004"),
+]
+
+
+def device_info(path, interface):
+    return {
+        "path": path,
+        "vendor_id": RECEIVER[0],
+        "product_id": RECEIVER[1],
+        "interface_number": interface,
+    }
+
+
+def test_find_hidraw_node(tmp_path):
+    sysfs = fake_sysfs(tmp_path, SYSFS_NODES)
+
+    # hidapi's libusb backend names the USB interface
+    assert find_hidraw_node(device_info(b"1-2.3:1.1", 1), sysfs) == "/dev/hidraw1"
+    assert find_hidraw_node(device_info(b"1-5:1.0", 0), sysfs) == "/dev/hidraw3"
+    # Its hidraw backend names the node
+    assert find_hidraw_node({"path": b"/dev/hidraw9"}, sysfs) == "/dev/hidraw9"
+    # Other path formats fall back to ids and interface number, if unique
+    assert find_hidraw_node(device_info(b"0001:0004:01", 1), sysfs) == "/dev/hidraw1"
+    assert find_hidraw_node(device_info(b"0001:0004:00", 0), sysfs) is None
+    assert find_hidraw_node(device_info(b"1-9:1.0", 2), sysfs) is None
+    assert find_hidraw_node(device_info(b"1-2.3:1.0", 0), tmp_path / "missing") is None
+
+
+def test_poller_serves_many_fds_from_one_thread():
+    poller = HidrawPoller()
+    received = []
+    ready = threading.Event()
+    devices = [fake_device() for _ in range(3)]
+
+    def on_readable(fd):
+        received.append((fd, os.read(fd, 64), threading.current_thread().name))
+        if len(received) == 3:
+            ready.set()
+
+    for device, feeder in devices:
+        poller.watch(device.fileno(), on_readable)
+    assert len(poller) == 3
+    for i, (device, feeder) in enumerate(devices):
+        feeder.send(bytes([i]))
+
+    assert ready.wait(2.0)
+    assert sorted(data for fd, data, thread in received) == [b"\0", b"\1", b"\2"]
+    assert len({thread for fd, data, thread in received}) == 1
+
+    poller.unwatch(devices[0][0].fileno())
+    assert len(poller) == 2
+    poller.stop()
+    for device, feeder in devices:
+        device.close()
+        feeder.close()
+
+
+def test_handler_reads_hidraw_devices_through_the_poller(monkeypatch, tmp_path):
+    device, feeder = fake_device()
+    monkeypatch.setattr(
+        hidraw_backend, "SYSFS_HIDRAW", fake_sysfs(tmp_path, SYSFS_NODES)
+    )
+    opened = []
+
+    def open_hidraw(node):
+        opened.append(node)
+        return os.dup(device.fileno())
+
+    monkeypatch.setattr(hid_core, "open_hidraw", open_hidraw)
+
+    handler = HIDHandler(use_hidraw=True)
+    passes = []
+    done = threading.Event()
+
+    def on_reports(device_info, reports, device_name):
+        passes.append([data for timestamp_ns, data in reports])
+        done.set()
+
+    handler.report_bus.subscribe(on_reports)
+    # A path from hidapi's libusb backend, as the hidapi wheels report
+    assert handler.connect_device(device_info(b"1-2.3:1.1", 1))
+    assert opened == ["/dev/hidraw1"]
+    assert handler.connected_devices[b"1-2.3:1.1"][1] is None  # no thread
+
+    handler.max_batch_size = 2
+    for report in (b"\x01\x10", b"\x01\x20", b"\x01\x30"):
+        feeder.send(report)
+    while sum(len(p) for p in passes) < 3:
+        assert done.wait(2.0)
+        done.clear()
+
+    assert [r for p in passes for r in p] == [b"\x01\x10", b"\x01\x20", b"\x01\x30"]
+    assert max(len(p) for p in passes) <= 2
+    slot = handler.counters.slot_of(b"1-2.3:1.1")
+    assert (handler.counters.messages[slot], handler.counters.bytes[slot]) == (3, 6)
+
+    assert handler.disconnect_device(b"1-2.3:1.1")
+    assert not handler.connected_devices and len(handler.poller) == 0
+    handler.close_all()
+    device.close()
+    feeder.close()
+
+
+def test_reads_are_sized_from_the_report_descriptor(monkeypatch):
+    device, feeder = fake_device()
+    monkeypatch.setattr(hid_core, "open_hidraw", lambda path: os.dup(device.fileno()))
+    # One input report: 4 bytes behind report ID 1
+    descriptor = bytes.fromhex("85 01 75 08 95 04 81 02")
+    monkeypatch.setattr(hid_core, "read_hidraw_descriptor", lambda fd: descriptor)
+
+    handler = HIDHandler(use_hidraw=True)
+    received = []
+    done = threading.Event()
+    handler.report_bus.subscribe(
+        lambda info, reports, name: (received.extend(reports), done.set())
+    )
+    assert handler.connect_device({"path": b"/dev/hidraw3"})
+    assert handler.report_descriptors[b"/dev/hidraw3"] == descriptor
+
+    feeder.send(b"\x01\x0a\x0b\x0c\x0d")
+    feeder.send(b"\x01\x1a")
+    while len(received) < 2:
+        assert done.wait(2.0)
+        done.clear()
+    assert [data for timestamp_ns, data in received] == [
+        b"\x01\x0a\x0b\x0c\x0d",
+        b"\x01\x1a",
+    ]
+
+    handler.close_all()
+    assert not handler.report_descriptors
+    device.close()
+    feeder.close()
+
+
+def test_full_queue_passes_are_counted(monkeypatch):
+    device, feeder = fake_device()
+    monkeypatch.setattr(hid_core, "open_hidraw", lambda path: os.dup(device.fileno()))
+
+    # A full hidraw queue is waiting when the device is first read
+    for _ in range(hid_core.HIDRAW_QUEUE_REPORTS + 6):
+        feeder.send(b"\x01\x02")
+
+    handler = HIDHandler(use_hidraw=True)
+    done = threading.Event()
+    handler.report_bus.subscribe(lambda info, reports, name: done.set())
+    assert handler.connect_device({"path": b"/dev/hidraw4"})
+    assert done.wait(2.0)
+
+    slot = handler.counters.slot_of(b"/dev/hidraw4")
+    assert handler.counters.messages[slot] == hid_core.HIDRAW_QUEUE_REPORTS + 6
+    assert handler.counters.overflow_passes[slot] == 1
+
+    handler.close_all()
+    device.close()
+    feeder.close()
+
+
+def test_nodes_at_eof_are_closed(monkeypatch):
+    device, feeder = fake_device()
+    fd = os.dup(device.fileno())
+    monkeypatch.setattr(hid_core, "open_hidraw", lambda path: fd)
+
+    handler = HIDHandler(use_hidraw=True)
+    assert handler.connect_device({"path": b"/dev/hidraw6"})
+    assert len(handler.poller) == 1
+
+    feeder.close()  # Reads now return b"" forever
+    deadline = time.monotonic() + 2.0
+    while len(handler.poller) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(handler.poller) == 0
+    assert handler.connected_devices[b"/dev/hidraw6"] == (None, None, None)
+    with pytest.raises(OSError):
+        os.fstat(fd)  # Closed
+
+    assert handler.disconnect_device(b"/dev/hidraw6")
+    assert not handler.connected_devices
+    handler.close_all()
+    device.close()
@@ -0,0 +1,38 @@
+# tests/test_histogram.py - Test the log-linear timing histogram
+import random
+from midi_hid_app.histogram import LogHistogram, bucket_bounds, bucket_index
+
+
+def test_buckets_cover_values_without_gaps():
+    previous_high = 0
+    for index in range(bucket_index(10**12) + 1):
+        low, high = bucket_bounds(index)
+        assert low == previous_high
+        assert bucket_index(low) == index and bucket_index(high - 1) == index
+        assert high - low <= max(1, low // 16)
+        previous_high = high
+
+
+def test_percentiles_are_within_bucket_error():
+    random.seed(1)
+    samples = [random.randint(1_000, 5_000_000) for i in range(20000)]
+    histogram = LogHistogram()
+    for sample in samples:
+        histogram.record(sample)
+
+    samples.sort()
+    for percent in (50, 90, 99):
+        exact = samples[round(len(samples) * percent / 100) - 1]
+        assert abs(histogram.percentile(percent) - exact) <= exact * 0.07
+    assert histogram.min == samples[0] and histogram.max == samples[-1]
+    assert histogram.count == 20000
+
+
+def test_merge_adds_samples():
+    first, second = LogHistogram(), LogHistogram()
+    first.record(10)
+    second.record(-5)
+    second.record(1000)
+    first.merge(second)
+
+    assert (first.count, first.min, first.max, first.total) == (3, -5, 1000, 1005)
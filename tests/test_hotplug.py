@@ -0,0 +1,52 @@
+# tests/test_hotplug.py - Test hotplug event parsing and the polling fallback
+import threading
+from midi_hid_app.hotplug import HotplugMonitor, parse_uevent
+
+
+def test_parse_kernel_uevent():
+    message = (
+        b"add@/devices/pci0000:00/usb1/1-1/1-1:1.0/hidraw/hidraw3\0"
+        b"ACTION=add\0"
+        b"DEVPATH=/devices/pci0000:00/usb1/1-1/1-1:1.0/hidraw/hidraw3\0"
+        b"SUBSYSTEM=hidraw\0"
+        b"DEVNAME=hidraw3\0"
+        b"SEQNUM=4242\0"
+    )
+    assert parse_uevent(message) == ("add", "hidraw", "hidraw3")
+
+    card = (
+        b"remove@/devices/x/sound/card2\0"
+        b"ACTION=remove\0"
+        b"DEVPATH=/devices/x/sound/card2\0"
+        b"SUBSYSTEM=sound\0"
+    )
+    assert parse_uevent(card) == ("remove", "sound", "/devices/x/sound/card2")
+
+    assert parse_uevent(b"libudev\0\xfe\xed\xca\xfe") is None
+
+
+def test_polling_publishes_only_changes():
+    ports = ["Keys"]
+    devices = [{"path": b"/dev/hidraw0"}]
+    monitor = HotplugMonitor(lambda: list(ports), lambda: list(devices), 0.01)
+
+    events = []
+    changed = threading.Event()
+
+    def on_event(*event):
+        events.append(event)
+        if len(events) == 2:
+            changed.set()
+
+    monitor.event_bus.subscribe(on_event)
+    assert monitor.start(use_netlink=False) == "polling"
+
+    ports.append("Pads")
+    devices.clear()
+    assert changed.wait(2.0)
+    monitor.stop()
+
+    assert sorted(events) == [
+        ("add", "midi", "Pads"),
+        ("remove", "hid", b"/dev/hidraw0"),
+    ]
@@ -0,0 +1,32 @@
+# tests/test_latency.py - Test the round-trip latency probe
+from midi_hid_app.event_bus import EventBus
+from midi_hid_app.latency import LatencyProbe, decode_probe, encode_probe
+
+
+def test_probe_messages_round_trip():
+    for seq in (0, 1, 127, 128, 2**28 - 1):
+        message = encode_probe(seq)
+        assert message[0] == 0xF0 and message[-1] == 0xF7
+        assert all(byte < 0x80 for byte in message[1:-1])
+        assert decode_probe(message) == seq
+
+    assert decode_probe([0xF0, 0x7E, 0x4C, 0, 0, 0, 1, 0xF7]) is None
+    assert decode_probe([0x90, 60, 100]) is None
+
+
+def test_probe_counts_replies_and_losses():
+    bus = EventBus()
+
+    def loopback(message):
+        # Drop every tenth probe, echo everything else with some noise
+        if decode_probe(message) % 10:
+            bus.publish([0xB0, 1, 2], 0.0, "Loop")
+            bus.publish(message, 0.0, "Loop")
+
+    probe = LatencyProbe(bus, loopback)
+    probe.run(50, interval=0, timeout=0.01)
+
+    assert (probe.sent, probe.received, probe.lost) == (50, 45, 5)
+    assert probe.rtt.count == 45 and probe.rtt.min >= 0
+    assert probe.jitter.count == 44
+    assert not bus
@@ -0,0 +1,68 @@
+# tests/test_midi_output.py - Test the pooled MIDI output ports
+import pytest
+from midi_hid_app.midi_output import MidiOutputPool, PortNotFoundError
+
+
+class FakeMidiOut:
+    ports = ["Synth", "Drums", "Lights"]
+    opened = []
+
+    def __init__(self):
+        self.port = None
+        self.sent = []
+        self.broken = False
+
+    def get_ports(self):
+        return list(self.ports)
+
+    def open_port(self, index):
+        self.port = self.ports[index]
+        self.opened.append(self.port)
+
+    def close_port(self):
+        self.port = None
+
+    def send_message(self, data):
+        if self.broken:
+            raise OSError("device gone")
+        self.sent.append(data)
+
+
+@pytest.fixture
+def pool():
+    FakeMidiOut.opened = []
+    return MidiOutputPool(max_open=2, client_factory=FakeMidiOut)
+
+
+def test_port_is_opened_once_and_reused(pool):
+    for i in range(100):
+        pool.send("Synth", [0x90, 60, i])
+
+    assert FakeMidiOut.opened == ["Synth"]
+    assert len(pool._ports["Synth"].sent) == 100
+
+
+def test_least_recently_used_port_is_closed(pool):
+    pool.send("Synth", [0xF8])
+    pool.send("Drums", [0xF8])
+    pool.send("Synth", [0xF8])
+    pool.send("Lights", [0xF8])
+
+    assert "Drums" not in pool
+    assert "Synth" in pool and "Lights" in pool
+
+
+def test_failed_send_reopens_the_port(pool):
+    pool.send("Synth", [0xF8])
+    pool._ports["Synth"].broken = True
+
+    pool.send("Synth", [0xFA])
+
+    assert FakeMidiOut.opened == ["Synth", "Synth"]
+    assert pool._ports["Synth"].sent == [[0xFA]]
+
+
+def test_unknown_port_raises(pool):
+    with pytest.raises(PortNotFoundError):
+        pool.send("Nowhere", [0xF8])
+    assert len(pool) == 0
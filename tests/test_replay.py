@@ -0,0 +1,59 @@
+# tests/test_replay.py - Test replaying captures with their original timing
+from midi_hid_app.capture_store import SOURCE_MIDI, SOURCE_HID
+from midi_hid_app.capture_file import CaptureWriter
+from midi_hid_app.replay import CaptureReplay
+from midi_hid_app.scheduler import now_ns
+
+
+def write_capture(path):
+    writer = CaptureWriter(path, [(SOURCE_MIDI, "Keys"), (SOURCE_HID, "Pad")])
+    start = 5_000_000_000
+    writer.write_event(0, [0x90, 60, 100], start)
+    writer.write_event(1, b"\x01\x02", start + 10_000_000)
+    writer.write_event(0, [0x80, 60, 0], start + 40_000_000)
+    writer.close()
+
+
+def test_replay_keeps_relative_timing_and_skips_hid(tmp_path):
+    path = tmp_path / "replay.mhc"
+    write_capture(path)
+    sent = []
+    replay = CaptureReplay(path, lambda data: sent.append((now_ns(), data)), speed=2)
+
+    # Record the due times handed to the scheduler; wall-clock gaps between
+    # sends depend on how promptly this machine runs the scheduler thread
+    due = []
+    schedule = replay.scheduler.schedule
+
+    def record_schedule(port, data, at_ns):
+        due.append(at_ns)
+        schedule(port, data, at_ns)
+
+    replay.scheduler.schedule = record_schedule
+
+    replay.start()
+    assert replay.wait(5.0)
+    replay.close()
+
+    assert [data for at, data in sent] == [[0x90, 60, 100], [0x80, 60, 0]]
+    # 40 ms apart at 2x speed
+    assert due[1] - due[0] == 20_000_000
+    # Never early, and late by no more than a badly loaded machine manages
+    for (at, data), due_ns in zip(sent, due):
+        assert 0 <= at - due_ns < 500_000_000
+    assert replay.lateness.count == 2 and replay.passes == 1
+
+
+def test_loop_replays_until_stopped(tmp_path):
+    path = tmp_path / "loop.mhc"
+    write_capture(path)
+    sent = []
+    replay = CaptureReplay(path, sent.append, speed=20, loop=True)
+
+    replay.start()
+    while len(sent) < 6:
+        replay._thread.join(0.01)
+    replay.close()
+
+    assert replay.passes >= 2
+    assert sent[:4] == [[0x90, 60, 100], [0x80, 60, 0]] * 2
@@ -0,0 +1,55 @@
+# tests/test_saturation.py - Test the saturation benchmark helpers
+from midi_hid_app.histogram import LogHistogram
+from midi_hid_app.saturation import (
+    MAX_P99_LAG_NS,
+    SEQ_MASK,
+    RateResult,
+    Recorder,
+    decode_seq,
+    encode_seq,
+    send_at_rate,
+)
+
+
+def test_sequence_round_trip():
+    for seq in (0, 1, 127, 128, 16383, 16384, SEQ_MASK):
+        data = encode_seq(seq)
+        assert data[0] & 0xF0 == 0xB0
+        assert all(byte < 0x80 for byte in data[1:])
+        assert decode_seq(data) == seq
+
+
+def test_sequence_wraps():
+    assert decode_seq(encode_seq(SEQ_MASK + 5)) == 4
+
+
+def _lag(value):
+    lag = LogHistogram()
+    lag.record(value)
+    return lag
+
+
+def test_rate_result_sustained():
+    assert RateResult(1000, 1000, 1000, 1.0, _lag(1000)).sustained
+    # Dropped messages
+    assert not RateResult(1000, 1000, 990, 1.0, _lag(1000)).sustained
+    # Sender could not keep up
+    assert not RateResult(1000, 500, 500, 1.0, _lag(1000)).sustained
+    # Delivered too late
+    assert not RateResult(1000, 1000, 1000, 1.0, _lag(2 * MAX_P99_LAG_NS)).sustained
+    assert "FAIL" in str(RateResult(1000, 0, 0, 1.0, LogHistogram()))
+
+
+def test_send_at_rate_feeds_recorder():
+    recorder = Recorder()
+    sent_messages = []
+
+    def send(data):
+        sent_messages.append(data)
+        recorder.on_messages((data,))
+
+    sent, elapsed = send_at_rate(send, recorder, 2000, 0.05)
+    assert sent == 100 == len(sent_messages) == recorder.received
+    assert [decode_seq(data) for data in sent_messages] == list(range(100))
+    assert elapsed > 0
+    assert recorder.lag.count == 100
@@ -0,0 +1,26 @@
+# tests/test_scan.py - Test the Qt-free device scan
+import subprocess
+import sys
+from midi_hid_app import scan
+
+
+def test_failing_backend_is_reported_not_raised(monkeypatch):
+    def broken():
+        raise OSError("no MIDI backend")
+
+    monkeypatch.setattr(scan, "scan_midi", broken)
+    monkeypatch.setattr(scan, "scan_hid", lambda: [{"vendor_id": 1}])
+
+    result = scan.scan_devices()
+
+    assert result["midi"] == {"physical": [], "virtual": []}
+    assert result["hid"] == [{"vendor_id": 1}]
+    assert result["errors"] == {"midi": "no MIDI backend"}
+
+
+def test_scan_does_not_import_qt():
+    code = (
+        "import sys; from midi_hid_app.scan import scan_devices; scan_devices(); "
+        "sys.exit('PySide6' in sys.modules)"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
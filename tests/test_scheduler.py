@@ -0,0 +1,45 @@
+# tests/test_scheduler.py - Test the timestamped MIDI output scheduler
+import threading
+from midi_hid_app.scheduler import MidiScheduler, now_ns
+
+
+def test_messages_are_sent_in_time_order():
+    sent = []
+    done = threading.Event()
+
+    def send(port, data):
+        sent.append((port, data, now_ns()))
+        if len(sent) == 4:
+            done.set()
+
+    scheduler = MidiScheduler(send)
+    scheduler.start()
+    start = now_ns() + 20_000_000
+    scheduler.schedule("B", [2], start + 2_000_000)
+    scheduler.schedule_batch(
+        [("C", [3], start + 3_000_000), ("A", [1], start), ("A", [1, 1], start)]
+    )
+
+    assert done.wait(2.0)
+    scheduler.stop()
+
+    assert [(port, data) for port, data, at in sent] == [
+        ("A", [1]),
+        ("A", [1, 1]),
+        ("B", [2]),
+        ("C", [3]),
+    ]
+    assert sent[0][2] >= start and sent[2][2] >= start + 2_000_000
+    assert scheduler.lateness.count == 4 and scheduler.lateness.min >= 0
+
+
+def test_failed_sends_are_counted_and_stop_keeps_the_queue():
+    scheduler = MidiScheduler(lambda port, data: False)
+    scheduler.start()
+    scheduler.schedule("Gone", [0xF8], now_ns())
+    scheduler.schedule("Later", [0xF8], now_ns() + 60 * 10**9)
+    while scheduler.failed == 0:
+        scheduler._thread.join(0.01)
+    scheduler.stop()
+
+    assert (scheduler.sent, scheduler.failed, len(scheduler)) == (0, 1, 1)
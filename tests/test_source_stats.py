@@ -0,0 +1,78 @@
+# tests/test_source_stats.py - Test the per-source inter-arrival statistics
+from midi_hid_app.capture_store import SOURCE_HID, SOURCE_MIDI, CaptureStore
+from midi_hid_app.source_stats import SourceStats
+
+
+class ManualClock:
+    """Monotonic clock set by the test; arrive() appends an event at a time"""
+
+    def __init__(self, store):
+        self.store = store
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def arrive(self, source_id, data, t, wall_ns=None):
+        self.now = t
+        self.store.append(source_id, data, t if wall_ns is None else wall_ns)
+
+
+def test_inter_arrival_times_per_source():
+    store = CaptureStore(capacity=16, arena_size=256)
+    clock = ManualClock(store)
+    stats = SourceStats(clock)
+    stats.attach(store)
+    keys = store.register_source(SOURCE_MIDI, "Keys")
+    pad = store.register_source(SOURCE_HID, "Pad")
+
+    for t in (1000, 2000, 4000):
+        clock.arrive(keys, b"\x90\x3c\x40", t)
+    clock.arrive(pad, b"\x01", 2500)
+    clock.arrive(pad, b"\x01", 3000)
+
+    assert stats.get(keys).count == 2
+    assert (stats.get(keys).min, stats.get(keys).max) == (1000, 2000)
+    assert stats.get(pad).count == 1 and stats.get(pad).min == 500
+    assert stats.get(5) is None
+
+    stats.clear()
+    clock.arrive(keys, b"\x90\x3c\x40", 9000)
+    assert stats.get(keys).count == 0  # first event after a reset has no gap
+
+
+def test_wall_clock_steps_do_not_show_up_as_gaps():
+    store = CaptureStore(capacity=16, arena_size=256)
+    clock = ManualClock(store)
+    stats = SourceStats(clock)
+    stats.attach(store)
+    keys = store.register_source(SOURCE_MIDI, "Keys")
+
+    wall_ns = 1_700_000_000_000_000_000
+    clock.arrive(keys, b"\xf8", 1_000_000, wall_ns)
+    # NTP steps the wall clock back an hour between two clock ticks
+    clock.arrive(keys, b"\xf8", 2_000_000, wall_ns - 3_600_000_000_000)
+    clock.arrive(keys, b"\xf8", 3_000_000, wall_ns + 1_000_000)
+
+    histogram = stats.get(keys)
+    assert (histogram.count, histogram.min, histogram.max) == (2, 1_000_000, 1_000_000)
+
+
+def test_stats_model_rows(app):
+    from midi_hid_app.stats_model import SourceStatsModel
+
+    store = CaptureStore(capacity=16, arena_size=256)
+    clock = ManualClock(store)
+    stats = SourceStats(clock)
+    stats.attach(store)
+    model = SourceStatsModel(store, stats)
+    keys = store.register_source(SOURCE_MIDI, "Keys")
+    store.register_source(SOURCE_HID, "Idle")
+
+    for t in range(0, 5_000_000, 1_000_000):
+        clock.arrive(keys, b"\xf8", t)
+    model.refresh()
+
+    assert model.rowCount() == 1  # sources without samples are not listed
+    row = [model.data(model.index(0, column)) for column in range(8)]
+    assert row == ["MIDI [Keys]", "4"] + ["1.000"] * 6
@@ -0,0 +1,48 @@
+# tests/test_startup.py - Test startup profiling and lazy backend loading
+import subprocess
+import sys
+from midi_hid_app.startup import StartupProfile
+
+
+def test_profile_records_phases_in_order():
+    profile = StartupProfile()
+    profile.mark("first")
+    profile.mark("second")
+
+    assert [phase for phase, at in profile.marks] == ["first", "second"]
+    assert 0 <= profile.elapsed("first") <= profile.elapsed("second")
+    assert profile.elapsed("missing") is None
+
+
+def test_disabled_profile_records_nothing():
+    profile = StartupProfile(enabled=False)
+    profile.mark("first")
+
+    assert profile.marks == []
+
+
+def test_core_handlers_do_not_load_backends_until_used():
+    code = (
+        "import sys\n"
+        "from midi_hid_app.midi_core import MIDIHandler\n"
+        "from midi_hid_app.hid_core import HIDHandler\n"
+        "MIDIHandler(); HIDHandler()\n"
+        "sys.exit('rtmidi' in sys.modules or 'hid' in sys.modules)\n"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_hotplug_monitor_waits_for_the_first_scan(app):
+    from midi_hid_app.simple_midi import SimpleMIDIHandler
+    from midi_hid_app.simple_hid import SimpleHIDHandler
+    from midi_hid_app.simple_ui import SimpleMainWindow
+
+    window = SimpleMainWindow(SimpleMIDIHandler(), SimpleHIDHandler())
+    started = []
+    window.hotplug.start = lambda: started.append(True)
+    assert window.hotplug._thread is None
+
+    window.on_scan_finished()
+    window.on_scan_finished()
+    assert started == [True]
+    window.close()